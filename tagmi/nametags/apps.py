@@ -9,3 +9,8 @@ class NametagsConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'nametags'
+
+    def ready(self):
+        """ Connects the receivers of the signals of the models. """
+        # pylint: disable=import-outside-toplevel,unused-import
+        from . import signals  # noqa: F401
@@ -0,0 +1,50 @@
+"""
+Module containing the authentication of the partners that push labels
+in bulk, with the API keys in settings.LABEL_INGEST.
+"""
+# std lib imports
+import hmac
+
+# third party imports
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from rest_framework import authentication, permissions
+from rest_framework.exceptions import AuthenticationFailed
+
+# our imports
+
+
+class IngestKeyAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticates requests with an "Authorization: Bearer <key>" header.
+    request.auth is set to the set of sources the key may write.
+    """
+
+    keyword = b"bearer"
+
+    def authenticate(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword:
+            return None
+
+        if len(header) != 2:
+            raise AuthenticationFailed("Invalid authorization header")
+
+        key = header[1]
+        for known_key, sources in settings.LABEL_INGEST["KEYS"].items():
+            if hmac.compare_digest(known_key.encode(), key):
+                return AnonymousUser(), sources
+
+        raise AuthenticationFailed("Invalid API key")
+
+    def authenticate_header(self, request):
+        return "Bearer"
+
+
+class HasIngestKey(permissions.BasePermission):
+    """
+    Allows requests authenticated with an ingestion API key.
+    """
+
+    def has_permission(self, request, view):
+        return request.auth is not None
@@ -11,7 +11,9 @@ import responses
 import web3
 
 # our imports
+from . import events, pubsub
 from .jobs import queue
+from .jobs.scrapers import sessions
 
 
 class BaseTestCase(APITestCase):
@@ -40,6 +42,12 @@ class BaseTestCase(APITestCase):
         )
         web3_patcher.start()
 
+        # scraper sessions and redis clients are kept by the
+        # process, start without any
+        sessions.registry.clear()
+        pubsub.redis_client.cache_clear()
+        events.jobs_controller.cache_clear()
+
         # address to be used in tests
         self.test_addr = "0x7F101fE45e6649A6fB8F3F8B43ed03D353f2B90c".lower()
 
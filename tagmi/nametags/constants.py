@@ -11,3 +11,10 @@ import re
 
 ADDRESS_FORMAT = re.compile(r"^0x[0-9a-f]{40}$", re.IGNORECASE | re.ASCII)
 NAMETAG_FORMAT = re.compile(r"^[\w\-\s\,\.']+$")
+
+# seconds a client should wait before retrying a lookup with stale sources
+STALE_RETRY_AFTER = 30
+
+# sources of the scrapers, an address has at most one tag of each of them,
+# which is updated in place when the label found by the scraper changes
+SCRAPER_SOURCES = ["dune", "etherscan", "ethleaderboard", "opensea"]
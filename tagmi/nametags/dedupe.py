@@ -0,0 +1,58 @@
+"""
+Module containing the collapse of the duplicate tags of scraper sources,
+which were added whenever the label found by a scraper changed, before
+scraper tags were updated in place. Used by the dedupe_source_tags
+command, the migration that collapses them before they are made unique
+has its own copy.
+"""
+# std lib imports
+
+# third party imports
+from django.db.models import Count, Max
+
+# our imports
+
+
+def duplicate_source_tags(tag_model, sources):
+    """
+    Returns the (address, source) pairs that have more than one tag of
+    the given sources, with the id of their latest tag, as dicts with
+    address_id, source, count and keep keys.
+    """
+    return (
+        tag_model.objects.filter(source__in=sources)
+        .values("address_id", "source")
+        .annotate(count=Count("id"), keep=Max("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+
+
+def collapse_source_tags(tag_model, vote_model, sources):
+    """
+    Collapses the tags of each address and given source into its latest
+    tag, which has the latest label. The votes of the other tags are moved
+    to the latest tag, except those of users who already voted on it, and
+    the other tags are deleted. The models are arguments so that
+    migrations can pass their historical models.
+    Returns the number of tags deleted.
+    """
+    deleted = 0
+    for group in duplicate_source_tags(tag_model, sources).iterator():
+        others = tag_model.objects.filter(
+            address_id=group["address_id"], source=group["source"]
+        ).exclude(id=group["keep"]).order_by("-id")
+
+        # users keep their vote on the latest of the tags they voted on
+        for other in others:
+            voted = vote_model.objects.filter(
+                tag_id=group["keep"]
+            ).values("created_by_session_id")
+            vote_model.objects.filter(tag_id=other.id).exclude(
+                created_by_session_id__in=voted
+            ).update(tag_id=group["keep"])
+
+        deleted += others.count()
+        others.delete()
+
+    return deleted
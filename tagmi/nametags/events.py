@@ -0,0 +1,303 @@
+"""
+Module containing server-sent events for addresses.
+
+Whenever the nametags of an address change, or its scraper jobs finish,
+a message is published on a redis channel for that address. Clients
+subscribe to /{address}/events/ and are pushed the updated nametag
+payload instead of polling GET /{address}/.
+
+The events endpoint is a plain ASGI application because it holds
+connections open for a long time. Each process shares a single redis
+subscription between all of its connections.
+"""
+# std lib imports
+from http.cookies import SimpleCookie
+from importlib import import_module
+import asyncio
+import functools
+import json
+import logging
+import re
+
+# third party imports
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpRequest
+import redis.asyncio
+
+# our imports
+from .pubsub import CHANNEL_PREFIX, redis_client
+
+
+logger = logging.getLogger(__name__)
+EVENTS_PATH = re.compile(r"^/(0x[0-9a-f]{40})/events/$", re.IGNORECASE)
+
+# seconds between comments sent to keep idle connections open
+HEARTBEAT_INTERVAL = 15
+
+# seconds to wait before subscribing again when the subscription fails
+RESUBSCRIBE_DELAY = 1
+
+# message sent to every stream when the subscription was lost for a
+# while, since changes may have been missed
+RESUBSCRIBED = "resubscribed"
+
+
+@functools.lru_cache(maxsize=None)
+def jobs_controller():
+    """
+    Returns the scraper jobs controller shared by
+    all the event streams of the process.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .jobs.controllers import ScraperJobsController
+
+    return ScraperJobsController(redis_cursor=redis_client())
+
+
+def address_payload(address, session_key):
+    """
+    Returns the payload of GET /{address}/ for the given
+    address, as seen by the user with the given session key.
+    Runs in the threads of the event loop's executor, several
+    payloads can be built at once.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .models import Address
+    from .serializers import AddressSerializer
+
+    close_old_connections()
+    try:
+        stale = jobs_controller().sources_are_stale(address)
+
+        # build a request that carries the session of the user
+        engine = import_module(settings.SESSION_ENGINE)
+        request = HttpRequest()
+        request.session = engine.SessionStore(session_key)
+
+        try:
+            instance = Address.objects.get(pubkey=address)
+        except Address.DoesNotExist:
+            return {"sourcesAreStale": stale, "nametags": []}
+
+        instance.sources_are_stale = stale
+        serializer = AddressSerializer(
+            instance,
+            context={"request": request}
+        )
+        return serializer.data
+
+    finally:
+        close_old_connections()
+
+
+class AddressEventsHub():
+    """
+    Shares a single redis subscription between all the
+    event stream connections of a process.
+    """
+
+    def __init__(self):
+        """ Class initialization. """
+
+        self.subscribers = {}
+        self.reader = None
+
+    def subscribe(self, address):
+        """
+        Returns a queue that receives the messages of the given address.
+        """
+        if self.reader is None or self.reader.done():
+            self.reader = asyncio.create_task(self.read())
+
+        queue = asyncio.Queue()
+        self.subscribers.setdefault(address, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, address, queue):
+        """
+        Stops sending messages of the given address to the given queue.
+        """
+        queues = self.subscribers.get(address, set())
+        queues.discard(queue)
+        if not queues:
+            self.subscribers.pop(address, None)
+
+    async def read(self):
+        """
+        Reads the messages of every address from redis and hands them
+        to the queues subscribed to that address, until the process ends.
+        If the subscription fails, it is logged and made again, and every
+        queue is told so that its stream sends the payload again.
+        """
+        failed = False
+        while True:
+            try:
+                await self.listen(notify=failed)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception(
+                    "subscription of the event streams failed, "
+                    "subscribing again in %ss", RESUBSCRIBE_DELAY
+                )
+                failed = True
+                await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    async def listen(self, notify):
+        """
+        Subscribes to the channels of every address and hands their
+        messages to the queues. Once subscribed, every queue is
+        sent a RESUBSCRIBED message if notify is True.
+        """
+        redis_cursor = redis.asyncio.from_url(settings.REDIS_URL)
+        pubsub = redis_cursor.pubsub()
+        try:
+            await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+
+            if notify:
+                for queues in self.subscribers.values():
+                    for queue in queues:
+                        queue.put_nowait(RESUBSCRIBED)
+
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=HEARTBEAT_INTERVAL
+                )
+                if message is None:
+                    continue
+
+                address = message["channel"].decode()[len(CHANNEL_PREFIX):]
+                for queue in self.subscribers.get(address, set()):
+                    queue.put_nowait(message["data"].decode())
+
+        finally:
+            await pubsub.reset()
+            await redis_cursor.close()
+
+
+hub = AddressEventsHub()
+
+
+def get_header(scope, name):
+    """
+    Returns the value of the given header of an ASGI request, or None.
+    """
+    for key, value in scope["headers"]:
+        if key.decode().lower() == name:
+            return value.decode()
+
+    return None
+
+
+def response_headers(scope):
+    """
+    Returns the headers of an event stream response, including the
+    CORS headers that the django middleware would have added.
+    """
+    headers = [
+        (b"content-type", b"text/event-stream"),
+        (b"cache-control", b"no-cache"),
+        (b"x-accel-buffering", b"no"),
+    ]
+
+    origin = get_header(scope, "origin")
+    if origin is not None and origin in settings.CORS_ALLOWED_ORIGINS:
+        headers += [
+            (b"access-control-allow-origin", origin.encode()),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+
+    return headers
+
+
+async def address_events(scope, receive, send):
+    """
+    ASGI application that streams the nametag payload of an address,
+    once when the client connects and then every time it changes.
+    """
+    address = EVENTS_PATH.match(scope["path"]).group(1).lower()
+
+    # session of the user, so that the payload shows their votes
+    cookies = SimpleCookie(get_header(scope, "cookie") or "")
+    session_cookie = cookies.get(settings.SESSION_COOKIE_NAME)
+    session_key = session_cookie.value if session_cookie else None
+
+    queue = hub.subscribe(address)
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": response_headers(scope),
+    })
+
+    async def stream():
+        while True:
+            data = await sync_to_async(
+                address_payload, thread_sensitive=False
+            )(address, session_key)
+            await send({
+                "type": "http.response.body",
+                "body": f"data: {json.dumps(data)}\n\n".encode(),
+                "more_body": True,
+            })
+
+            # wait for a change, sending heartbeats meanwhile,
+            # and coalesce changes that happened together
+            while True:
+                try:
+                    await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+                    break
+                except asyncio.TimeoutError:
+                    await send({
+                        "type": "http.response.body",
+                        "body": b": heartbeat\n\n",
+                        "more_body": True,
+                    })
+            while not queue.empty():
+                queue.get_nowait()
+
+    async def disconnected():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    tasks = [
+        asyncio.create_task(stream()),
+        asyncio.create_task(disconnected()),
+    ]
+    try:
+        done, _ = await asyncio.wait(
+            tasks, return_when=asyncio.FIRST_COMPLETED
+        )
+
+        # the stream broke, end the response so the client reconnects
+        if tasks[0] in done and tasks[0].exception() is not None:
+            logger.error(
+                "event stream of %s failed", address,
+                exc_info=tasks[0].exception()
+            )
+            await send({
+                "type": "http.response.body",
+                "body": b"",
+                "more_body": False,
+            })
+
+    finally:
+        for task in tasks:
+            task.cancel()
+        hub.unsubscribe(address, queue)
+
+
+def route_events(application):
+    """
+    Returns an ASGI application that serves event streams
+    and hands every other request to the given application.
+    """
+    async def router(scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "GET" and \
+                EVENTS_PATH.match(scope["path"]):
+            return await address_events(scope, receive, send)
+
+        return await application(scope, receive, send)
+
+    return router
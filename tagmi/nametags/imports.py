@@ -0,0 +1,319 @@
+"""
+Module containing the bulk import of labels into the database,
+e.g. dumps of etherscan labels.
+"""
+# std lib imports
+import csv
+import io
+import uuid
+
+# third party imports
+from django.db import connection, transaction
+from django.utils import timezone
+
+# our imports
+from .constants import ADDRESS_FORMAT, NAMETAG_FORMAT, SCRAPER_SOURCES
+from .models import Address, Tag
+
+
+NAMETAG_MAX_LENGTH = Tag._meta.get_field("nametag").max_length
+
+
+def normalize_labels(rows):
+    """
+    Returns the unique labels of the given rows of address and nametag,
+    as a list of (address, nametag) tuples with lowercase addresses and
+    stripped nametags, and the number of invalid rows, whose address is
+    malformed or whose nametag is empty or too long.
+    """
+    labels = {}
+    invalid = 0
+    for address, nametag in rows:
+        address = (address or "").strip().lower()
+        nametag = (nametag or "").strip()
+        if not ADDRESS_FORMAT.match(address) or not nametag or \
+                len(nametag) > NAMETAG_MAX_LENGTH:
+            invalid += 1
+            continue
+
+        labels[(address, nametag)] = None
+
+    return list(labels), invalid
+
+
+def validate_item(item, sources):
+    """
+    Returns the (address, nametag, source) label of the given item of a
+    bulk ingestion, an object with address, nametag and source keys,
+    normalized like normalize_labels does. The nametag must have the
+    format of the nametags of users, and the source must be one of the
+    given sources, but not a scraper source, whose tags are owned by the
+    scrapers. Raises ValueError with the reason if it is invalid.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Item must be a JSON object")
+
+    values = {}
+    for key in ("address", "nametag", "source"):
+        if not isinstance(item.get(key), str):
+            raise ValueError(f"{key} must be a string")
+        values[key] = item[key].strip()
+
+    address = values["address"].lower()
+    if not ADDRESS_FORMAT.match(address):
+        raise ValueError("Invalid address format given")
+    if not values["nametag"] or len(values["nametag"]) > NAMETAG_MAX_LENGTH:
+        raise ValueError(
+            f"nametag must be 1 to {NAMETAG_MAX_LENGTH} characters"
+        )
+    if not NAMETAG_FORMAT.match(values["nametag"]):
+        raise ValueError("Nametag can only contain A-Z a-z 1-9 ' . ,")
+    if values["source"] not in sources or values["source"] in SCRAPER_SOURCES:
+        raise ValueError(f"Not allowed to write source {values['source']}")
+
+    return address, values["nametag"], values["source"]
+
+
+def group_items(items, sources):
+    """
+    Validates the given items of a bulk ingestion, and groups the unique
+    labels by source. Returns the result of each item, in order, and the
+    labels of each source, mapped to the results of their items.
+    """
+    results = []
+    labels = {}
+    for index, item in enumerate(items):
+        try:
+            address, nametag, source = validate_item(item, sources)
+        except ValueError as exc:
+            results.append(
+                {"index": index, "status": "invalid", "error": str(exc)}
+            )
+            continue
+
+        source_labels = labels.setdefault(source, {})
+        if (address, nametag) in source_labels:
+            results.append(
+                {"index": index, "address": address, "status": "duplicate"}
+            )
+            continue
+
+        source_labels[(address, nametag)] = {
+            "index": index, "address": address
+        }
+        results.append(source_labels[(address, nametag)])
+
+    return results, labels
+
+
+def ingest_labels(items, sources, session_id=None):
+    """
+    Validates the given items of a bulk ingestion and merges the valid
+    ones into the database, a source at a time, skipping the labels that
+    are already there. Returns the result of each item, in order, with
+    its status: "created", "exists", "duplicate" of an earlier item,
+    or "invalid" with an error.
+    """
+    results, labels = group_items(items, sources)
+    for source, source_labels in labels.items():
+        with LabelImporter(source, session_id) as importer:
+            _, created = importer.merge_created(list(source_labels))
+        for label, result in source_labels.items():
+            result["status"] = "created" if label in created else "exists"
+
+    return results
+
+
+class LabelImporter():
+    """
+    Merges batches of labels into the addresses and tags tables with a
+    few set-based statements per batch, instead of queries per label.
+    Labels that are already in the database are skipped, so importing
+    the same labels again changes nothing. Scraper sources own their
+    tags, an address has at most one tag of such a source, whose nametag
+    is replaced by the new label.
+
+    On PostgreSQL, a batch is loaded into a temporary staging table with
+    COPY, then merged with INSERT ... SELECT, ON CONFLICT DO NOTHING for
+    the addresses, NOT EXISTS for the tags with the same nametag and
+    ON CONFLICT DO UPDATE for the tags a source owns. Other databases,
+    e.g. sqlite in development, merge with bulk_create and bulk_update.
+    Use it as a context manager.
+    """
+
+    staging_table = "nametags_label_staging"
+
+    # number of addresses per query when merging without COPY
+    chunk_size = 500
+
+    def __init__(self, source, session_id=None):
+        """ Class initialization. """
+
+        self.source = source
+        self.session_id = session_id or str(uuid.uuid4())
+        self.copy = connection.vendor == "postgresql"
+        self.owned = source in SCRAPER_SOURCES
+
+    def __enter__(self):
+        if self.copy:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMPORARY TABLE IF NOT EXISTS "
+                    f"{self.staging_table} "
+                    f"(address varchar(42), nametag varchar(255))"
+                )
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.copy:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {self.staging_table}")
+
+    def merge(self, labels):
+        """
+        Adds the given (address, nametag) labels to the database,
+        in a single transaction.
+        Returns the number of new addresses and of new tags.
+        """
+        new_addresses, created = self.merge_created(labels)
+        return new_addresses, len(created)
+
+    def merge_created(self, labels):
+        """
+        Adds the given (address, nametag) labels to the database,
+        in a single transaction.
+        Returns the number of new addresses and the set of the
+        (address, nametag) labels that were added as new tags, or that
+        replaced the nametag of the tag their source owns.
+        """
+        if len(labels) == 0:
+            return 0, set()
+
+        # a source that owns its tags has one per address, the last label
+        if self.owned:
+            labels = list(dict(labels).items())
+
+        with transaction.atomic():
+            if self.copy:
+                return self.merge_copy(labels)
+
+            return self.merge_orm(labels)
+
+    def merge_copy(self, labels):
+        """
+        Merges the given labels through the staging table.
+        """
+        address_table = Address._meta.db_table
+        tag_table = Tag._meta.db_table
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(labels)
+        buffer.seek(0)
+
+        # the tags a source owns are updated in place
+        upsert = ""
+        params = [self.session_id, self.source]
+        if self.owned:
+            upsert = (
+                f"ON CONFLICT (address_id, source) WHERE source IN "
+                f"({', '.join(['%s'] * len(SCRAPER_SOURCES))}) "
+                f"DO UPDATE SET nametag = EXCLUDED.nametag, "
+                f"modified = EXCLUDED.modified "
+            )
+            params += SCRAPER_SOURCES
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {self.staging_table}")
+            cursor.copy_expert(
+                f"COPY {self.staging_table} (address, nametag) "
+                f"FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+            cursor.execute(
+                f"INSERT INTO {address_table} (pubkey) "
+                f"SELECT DISTINCT address FROM {self.staging_table} "
+                f"ON CONFLICT DO NOTHING"
+            )
+            new_addresses = cursor.rowcount
+            cursor.execute(
+                f"INSERT INTO {tag_table} "
+                f"(address_id, nametag, created_by_session_id, created, "
+                f"modified, source) "
+                f"SELECT DISTINCT s.address, s.nametag, %s, NOW(), NOW(), %s "
+                f"FROM {self.staging_table} s WHERE NOT EXISTS ("
+                f"SELECT 1 FROM {tag_table} t "
+                f"WHERE t.address_id = s.address AND t.nametag = s.nametag) "
+                f"{upsert}RETURNING address_id, nametag",
+                params
+            )
+            created = set(cursor.fetchall())
+
+        return new_addresses, created
+
+    def merge_orm(self, labels):
+        """
+        Merges the given labels with bulk_create, a chunk
+        of addresses at a time.
+        """
+        by_address = {}
+        for address, nametag in labels:
+            by_address.setdefault(address, []).append(nametag)
+
+        new_addresses = 0
+        created = set()
+        addresses = list(by_address)
+        for start in range(0, len(addresses), self.chunk_size):
+            chunk = addresses[start:start + self.chunk_size]
+            existing = set(
+                Address.objects.filter(pubkey__in=chunk)
+                .values_list("pubkey", flat=True)
+            )
+            Address.objects.bulk_create([
+                Address(pubkey=address)
+                for address in chunk if address not in existing
+            ])
+            new_addresses += len(chunk) - len(existing)
+            created.update(self.merge_tags_orm(chunk, by_address))
+
+        return new_addresses, created
+
+    def merge_tags_orm(self, chunk, by_address):
+        """
+        Adds the tags of the given chunk of addresses that are not in the
+        database, or replaces the nametags of the tags the source owns.
+        Returns the labels that were added or replaced.
+        """
+        tagged = set(
+            Tag.objects.filter(address__in=chunk)
+            .values_list("address_id", "nametag")
+        )
+        owned = {}
+        if self.owned:
+            owned = {
+                tag.address_id: tag for tag in
+                Tag.objects.filter(address__in=chunk, source=self.source)
+            }
+
+        tags = []
+        replaced = []
+        for address in chunk:
+            for nametag in by_address[address]:
+                if (address, nametag) in tagged:
+                    continue
+
+                if address in owned:
+                    owned[address].nametag = nametag
+                    owned[address].modified = timezone.now()
+                    replaced.append(owned[address])
+                    continue
+
+                tags.append(Tag(
+                    address_id=address,
+                    nametag=nametag,
+                    created_by_session_id=self.session_id,
+                    source=self.source
+                ))
+
+        Tag.objects.bulk_create(tags)
+        Tag.objects.bulk_update(replaced, ["nametag", "modified"])
+
+        return {(tag.address_id, tag.nametag) for tag in tags + replaced}
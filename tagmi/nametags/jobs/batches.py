@@ -0,0 +1,252 @@
+"""
+Module containing micro-batches of scraper jobs, which look up several
+addresses on a source in a single job so that the setup of the scraper,
+e.g. visiting the home page and getting a csrf token, is done once per
+batch instead of once per address. Enabled with SCRAPE_BATCH_SIZE > 1.
+"""
+# std lib imports
+import datetime
+import logging
+import uuid
+
+# third party imports
+from django.conf import settings
+import redis
+import rq
+
+# our imports
+from . import policies
+
+
+logger = logging.getLogger(__name__)
+BATCH_PREFIX = "batch_"
+
+
+def batch_id(source_name):
+    """
+    Returns a new id for a batch job of the given source,
+    in the format batch_{uuid}_{source}.
+    """
+    return f"{BATCH_PREFIX}{uuid.uuid4().hex}_{source_name}"
+
+
+def is_batch_id(job_id):
+    """
+    Returns True if the given job id is the id of a batch job.
+    """
+    return job_id.startswith(BATCH_PREFIX)
+
+
+def batch_source(job_id):
+    """
+    Returns the name of the source of a batch job from its id.
+    """
+    return job_id[len(BATCH_PREFIX) + 33:]
+
+
+class Batches():
+    """
+    Collects the addresses whose scraper jobs for a source are pending
+    into batches, one open batch per queue.
+
+    A batch job is scheduled window seconds after its batch opens, and
+    addresses join the batch until then, or until it is full.
+    The open batch of each queue and the addresses of each batch
+    are stored in redis.
+    """
+
+    key_prefix = "nametags:batch"
+
+    # seconds the addresses of a batch are kept if its job never runs
+    addresses_ttl = 86400
+
+    def __init__(self, redis_cursor):
+        """ Class initialization. """
+
+        self.redis_cursor = redis_cursor
+        self.size = settings.SCRAPE_BATCH["SIZE"]
+        self.window = settings.SCRAPE_BATCH["WINDOW"]
+
+    @property
+    def enabled(self):
+        """ Returns True if scraper jobs should be batched. """
+        return self.size > 1
+
+    def open_key(self, queue_name):
+        """
+        Returns the key that holds the id of the open batch of a queue.
+        """
+        return f"{self.key_prefix}:{queue_name}:open"
+
+    def addresses_key(self, job_id):
+        """
+        Returns the key of the list of addresses of a batch.
+        """
+        return f"{self.key_prefix}:{job_id}:addresses"
+
+    def add(self, queue, scraper_job, address):
+        """
+        Adds the given address to the open batch of the given scraper job
+        in the given queue, or to a new batch if there is no open batch.
+        Returns the id of the batch job, which looks up the address.
+        """
+        job_id = self.join(queue.name, address)
+        if job_id is None:
+            job_id = self.open(queue, scraper_job, address)
+
+        return job_id
+
+    def join(self, queue_name, address):
+        """
+        Adds the given address to the open batch of the given queue,
+        and closes the batch if it is full.
+        Returns the id of the batch job, or None if there is no open batch.
+        """
+        open_key = self.open_key(queue_name)
+        with self.redis_cursor.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(open_key)
+                    job_id = pipe.get(open_key)
+                    if job_id is None:
+                        return None
+
+                    # the batch changes if another address joins it
+                    job_id = job_id.decode()
+                    addresses_key = self.addresses_key(job_id)
+                    pipe.watch(addresses_key)
+                    count = pipe.llen(addresses_key)
+
+                    pipe.multi()
+                    pipe.rpush(addresses_key, address)
+                    if count + 1 >= self.size:
+                        pipe.delete(open_key)
+                    pipe.execute()
+
+                    return job_id
+
+                except redis.WatchError:
+                    continue
+
+    def open(self, queue, scraper_job, address):
+        """
+        Schedules a batch job of the given scraper job in the given queue
+        that looks up the given address, and makes it the open batch
+        of the queue unless another batch was opened in the meantime.
+        Returns the id of the batch job.
+        """
+        job_id = batch_id(scraper_job.name)
+        addresses_key = self.addresses_key(job_id)
+        self.redis_cursor.rpush(addresses_key, address)
+        self.redis_cursor.expire(addresses_key, self.addresses_ttl)
+
+        # the job must exist before addresses can join the batch,
+        # so that the jobs that depend on it wait for it
+        queue.enqueue_in(
+            datetime.timedelta(seconds=self.window),
+            scraper_job.run_batch,
+            queue.name,
+            job_id=job_id,
+            on_failure=record_batch_failure
+        )
+        self.redis_cursor.set(
+            self.open_key(queue.name),
+            job_id,
+            px=max(1, int(self.window * 1000)),
+            nx=True
+        )
+
+        return job_id
+
+    def close(self, job_id, queue_name):
+        """
+        Closes the given batch of the given queue to new addresses.
+        Returns the addresses of the batch.
+        """
+        open_key = self.open_key(queue_name)
+        with self.redis_cursor.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(open_key)
+                    open_id = pipe.get(open_key)
+                    pipe.multi()
+                    if open_id is not None and open_id.decode() == job_id:
+                        pipe.delete(open_key)
+                    pipe.execute()
+                    break
+
+                except redis.WatchError:
+                    continue
+
+        return self.addresses(job_id)
+
+    def addresses(self, job_id):
+        """
+        Returns the addresses of the given batch
+        that have not been looked up yet.
+        """
+        return [
+            address.decode() for address in
+            self.redis_cursor.lrange(self.addresses_key(job_id), 0, -1)
+        ]
+
+    def done(self, job_id, address):
+        """
+        Removes the given address from the given batch once it is looked up.
+        """
+        self.redis_cursor.lrem(self.addresses_key(job_id), 0, address)
+
+
+def scrape_batch(scraper, queue_name):
+    """
+    Looks up every address of the batch of the current rq job with the
+    given scraper, so that the scraper only prepares its session once,
+    and prefetches what the lookups need for all the addresses at once.
+    A failed lookup does not stop the others, the labels found are added
+    to the database and the result of every address is recorded by the
+    re-scrape policy.
+    Returns a dictionary of addresses to the label found.
+    """
+    job = rq.get_current_job()
+    source_name = batch_source(job.id)
+    batches = Batches(job.connection)
+    policy = policies.RescrapePolicy(job.connection)
+
+    addresses = batches.close(job.id, queue_name)
+    try:
+        scraper.prefetch(addresses)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("%s failed to prefetch its batch", source_name)
+
+    labels = {}
+    for address in addresses:
+        try:
+            label = scraper.scrape(address)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("%s failed for %s", source_name, address)
+            policy.record_failure(address, source_name)
+            label = None
+        else:
+            scraper.store(label, address)
+            policy.record_result(address, source_name, label)
+
+        batches.done(job.id, address)
+        labels[address] = label
+
+    return labels
+
+
+def record_batch_failure(job, connection, *exc_info):
+    """
+    rq failure callback of batch jobs, e.g. when they time out.
+    Records that the scraper errored out for the addresses
+    of the batch that were not looked up.
+    """
+    # pylint: disable=unused-argument
+    source_name = batch_source(job.id)
+    batches = Batches(connection)
+    policy = policies.RescrapePolicy(connection)
+    for address in batches.addresses(job.id):
+        policy.record_failure(address, source_name)
+
+    connection.delete(batches.addresses_key(job.id))
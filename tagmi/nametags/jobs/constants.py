@@ -1,4 +1,4 @@
-""" Module containing a list of scrapers to run. """
+""" Module containing the scrapers to run and the queues they run on. """
 # std lib imports
 
 # third party imports
@@ -7,6 +7,14 @@
 from . import scraper_jobs
 
 
+# lanes that scraper jobs are sent to, interactive work comes
+# from users waiting on a lookup, background work from bulk refreshes.
+# each lane has a queue per source, and a queue for the job that
+# runs after all the scraper jobs of an address have finished
+INTERACTIVE_LANE = "interactive"
+BACKGROUND_LANE = "background"
+lanes = [INTERACTIVE_LANE, BACKGROUND_LANE]
+
 scraper_jobs_to_run = [
     scraper_jobs.DuneScraperJob,
     scraper_jobs.EtherscanScraperJob,
@@ -15,6 +23,32 @@ scraper_jobs_to_run = [
 ]
 
 
+def source_queue_name(lane, source_name):
+    """
+    Returns the name of the queue that the jobs of
+    the given source are sent to in the given lane.
+    """
+    return f"{lane}_{source_name}"
+
+
+def refresh_job_id(address):
+    """
+    Returns the id of the job that runs after the scraper jobs of a
+    proactive refresh of the given address. It is kept apart from the
+    job with the address as its id so that the address stays fresh
+    while the refresh is in progress.
+    """
+    return f"{address}_refresh"
+
+
+def job_address(job_id):
+    """
+    Returns the address of the job that runs after the scraper jobs
+    of an address, whether or not it is a refresh job.
+    """
+    return job_id[0:42]
+
+
 def noop():
     """
     Empty function that runs after job dependencies have finished running.
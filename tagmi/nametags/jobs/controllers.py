@@ -6,11 +6,17 @@ Module containing job controllers.
 # third party imports
 from django.conf import settings
 from rq.job import JobStatus
+from rq.registry import DeferredJobRegistry
 import redis
 import rq
 
 # our imports
+from ..pubsub import publish_address_changed
+from . import batches
 from . import constants
+from . import engine
+from . import policies
+from . import popularity
 from . import queue
 
 
@@ -18,47 +24,116 @@ class ScraperJobsController():
     """
     Class that handles scraper jobs.
     """
+    # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, redis_cursor=None, redis_queue=None):
-        """ Class initialization. """
+    def __init__(self, redis_cursor=None, redis_queue=None,
+                 lane=constants.INTERACTIVE_LANE):
+        """
+        Class initialization.
+        Jobs are sent to the queue of the given lane, which should be
+        constants.INTERACTIVE_LANE when a user is waiting on the results
+        and constants.BACKGROUND_LANE for bulk or scheduled refreshes.
+        """
 
         # create redis cursor if none given
         self.redis_cursor = redis_cursor
         if self.redis_cursor is None:
             self.redis_cursor = redis.from_url(settings.REDIS_URL)
 
-        # create redis queue if none given
+        # create redis queues for the lane if none given, each source
+        # has its own queue so that a slow source only holds back itself
+        self.lane = lane
         self.redis_queue = redis_queue
+        self.source_queues = {}
         if self.redis_queue is None:
-            self.redis_queue = queue.Queue(connection=self.redis_cursor)
+            self.redis_queue = queue.Queue(
+                name=self.lane,
+                connection=self.redis_cursor
+            )
+            for source_name in self.source_names():
+                self.source_queues[source_name] = queue.Queue(
+                    name=constants.source_queue_name(self.lane, source_name),
+                    connection=self.redis_cursor
+                )
+
+        self.policy = policies.RescrapePolicy(self.redis_cursor)
+        self.batches = batches.Batches(self.redis_cursor)
+        self.retries = policies.RetryPolicy(self.redis_cursor)
+        self.popularity = popularity.PopularityTracker(self.redis_cursor)
+
+    @staticmethod
+    def source_names():
+        """
+        Returns the names of all the scraper jobs to run.
+        """
+        return [source().name for source in constants.scraper_jobs_to_run]
+
+    def source_queue(self, source_name):
+        """
+        Returns the queue that the jobs of the given source are sent to.
+        """
+        return self.source_queues.get(source_name, self.redis_queue)
 
-    def create_jobs(self, address):
+    def create_jobs(self, address, sources=None, job_id=None):
         """
         Creates a series of scraper jobs and adds them to the redis queue.
+        Only the scraper jobs named in sources are created, or all of
+        them if sources is None.
         Creates a final job that is run after all the previous
         jobs are completed. This acts as a record that all of the
         scraper jobs have finished running.
+        With the async engine, a single job runs all the scrapers
+        concurrently and acts as that record itself.
+        When batching is enabled, the address joins a batch job per
+        source that looks up several addresses instead.
         """
-        # enqueue scraper jobs
+        job_id = address if job_id is None else job_id
+        result_ttl = 0 if settings.RQ["COMPACT_JOBS"] else None
+        if settings.SCRAPE_ENGINE["ENGINE"] == "async":
+            self.redis_queue.enqueue(
+                engine.scrape_address,
+                address,
+                sources,
+                job_id=job_id,
+                job_timeout=engine.job_timeout(),
+                on_success=scrapes_finished,
+                result_ttl=result_ttl
+            )
+            return
+
+        # enqueue scraper jobs, or add the address to batch jobs
         jobs = []
         for source in constants.scraper_jobs_to_run:
             obj = source()
+            if sources is not None and obj.name not in sources:
+                continue
+
+            source_queue = self.source_queue(obj.name)
+            if self.batches.enabled:
+                jobs.append(self.batches.add(source_queue, obj, address))
+                continue
+
             jobs.append(
-                self.redis_queue.enqueue(
+                source_queue.enqueue(
                     obj.run,
-                    job_id=f"{address}_{obj.name}"
+                    job_id=f"{address}_{obj.name}",
+                    on_success=policies.record_scrape_success,
+                    on_failure=policies.record_scrape_failure
                 )
             )
 
-        # create job that depends on the previous ones finishing
+        # create job that depends on the previous ones finishing,
+        # in compact mode it is deleted as soon as it has run
         dependents = rq.job.Dependency(
             jobs=jobs,
             allow_failure=True
         )
         self.redis_queue.enqueue(
             constants.noop,
-            job_id=address,
-            depends_on=dependents
+            job_id=job_id,
+            depends_on=dependents,
+            on_success=scrapes_finished,
+            result_ttl=result_ttl
         )
 
     def enqueue_if_stale(self, address):
@@ -77,15 +152,18 @@ class ScraperJobsController():
             status = job.get_status(refresh=True)
 
             # job status is failed, stopped, cancelled
-            # requeue the job, set stale to True
+            # requeue the job unless the address is in backoff,
+            # set stale to True
             if status in [
                 JobStatus.FAILED,
                 JobStatus.STOPPED,
                 JobStatus.CANCELED
             ]:
-                self.create_jobs(address)
                 stale = True
-                enqueued = True
+                enqueued = self.retries.retry_after(address) == 0
+                if enqueued:
+                    self.retries.record_attempt(address)
+                    self.create_jobs(address)
 
             # job status is queued, started, deferred
             # do not requeue the job, set stale to True
@@ -97,6 +175,12 @@ class ScraperJobsController():
                 stale = True
                 enqueued = False
 
+                # a user is waiting on jobs that were sent to the
+                # background, move them to the interactive lane
+                if self.lane == constants.INTERACTIVE_LANE and \
+                        job.origin != self.redis_queue.name:
+                    self.promote_jobs(job)
+
             # job status is finished (successful)
             # do not queue the job, set stale to False
             elif status in [JobStatus.FINISHED]:
@@ -108,13 +192,147 @@ class ScraperJobsController():
                     f"Job {job} is in an undefined state, investigate."
                 )
 
-        # job cannot be found therefore it is stale
-        # create new job, mark sources as stale
+        # job cannot be found, the sources whose re-scrape interval
+        # has elapsed are stale, create new jobs for them
         except rq.exceptions.NoSuchJobError:
-            self.create_jobs(address)
-            stale = True
-            enqueued = True
+            stale_sources = self.policy.stale_sources(
+                address, self.source_names()
+            )
+            if stale_sources:
+                self.create_jobs(address, stale_sources)
+
+            stale = enqueued = bool(stale_sources)
 
         assert stale is not None
         assert enqueued is not None
         return (stale, enqueued)
+
+    def promote_jobs(self, job):
+        """
+        Moves the given parent job, and the scraper jobs it depends on
+        that have not started yet, to the queue of this controller.
+        """
+        def move(to_move, destination):
+            origin = queue.Queue(
+                name=to_move.origin,
+                connection=self.redis_cursor
+            )
+            if origin.remove(to_move) > 0:
+                destination.enqueue_job(to_move, at_front=True)
+
+        for dependency in job.fetch_dependencies():
+            if dependency.get_status(refresh=False) == JobStatus.QUEUED:
+                if batches.is_batch_id(dependency.id):
+                    source_name = batches.batch_source(dependency.id)
+                else:
+                    _, source_name = policies.split_job_id(dependency.id)
+                move(dependency, self.source_queue(source_name))
+
+        # the parent job is enqueued in its origin queue
+        # once its dependencies have finished running
+        status = job.get_status(refresh=False)
+        if status == JobStatus.QUEUED:
+            move(job, self.redis_queue)
+        elif status == JobStatus.DEFERRED:
+            DeferredJobRegistry(
+                job.origin,
+                connection=self.redis_cursor
+            ).remove(job)
+            job.origin = self.redis_queue.name
+            job.save()
+            job.register_dependency()
+
+    def reset_backoff(self, address):
+        """
+        Resets the re-scrape interval of every source of the given
+        address. Should be called when the tag set of the address changes.
+        """
+        self.policy.reset(address, self.source_names())
+
+    def sources_are_stale(self, address):
+        """
+        Returns True if the sources of the given address are stale,
+        without enqueueing any jobs.
+        """
+        try:
+            job = rq.job.Job.fetch(address, self.redis_cursor)
+            return job.get_status(refresh=True) != JobStatus.FINISHED
+
+        except rq.exceptions.NoSuchJobError:
+            return bool(
+                self.policy.stale_sources(address, self.source_names())
+            )
+
+    def refresh_expiring(self, address, within):
+        """
+        Creates new scraping jobs for the sources of the given address
+        whose results will be stale within the given number of seconds,
+        unless jobs are already in progress for the address or
+        the address is waiting to be retried.
+        The jobs are recorded under a refresh job id, the job with the
+        address as its id is left as is so that the address is not
+        reported as stale while it is being refreshed.
+        Returns True if jobs were enqueued, False otherwise.
+        """
+        if self.retries.retry_after(address) > 0:
+            return False
+
+        for job_id in [address, constants.refresh_job_id(address)]:
+            try:
+                job = rq.job.Job.fetch(job_id, self.redis_cursor)
+                if job.get_status(refresh=True) in [
+                    JobStatus.QUEUED,
+                    JobStatus.STARTED,
+                    JobStatus.DEFERRED
+                ]:
+                    return False
+
+            except rq.exceptions.NoSuchJobError:
+                pass
+
+        expiring = self.policy.expiring_sources(
+            address, self.source_names(), within
+        )
+        if expiring:
+            self.create_jobs(
+                address,
+                expiring,
+                job_id=constants.refresh_job_id(address)
+            )
+
+        return bool(expiring)
+
+    def record_lookup(self, address):
+        """
+        Records that a user looked up the given address.
+        """
+        self.popularity.record(address)
+
+    def retry_after(self, address):
+        """
+        Returns the number of seconds until the scraper jobs of the
+        given address may be retried after failing, or 0 if they can
+        be retried now.
+        """
+        return self.retries.retry_after(address)
+
+
+def scrapes_finished(job, connection, result):
+    """
+    rq success callback of the job that runs after all the scraper
+    jobs of an address. Clears the retries of the address and tells
+    subscribers of the address that its sources are fresh.
+    In compact mode, also deletes the scraper jobs of the address.
+    """
+    policies.clear_scrape_retries(job, connection, result)
+    publish_address_changed(
+        constants.job_address(job.id), "sources", redis_cursor=connection
+    )
+
+    # their results are recorded by the re-scrape policy,
+    # the scraper jobs are not needed anymore. batch jobs are
+    # shared with other addresses and expire on their own
+    if settings.RQ["COMPACT_JOBS"]:
+        for dependency in job.fetch_dependencies():
+            if not batches.is_batch_id(dependency.id):
+                dependency.delete()
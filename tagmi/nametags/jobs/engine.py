@@ -0,0 +1,114 @@
+"""
+Module containing the async scrape engine, which runs all the
+sources of an address concurrently in a single job instead of
+one job per source. Enabled with SCRAPE_ENGINE=async.
+"""
+# std lib imports
+import asyncio
+import logging
+
+# third party imports
+from django.conf import settings
+import rq
+
+# our imports
+from . import policies
+from .scrapers.dune import AsyncDuneScraper
+from .scrapers.etherscan import AsyncEtherscanScraper
+from .scrapers.ethleaderboard import AsyncEthleaderboardScraper
+from .scrapers.opensea import AsyncOpenseaScraper
+from .scrapers.utils import add_label_to_db
+
+
+logger = logging.getLogger(__name__)
+async_scrapers_to_run = [
+    AsyncDuneScraper,
+    AsyncEtherscanScraper,
+    AsyncOpenseaScraper,
+    AsyncEthleaderboardScraper
+]
+
+# seconds a job has on top of its slowest source to record the results
+JOB_TIMEOUT_MARGIN = 60
+
+
+def source_timeout(source_name):
+    """
+    Returns the number of seconds the given source has to finish.
+    """
+    return settings.SCRAPE_ENGINE["SOURCE_TIMEOUTS"].get(
+        source_name, settings.SCRAPE_ENGINE["SOURCE_TIMEOUT"]
+    )
+
+
+def job_timeout():
+    """
+    Returns the number of seconds a job that runs every source has to finish.
+    """
+    timeouts = [
+        source_timeout(scraper_class.name)
+        for scraper_class in async_scrapers_to_run
+    ]
+    return max(timeouts) + JOB_TIMEOUT_MARGIN
+
+
+async def run_scraper(scraper_class, address):
+    """
+    Runs the given scraper on the given address within its timeout.
+    Returns the label found, or None.
+    """
+    async with scraper_class() as scraper:
+        return await asyncio.wait_for(
+            scraper.run(address),
+            source_timeout(scraper_class.name)
+        )
+
+
+async def run_scrapers(scraper_classes, address):
+    """
+    Runs the given scrapers on the given address concurrently.
+    Returns a dictionary of scraper names to the label they found,
+    or to the exception they raised.
+    """
+    results = await asyncio.gather(
+        *[run_scraper(cls, address) for cls in scraper_classes],
+        return_exceptions=True
+    )
+    return {
+        cls.name: result for cls, result in zip(scraper_classes, results)
+    }
+
+
+def scrape_address(address, sources=None):
+    """
+    rq job that runs the scrapers named in sources, or all of them
+    if sources is None, on the given address concurrently.
+    A source that fails or times out, or whose label cannot be stored,
+    does not stop the others, the labels found are added to the database
+    and the result of every source is recorded by the re-scrape policy.
+    Returns a dictionary of scraper names to the label they found.
+    """
+    scraper_classes = [
+        cls for cls in async_scrapers_to_run
+        if sources is None or cls.name in sources
+    ]
+    results = asyncio.run(run_scrapers(scraper_classes, address))
+
+    policy = policies.RescrapePolicy(rq.get_current_job().connection)
+    labels = {}
+    for cls in scraper_classes:
+        result = results[cls.name]
+        if not isinstance(result, BaseException):
+            try:
+                add_label_to_db(result, cls.source, address)
+                policy.record_result(address, cls.name, result)
+                labels[cls.name] = result
+                continue
+            except Exception as exc:  # pylint: disable=broad-except
+                result = exc
+
+        logger.error("%s failed for %s", cls.name, address, exc_info=result)
+        policy.record_failure(address, cls.name)
+        labels[cls.name] = None
+
+    return labels
@@ -0,0 +1,121 @@
+"""
+Module containing the write-behind sink of the labels found by scrapers.
+
+Instead of adding each label to the database themselves, scraper jobs
+push it onto a redis list, and the flush_labels command adds the pending
+labels to the database a batch at a time with set-based inserts, then
+tells the subscribers of the addresses that have new nametags.
+
+A batch is claimed by moving it from the pending list to a flushing list
+in a single transaction, and the flushing list is only deleted once the
+batch is in the database. If the consumer dies in between, the batch is
+flushed again when it restarts, which adds nothing twice since labels
+that already exist are skipped.
+"""
+# std lib imports
+import json
+import logging
+
+# third party imports
+from django.conf import settings
+
+# our imports
+from ..imports import LabelImporter, NAMETAG_MAX_LENGTH, normalize_labels
+from ..pubsub import publish_address_changed
+
+
+logger = logging.getLogger(__name__)
+
+
+def trim_label(label):
+    """
+    Returns the given label, cut short with an ellipsis
+    if it is too long to be a nametag.
+    """
+    if len(label) > NAMETAG_MAX_LENGTH:
+        return label[0:NAMETAG_MAX_LENGTH - 3] + "..."
+
+    return label
+
+
+class LabelSink():
+    """
+    The labels found by scrapers that are waiting to be added to
+    the database, in redis.
+    """
+
+    pending_key = "nametags:labels:pending"
+    flushing_key = "nametags:labels:flushing"
+
+    def __init__(self, redis_cursor):
+        """ Class initialization. """
+
+        self.redis_cursor = redis_cursor
+        self.batch_size = settings.LABEL_SINK["BATCH_SIZE"]
+
+    def emit(self, label, source, address):
+        """
+        Adds the given label of the given source and address
+        to the pending labels.
+        """
+        self.redis_cursor.lpush(
+            self.pending_key, json.dumps([address, label, source])
+        )
+
+    def pending(self):
+        """ Returns the number of labels waiting to be flushed. """
+        return self.redis_cursor.llen(self.pending_key) + \
+            self.redis_cursor.llen(self.flushing_key)
+
+    def claim(self, wait=0):
+        """
+        Returns the next batch of labels to flush, oldest first, as
+        (address, label, source) tuples. A batch that was claimed but
+        not flushed is returned again. Waits up to the given number of
+        seconds for a label when none are pending.
+        """
+        claimed = self.redis_cursor.llen(self.flushing_key)
+        if claimed == 0 and wait > 0:
+            moved = self.redis_cursor.brpoplpush(
+                self.pending_key, self.flushing_key, timeout=wait
+            )
+            claimed = int(moved is not None)
+
+        if claimed > 0 or wait == 0:
+            with self.redis_cursor.pipeline() as pipe:
+                for _ in range(self.batch_size - claimed):
+                    pipe.rpoplpush(self.pending_key, self.flushing_key)
+                pipe.execute()
+
+        # labels are moved to the head of the flushing list
+        entries = self.redis_cursor.lrange(self.flushing_key, 0, -1)
+        return [tuple(json.loads(entry)) for entry in reversed(entries)]
+
+    def flush(self, entries):
+        """
+        Adds the given claimed labels to the database, a source at a time,
+        publishes the addresses that have new nametags, and releases the
+        batch. Returns the number of new nametags.
+        """
+        rows = {}
+        for address, label, source in entries:
+            rows.setdefault(source, []).append((address, trim_label(label)))
+
+        changed = set()
+        for source, source_rows in rows.items():
+            labels, invalid = normalize_labels(source_rows)
+            if invalid:
+                logger.warning(
+                    "dropped %s invalid labels of %s", invalid, source
+                )
+            with LabelImporter(source) as importer:
+                _, created = importer.merge_created(labels)
+            changed.update(created)
+
+        with self.redis_cursor.pipeline() as pipe:
+            for address in {address for address, _ in changed}:
+                publish_address_changed(address, "tags", redis_cursor=pipe)
+            pipe.delete(self.flushing_key)
+            pipe.execute()
+
+        return len(changed)
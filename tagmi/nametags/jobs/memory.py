@@ -0,0 +1,83 @@
+"""
+Module containing the accounting of the redis memory used by
+scraper jobs and the data kept alongside them.
+"""
+# std lib imports
+import re
+
+# third party imports
+
+# our imports
+
+
+# families of keys, the first pattern that matches a key is its family
+KEY_FAMILIES = [
+    ("address jobs", re.compile(r"^rq:job:0x[0-9a-f]{40}(_refresh)?$")),
+    ("scraper jobs", re.compile(r"^rq:job:0x[0-9a-f]{40}_[^:]+$")),
+    ("job dependencies", re.compile(r"^rq:job:.+:(dependents|dependencies)$")),
+    ("other jobs", re.compile(r"^rq:job:")),
+    ("job registries", re.compile(
+        r"^rq:(finished|failed|deferred|started|scheduled|canceled):"
+    )),
+    ("queues", re.compile(r"^rq:queues?(:|$)")),
+    ("workers", re.compile(r"^rq:workers?(:|$)")),
+    ("rescrape freshness", re.compile(r"^nametags:rescrape:.+:fresh$")),
+    ("rescrape backoff", re.compile(r"^nametags:rescrape:.+:misses$")),
+    ("scrape retries", re.compile(r"^nametags:retry:")),
+    ("scrape batches", re.compile(r"^nametags:batch:")),
+    ("rate limits", re.compile(r"^nametags:ratelimit:")),
+    ("scraper sessions", re.compile(r"^nametags:session:")),
+    ("scraper pages", re.compile(r"^nametags:page:")),
+    ("ens names", re.compile(r"^nametags:ens:")),
+    ("leaderboard mirror", re.compile(r"^nametags:leaderboard:")),
+    ("label sink", re.compile(r"^nametags:labels:")),
+    ("popularity", re.compile(r"^nametags:popularity$")),
+]
+OTHER_FAMILY = "other"
+
+
+def key_family(key):
+    """
+    Returns the name of the family of the given key.
+    """
+    for family, pattern in KEY_FAMILIES:
+        if pattern.match(key):
+            return family
+
+    return OTHER_FAMILY
+
+
+def memory_by_family(redis_cursor, match=None, batch_size=1000, samples=5):
+    """
+    Returns a dictionary of key family names to a tuple of
+    (number of keys, bytes used) for the keys matching the given pattern.
+    Memory is measured with MEMORY USAGE in batches of the given size,
+    samples is the number of nested values sampled per key.
+    """
+    usage = {}
+
+    def measure(keys):
+        with redis_cursor.pipeline(transaction=False) as pipeline:
+            for key in keys:
+                pipeline.memory_usage(key, samples=samples)
+            sizes = pipeline.execute()
+
+        for key, size in zip(keys, sizes):
+            # keys that expired since they were scanned have no size
+            if size is None:
+                continue
+
+            count, total = usage.get(key_family(key), (0, 0))
+            usage[key_family(key)] = (count + 1, total + size)
+
+    batch = []
+    for key in redis_cursor.scan_iter(match=match, count=batch_size):
+        batch.append(key.decode())
+        if len(batch) >= batch_size:
+            measure(batch)
+            batch = []
+
+    if batch:
+        measure(batch)
+
+    return usage
@@ -0,0 +1,287 @@
+"""
+Module containing the policies that decide when an address's sources
+should be scraped again.
+"""
+# std lib imports
+import math
+import time
+
+# third party imports
+from django.conf import settings
+
+# our imports
+
+
+class RescrapePolicy():
+    """
+    Tracks, per address and per source, how long a scrape result stays fresh.
+
+    Every time a source returns no label for an address the re-scrape
+    interval for that source grows exponentially, up to a maximum.
+    The interval goes back to the base interval when the source returns
+    a label, or when the tag set of the address changes.
+
+    Freshness is stored in redis as a marker key that expires once the
+    interval has elapsed, so a source is stale when its marker is missing.
+    """
+
+    key_prefix = "nametags:rescrape"
+
+    def __init__(self, redis_cursor):
+        """ Class initialization. """
+
+        self.redis_cursor = redis_cursor
+        self.base_interval = settings.RESCRAPE["BASE_INTERVAL"]
+        self.max_interval = settings.RESCRAPE["MAX_INTERVAL"]
+        self.multiplier = settings.RESCRAPE["MULTIPLIER"]
+
+    def fresh_key(self, address, source):
+        """
+        Returns the key of the marker that exists while
+        the results of a source are fresh.
+        """
+        return f"{self.key_prefix}:{address}:{source}:fresh"
+
+    def misses_key(self, address, source):
+        """
+        Returns the key of the counter of consecutive
+        scrapes for which a source returned no label.
+        """
+        return f"{self.key_prefix}:{address}:{source}:misses"
+
+    def interval(self, misses):
+        """
+        Returns the number of seconds a result stays fresh after
+        the given number of consecutive scrapes without a label.
+        """
+        interval = self.base_interval * (self.multiplier ** misses)
+        return min(interval, self.max_interval)
+
+    def stale_sources(self, address, sources):
+        """
+        Returns the subset of the given source names
+        whose results are stale for the given address.
+        """
+        with self.redis_cursor.pipeline() as pipe:
+            for source in sources:
+                pipe.exists(self.fresh_key(address, source))
+            fresh = pipe.execute()
+
+        return [
+            source for source, exists in zip(sources, fresh) if not exists
+        ]
+
+    def expiring_sources(self, address, sources, within):
+        """
+        Returns the subset of the given source names whose results
+        are stale, or will be within the given number of seconds.
+        """
+        with self.redis_cursor.pipeline() as pipe:
+            for source in sources:
+                pipe.ttl(self.fresh_key(address, source))
+            ttls = pipe.execute()
+
+        # ttl is negative when the key does not exist
+        return [
+            source for source, ttl in zip(sources, ttls) if ttl < within
+        ]
+
+    def record_result(self, address, source, label):
+        """
+        Records the result of a scrape and marks the source as fresh
+        for an interval that depends on how many scrapes in a row
+        have returned no label.
+        Returns the interval in seconds.
+        """
+        misses_key = self.misses_key(address, source)
+
+        # label found, go back to the base interval
+        if label is not None:
+            misses = 0
+            self.redis_cursor.delete(misses_key)
+
+        # no label, back off a little more
+        else:
+            misses = self.redis_cursor.incr(misses_key)
+            self.redis_cursor.expire(misses_key, self.max_interval * 2)
+
+            # the interval should start growing after the second miss
+            misses -= 1
+
+        interval = self.interval(misses)
+        self.redis_cursor.set(
+            self.fresh_key(address, source), interval, ex=interval
+        )
+
+        return interval
+
+    def record_failure(self, address, source):
+        """
+        Marks the source as fresh for the base interval without
+        changing its backoff, so that a failing source is not
+        retried on every lookup of the address.
+        """
+        self.redis_cursor.set(
+            self.fresh_key(address, source),
+            self.base_interval,
+            ex=self.base_interval
+        )
+
+    def reset(self, address, sources):
+        """
+        Resets the backoff of the given sources for the given address,
+        e.g. because the tag set of the address has changed.
+        Sources that were marked fresh for longer than the base
+        interval will become stale once the base interval has elapsed.
+        """
+        for source in sources:
+            self.redis_cursor.delete(self.misses_key(address, source))
+
+            fresh_key = self.fresh_key(address, source)
+            if self.redis_cursor.ttl(fresh_key) > self.base_interval:
+                self.redis_cursor.expire(fresh_key, self.base_interval)
+
+
+class RetryPolicy():
+    """
+    Tracks retries of addresses whose scraper jobs keep failing.
+
+    Every retry of an address waits exponentially longer than the
+    previous one, up to a maximum delay. Once an address has been
+    retried the maximum number of times, it is only retried again
+    after the base re-scrape interval.
+
+    The time at which each address may be retried is stored in a
+    redis sorted set, so that addresses in backoff can be listed.
+    """
+
+    key_prefix = "nametags:retry"
+    backoff_key = "nametags:retry:backoff"
+
+    def __init__(self, redis_cursor):
+        """ Class initialization. """
+
+        self.redis_cursor = redis_cursor
+        self.base_delay = settings.SCRAPE_RETRY["BASE_DELAY"]
+        self.max_delay = settings.SCRAPE_RETRY["MAX_DELAY"]
+        self.max_retries = settings.SCRAPE_RETRY["MAX_RETRIES"]
+        self.give_up_interval = settings.RESCRAPE["BASE_INTERVAL"]
+
+    def attempts_key(self, address):
+        """
+        Returns the key of the counter of retries of an address.
+        """
+        return f"{self.key_prefix}:{address}:attempts"
+
+    def delay(self, attempts):
+        """
+        Returns the number of seconds to wait
+        after the given number of retries.
+        """
+        if attempts >= self.max_retries:
+            return self.give_up_interval
+
+        delay = self.base_delay * (2 ** (attempts - 1))
+        return min(delay, self.max_delay)
+
+    def retry_after(self, address):
+        """
+        Returns the number of seconds until the given address
+        may be retried, or 0 if it can be retried now.
+        """
+        retry_at = self.redis_cursor.zscore(self.backoff_key, address)
+        if retry_at is None:
+            return 0
+
+        return max(0, math.ceil(retry_at - time.time()))
+
+    def record_attempt(self, address):
+        """
+        Records a retry of the given address.
+        Returns the number of seconds until the next retry is allowed.
+        """
+        attempts_key = self.attempts_key(address)
+        attempts = self.redis_cursor.incr(attempts_key)
+        self.redis_cursor.expire(attempts_key, self.give_up_interval * 2)
+
+        delay = self.delay(attempts)
+        self.redis_cursor.zadd(
+            self.backoff_key, {address: time.time() + delay}
+        )
+
+        return delay
+
+    def clear(self, address):
+        """
+        Clears the retries of the given address,
+        e.g. because its scraper jobs have finished running.
+        """
+        self.redis_cursor.delete(self.attempts_key(address))
+        self.redis_cursor.zrem(self.backoff_key, address)
+
+    def in_backoff(self, include_elapsed=False):
+        """
+        Returns a list of (address, attempts, retry_after) tuples for the
+        addresses that are waiting to be retried, soonest first.
+        Addresses whose backoff has elapsed are only included if
+        include_elapsed is True.
+        Forgets addresses that have not been retried for a long time.
+        """
+        now = time.time()
+        self.redis_cursor.zremrangebyscore(
+            self.backoff_key, "-inf", now - self.give_up_interval * 2
+        )
+
+        min_score = "-inf" if include_elapsed else now
+        entries = self.redis_cursor.zrangebyscore(
+            self.backoff_key, min_score, "+inf", withscores=True
+        )
+
+        to_ret = []
+        for address, retry_at in entries:
+            address = address.decode()
+            attempts = self.redis_cursor.get(self.attempts_key(address))
+            to_ret.append((
+                address,
+                int(attempts or 0),
+                max(0, math.ceil(retry_at - now))
+            ))
+
+        return to_ret
+
+
+def split_job_id(job_id):
+    """
+    Returns a tuple of (address, source) for a scraper job id
+    in the format {address}_{source}.
+    """
+    return (job_id[0:42], job_id[43:])
+
+
+def record_scrape_success(job, connection, result):
+    """
+    rq success callback of scraper jobs.
+    Records the label that the scraper returned.
+    """
+    address, source = split_job_id(job.id)
+    RescrapePolicy(connection).record_result(address, source, result)
+
+
+def record_scrape_failure(job, connection, *exc_info):
+    """
+    rq failure callback of scraper jobs.
+    Records that the scraper errored out.
+    """
+    # pylint: disable=unused-argument
+    address, source = split_job_id(job.id)
+    RescrapePolicy(connection).record_failure(address, source)
+
+
+def clear_scrape_retries(job, connection, result):
+    """
+    rq success callback of the job that runs after all the scraper
+    jobs of an address. Clears the retries of the address.
+    The job id starts with the address, refresh jobs have a suffix.
+    """
+    # pylint: disable=unused-argument
+    RetryPolicy(connection).clear(job.id[0:42])
@@ -0,0 +1,49 @@
+"""
+Module containing the tracker of how often addresses are looked up.
+"""
+# std lib imports
+
+# third party imports
+
+# our imports
+
+
+class PopularityTracker():
+    """
+    Tracks how often addresses are looked up in a redis sorted set.
+
+    Every lookup adds 1 to the score of the address. Scores are
+    periodically decayed so that they reflect recent lookups, and
+    the set is trimmed to the most popular addresses to bound its size.
+    """
+
+    key = "nametags:popularity"
+
+    def __init__(self, redis_cursor):
+        """ Class initialization. """
+
+        self.redis_cursor = redis_cursor
+
+    def record(self, address):
+        """
+        Records a lookup of the given address.
+        """
+        self.redis_cursor.zincrby(self.key, 1, address)
+
+    def hottest(self, count):
+        """
+        Returns a list of the given number of most looked up
+        addresses, most popular first.
+        """
+        addresses = self.redis_cursor.zrevrange(self.key, 0, count - 1)
+        return [address.decode() for address in addresses]
+
+    def decay(self, factor, keep):
+        """
+        Multiplies every score by the given factor and
+        only keeps the given number of most popular addresses.
+        """
+        self.redis_cursor.zunionstore(
+            self.key, {self.key: factor}, aggregate="SUM"
+        )
+        self.redis_cursor.zremrangebyrank(self.key, 0, -(keep + 1))
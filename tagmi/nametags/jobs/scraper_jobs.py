@@ -6,6 +6,8 @@ Module containing scraper jobs.
 # third party imports
 
 # our imports
+from . import batches
+from .scrapers import sessions
 from .scrapers.dune import DuneScraper
 from .scrapers.etherscan import EtherscanScraper
 from .scrapers.ethleaderboard import EthleaderboardScraper
@@ -22,10 +24,31 @@ class ScraperJob():
         """ Returns name of scraper job. Should be implemented by child. """
         raise NotImplementedError("Must subclass and override this method.")
 
-    def run(self):
-        """ Does work. Should be implemented by child. """
+    @property
+    def scraper_class(self):
+        """
+        Returns the class of the scraper the job runs.
+        Should be implemented by child.
+        """
         raise NotImplementedError("Must subclass and override this method.")
 
+    def run(self):
+        """
+        Runs the scraper on the address of the current job with
+        the session of the worker process.
+        """
+        return sessions.registry.get(self.scraper_class).run()
+
+    def run_batch(self, queue_name):
+        """
+        Runs the scraper on every address of the batch of the current job,
+        which was opened in the given queue, with the session of the
+        worker process.
+        """
+        return batches.scrape_batch(
+            sessions.registry.get(self.scraper_class), queue_name
+        )
+
 
 class EtherscanScraperJob(ScraperJob):
     """
@@ -38,12 +61,11 @@ class EtherscanScraperJob(ScraperJob):
 
         return "etherscan_scraper"
 
-    def run(self):
-        """
-        Runs the etherscan scraper.
-        """
-        scraper = EtherscanScraper()
-        return scraper.run()
+    @property
+    def scraper_class(self):
+        """ Returns the class of the scraper the job runs. """
+
+        return EtherscanScraper
 
 
 class DuneScraperJob(ScraperJob):
@@ -57,12 +79,11 @@ class DuneScraperJob(ScraperJob):
 
         return "dune_scraper"
 
-    def run(self):
-        """
-        Runs the dune scraper.
-        """
-        scraper = DuneScraper()
-        return scraper.run()
+    @property
+    def scraper_class(self):
+        """ Returns the class of the scraper the job runs. """
+
+        return DuneScraper
 
 
 class OpenseaScraperJob(ScraperJob):
@@ -76,12 +97,11 @@ class OpenseaScraperJob(ScraperJob):
 
         return "opensea_scraper"
 
-    def run(self):
-        """
-        Runs the dune scraper.
-        """
-        scraper = OpenseaScraper()
-        return scraper.run()
+    @property
+    def scraper_class(self):
+        """ Returns the class of the scraper the job runs. """
+
+        return OpenseaScraper
 
 
 class EthleaderboardScraperJob(ScraperJob):
@@ -95,9 +115,8 @@ class EthleaderboardScraperJob(ScraperJob):
 
         return "ethleaderboard_scraper"
 
-    def run(self):
-        """
-        Runs the ethleaderboard scraper.
-        """
-        scraper = EthleaderboardScraper()
-        return scraper.run()
+    @property
+    def scraper_class(self):
+        """ Returns the class of the scraper the job runs. """
+
+        return EthleaderboardScraper
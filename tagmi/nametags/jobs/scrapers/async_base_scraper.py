@@ -0,0 +1,63 @@
+"""
+Module containing base class for async scrapers.
+"""
+# std lib imports
+import asyncio
+
+# third party imports
+import aiohttp
+
+# our imports
+from . import constants
+from .rate_limiter import RateLimiter
+from .utils import redis_connection
+
+
+class AsyncBaseScraper():
+    """
+    Base class that async scrapers should inherit
+    to properly configure their settings.
+    Each scraper has its own session, so cookies are not
+    shared between sources. Use it as an async context manager.
+    Requests are paced by the same rate limiter as the other scrapers.
+    """
+
+    # name of the scraper job of the same source
+    name = None
+
+    # source recorded on the tags the scraper finds
+    source = None
+
+    def __init__(self):
+        self.headers = dict(constants.HEADERS)
+        self.session = None
+        self.rate_limiter = RateLimiter(redis_connection())
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def fetch(self, method, url, **kwargs):
+        """
+        Makes a request with the headers of the scraper and returns
+        the body of the response as text.
+        Raises an exception on 4xx and 5xx responses.
+        """
+        # redis is blocking so the token is taken in a thread
+        await asyncio.sleep(
+            await asyncio.to_thread(self.rate_limiter.delay, url)
+        )
+        async with self.session.request(
+            method, url, headers=self.headers, raise_for_status=True, **kwargs
+        ) as resp:
+            return await resp.text()
+
+    async def run(self, address):
+        """
+        Looks up the given address and returns its label, or None.
+        Should be implemented by child.
+        """
+        raise NotImplementedError("Must subclass and override this method.")
@@ -2,29 +2,272 @@
 Module containing base class for scrapers.
 """
 # std lib imports
+import hashlib
 
 # third party imports
+from django.conf import settings
 import requests
+import rq
 
 # our imports
 from . import constants
+from .page_cache import PageCache
+from .rate_limiter import RateLimiter
+from .session_cache import SessionCache
+from .sessions import adapters
+from .utils import add_label_to_db, redis_connection
+
+
+# status codes of the responses of sources that reject a session
+REJECTED_STATUS_CODES = [401, 403, 419]
 
 
 class BaseScraper(requests.Session):
     """
     Base class that scrapers should inherit
     to properly configure their settings.
+
+    Scrapers implement lookup, which looks up a single address, and
+    prepare, which makes the requests a session needs once before its
+    lookups, e.g. to get cookies. A session can look up many addresses,
+    and scrapers that can fetch something for many addresses at once
+    override prefetch, which batches call before their lookups.
+
+    The state of a prepared session is shared with the other scrapers of
+    the source through the session cache. Scrapers that keep more state
+    than cookies, e.g. a csrf token, override save_state and load_state.
+
+    Scrapers fetch the pages they parse with get_page, so that a page
+    that has not changed since it was last scraped is not parsed again,
+    and its label is not added to the database again.
     """
+    # pylint: disable=too-many-instance-attributes
+
+    # name of the source, as stored in the tags table
+    source = None
 
     def __init__(self):
         super().__init__()
         self.headers.update(constants.HEADERS)
+        for prefix, adapter in adapters.items():
+            self.mount(prefix, adapter)
+
+        # True once the session is prepared for lookups,
+        # and whether it was prepared by another scraper
+        self.warm = False
+        self.reused = False
+
+        # entries of the pages fetched by the current lookup,
+        # and the urls of those that changed since they were last scraped
+        self.pages = {}
+        self.changed_pages = set()
+
+        connection = redis_connection()
+        self.rate_limiter = RateLimiter(connection)
+        self.session_cache = SessionCache(connection)
+        self.page_cache = PageCache(connection)
+
+    def run(self):
+        """
+        Looks up the address of the current rq job.
+        If the address has an associated label, the label is
+        added to the nametags table of the database.
+        Returns the label if it is found.
+        Returns None if no label is found.
+        """
+        address = rq.get_current_job().get_id()[0:42]
+        label = self.scrape(address)
+
+        # store label in database
+        self.store(label, address)
+
+        return label
+
+    def scrape(self, address):
+        """
+        Returns the label of the given address, or None.
+        If the source rejects a session that was prepared before the
+        lookup, e.g. by another scraper or for an earlier job whose
+        cookies have expired since, the session is reset and prepared
+        again and the lookup retried once.
+        """
+        was_warm = self.warm
+        self.pages = {}
+        self.changed_pages = set()
+        try:
+            return self.lookup(address)
+
+        except requests.HTTPError as exc:
+            prepared_now = not was_warm and not self.reused
+            if prepared_now or \
+                    exc.response.status_code not in REJECTED_STATUS_CODES:
+                raise
+
+        self.session_cache.forget(self.source)
+        self.reset()
+        self.pages = {}
+        self.changed_pages = set()
+
+        return self.lookup(address)
+
+    def store(self, label, address):
+        """
+        Adds the label found by the last lookup of the given address to
+        the database, unless every page it was parsed from is unchanged,
+        then saves the pages to the page cache.
+        The pages are forgotten when the tag of the source is deleted,
+        so that the label is added back, see nametags/signals.py.
+        """
+        if not self.pages or self.changed_pages:
+            add_label_to_db(label, self.source, address)
+
+        self.page_cache.save(self.pages, self.source, address)
+
+    def get_page(self, url, parse):
+        """
+        Makes a conditional GET request to the given url and returns the
+        label parsed from the page by the given function.
+        If the source answers 304 Not Modified, or the content of the page
+        is the same as when it was last scraped, the page is not parsed
+        and the label parsed back then is returned.
+        A scraper fetches one page at a time, pages fetched from another
+        thread at once go through a fork of the scraper.
+        """
+        entry = self.page_cache.load(url)
+        resp = self.get(url, headers=self.page_cache.validators(entry))
+        digest = hashlib.sha256(resp.content).hexdigest()
+
+        unchanged = entry is not None and \
+            (resp.status_code == 304 or digest == entry["digest"])
+        if not unchanged:
+            entry = {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "digest": digest,
+                "label": parse(resp.text)
+            }
+
+        self.pages[url] = entry
+        if not unchanged:
+            self.changed_pages.add(url)
+
+        return entry["label"]
+
+    def reset(self):
+        """
+        Resets the headers and cookies of the session
+        to those of a new session, which is not warm.
+        """
+        self.headers = requests.utils.default_headers()
+        self.headers.update(constants.HEADERS)
+        self.cookies.clear()
+        self.warm = self.reused = False
+
+    def warm_up(self):
+        """
+        Prepares the session for lookups, unless it is already warm.
+        The saved state of the source is used if there is one, otherwise
+        the session is prepared and its state saved.
+        """
+        if self.warm:
+            return
+
+        state = self.session_cache.load(self.source)
+        if state is not None:
+            self.load_state(state)
+        else:
+            self.prepare()
+            self.session_cache.save(self.source, self.save_state())
+
+        self.warm = True
+        self.reused = state is not None
+
+    def fork(self):
+        """
+        Returns a new scraper of the same class with the state of this
+        warm session, e.g. to fetch a page from another thread, as the
+        cookies of a session are not safe to share between threads.
+        The redis connection is safe to share, and is shared.
+        The pages it fetches are added to those of the current lookup
+        with join.
+        """
+        scraper = type(self)()
+        scraper.rate_limiter = self.rate_limiter
+        scraper.session_cache = self.session_cache
+        scraper.page_cache = self.page_cache
+        scraper.load_state(self.save_state())
+        scraper.warm = True
+        scraper.reused = self.reused
+        return scraper
+
+    def join(self, scraper):
+        """
+        Adds the pages fetched by the given fork to those of the current
+        lookup, so that they are saved to the page cache with them.
+        """
+        self.pages.update(scraper.pages)
+        self.changed_pages.update(scraper.changed_pages)
+
+    def prepare(self):
+        """
+        Makes the requests that are needed once per session.
+        Does nothing by default.
+        """
+
+    def prefetch(self, addresses):
+        """
+        Fetches what the lookups of the given addresses need at once,
+        e.g. for a batch, before they are looked up one by one.
+        Does nothing by default.
+        """
+
+    def save_state(self):
+        """
+        Returns the state of the prepared session as a dictionary that
+        can be serialized to json. Saves the cookies by default.
+        """
+        return {
+            "cookies": [
+                {
+                    "name": cookie.name,
+                    "value": cookie.value,
+                    "domain": cookie.domain,
+                    "path": cookie.path,
+                    "expires": cookie.expires,
+                    "secure": cookie.secure
+                }
+                for cookie in self.cookies
+            ]
+        }
+
+    def load_state(self, state):
+        """
+        Restores the state of a session returned by save_state.
+        """
+        for cookie in state["cookies"]:
+            self.cookies.set(**cookie)
+
+    def lookup(self, address):
+        """
+        Returns the label of the given address, or None.
+        Should be implemented by child.
+        """
+        raise NotImplementedError("Must subclass and override this method.")
+
+    def close(self):
+        """
+        Override requests.Session.close to keep
+        the shared connection pools open.
+        """
 
     def request(self, method, url, *args, **kwargs):
         """
-        Override requests.Session.request to always raise
-        exception on 4xx and 5xx responses.
+        Override requests.Session.request to wait for the rate limiter,
+        to time out after SCRAPE_HTTP["TIMEOUT"] seconds by default,
+        and to always raise exception on 4xx and 5xx responses.
         """
+        kwargs.setdefault("timeout", settings.SCRAPE_HTTP["TIMEOUT"])
+        self.rate_limiter.wait(url)
         resp = super().request(method, url, *args, **kwargs)
         resp.raise_for_status()
         return resp
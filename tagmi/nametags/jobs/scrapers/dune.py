@@ -2,15 +2,14 @@
 Module containing etherscan scraper.
 """
 # std lib imports
+import json
 import logging
-import time
 
 # third party imports
-import rq
 
 # our imports
+from .async_base_scraper import AsyncBaseScraper
 from .base_scraper import BaseScraper
-from .utils import add_label_to_db
 
 
 logger = logging.getLogger(__name__)
@@ -41,18 +40,21 @@ class DuneScraper(BaseScraper):
     Dune scraper.
     """
 
-    def run(self):
+    source = "dune"
+
+    def __init__(self):
+        super().__init__()
+
+        # csrf token of the session, set once it is prepared
+        self.csrf = None
+
+    def prepare(self):
         """
-        Looks up an address on Dune labels.
-        If the address has an associated label, the label is
-        added to the nametags table of the database.
-        Returns a list of labels if they are found.
-        Returns None if no label is found.
+        Visits the dune labels home page and gets a csrf token.
         """
         # make request to dune labels home page
         logger.info("making GET to dune labels home page")
         self.get("https://dune.com/labels")
-        time.sleep(2)
 
         # update headers and make csrf request
         logger.info("making POST to dune csrf endpoint")
@@ -60,23 +62,51 @@ class DuneScraper(BaseScraper):
         self.headers.pop("Sec-Fetch-User")
         resp = self.post("https://dune.com/api/auth/csrf")
         data = resp.json()
-        csrf = data["csrf"]
-        time.sleep(1)
+        self.csrf = data["csrf"]
+
+    def save_state(self):
+        """
+        Returns the cookies and the csrf token of the session.
+        """
+        return dict(super().save_state(), csrf=self.csrf)
+
+    def load_state(self, state):
+        """
+        Restores the cookies and the csrf token of a session.
+        """
+        super().load_state(state)
+        self.headers.update(csrf_req_headers)
+        self.headers.pop("Sec-Fetch-User")
+        self.csrf = state["csrf"]
+
+    def lookup(self, address):
+        """
+        Looks up an address on Dune labels.
+        Returns a list of labels if they are found.
+        Returns None if no label is found.
+        """
+        self.warm_up()
 
         # update headers and make labels list request
-        address = rq.get_current_job().get_id()[0:42]
         self.headers.update(
             get_labels_req_headers(address)
         )
         logger.info("making POST to dune list labels")
-        body = {"csrf": csrf, "address_id": f"\\x{address[2:]}"}
+        body = {"csrf": self.csrf, "address_id": f"\\x{address[2:]}"}
         resp = self.post(
             "https://dune.com/api/labels/list",
             json=body
         )
-        data = resp.json()
 
-        # build nametag from labels
+        return self.build_nametag(resp.json())
+
+    @staticmethod
+    def build_nametag(data):
+        """
+        Returns a nametag built from the labels in the
+        response data of the list labels request.
+        Returns None if there are no labels.
+        """
         nametag = ""
         count = 0
         for item in data:
@@ -97,9 +127,46 @@ class DuneScraper(BaseScraper):
             return None
 
         # strip ", " from beginning of nametag
-        nametag = nametag[2:]
+        return nametag[2:]
+
 
-        # store nametag in database and return it
-        add_label_to_db(nametag, "dune", address)
+class AsyncDuneScraper(AsyncBaseScraper):
+    """
+    Dune scraper that runs on asyncio.
+    """
+
+    name = "dune_scraper"
+    source = "dune"
+
+    async def run(self, address):
+        """
+        Looks up an address on Dune labels.
+        Returns a list of labels if they are found.
+        Returns None if no label is found.
+        """
+        # make request to dune labels home page
+        logger.info("making GET to dune labels home page")
+        await self.fetch("GET", "https://dune.com/labels")
+
+        # update headers and make csrf request
+        logger.info("making POST to dune csrf endpoint")
+        self.headers.update(csrf_req_headers)
+        self.headers.pop("Sec-Fetch-User")
+        data = json.loads(
+            await self.fetch("POST", "https://dune.com/api/auth/csrf")
+        )
+        csrf = data["csrf"]
+
+        # update headers and make labels list request
+        self.headers.update(
+            get_labels_req_headers(address)
+        )
+        logger.info("making POST to dune list labels")
+        body = {"csrf": csrf, "address_id": f"\\x{address[2:]}"}
+        data = json.loads(
+            await self.fetch(
+                "POST", "https://dune.com/api/labels/list", json=body
+            )
+        )
 
-        return nametag
+        return DuneScraper.build_nametag(data)
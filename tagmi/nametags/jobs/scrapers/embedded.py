@@ -0,0 +1,77 @@
+"""
+Module containing the extraction of values from the JSON payloads
+that pages embed in script elements, e.g. the __NEXT_DATA__ of pages
+rendered by next.js.
+"""
+# std lib imports
+import json
+import re
+
+# third party imports
+
+# our imports
+
+
+decoder = json.JSONDecoder()
+
+
+class EmbeddedJSON():
+    """
+    The JSON payload of the script element with the given id in a page.
+
+    The payload is located with a plain search of the page and only the
+    values looked up are decoded, not the whole payload, which can be
+    much larger than the values. Keys are searched for in the order they
+    appear in the payload, from the end of the last key or value found,
+    so a key can be looked up inside the value of the key before it.
+    A key is found whatever object it is in, so the values of a given
+    object should be read from that object once it is decoded.
+    """
+
+    def __init__(self, html_content, script_id):
+        """ Class initialization. """
+
+        self.position = self.end = -1
+        start = html_content.find(f'<script id="{script_id}"')
+        if start != -1:
+            start = html_content.find(">", start) + 1
+            self.end = html_content.find("</script>", start)
+            self.position = start if self.end != -1 else -1
+
+        self.html_content = html_content
+
+    @property
+    def found(self):
+        """
+        Whether the page has the payload.
+        """
+        return self.position != -1
+
+    def seek(self, *keys):
+        """
+        Moves to the value of each of the given keys in turn.
+        Raises a KeyError if one of them is not found.
+        """
+        for key in keys:
+            match = None
+            if self.found:
+                pattern = re.compile(rf'"{re.escape(key)}"\s*:\s*')
+                match = pattern.search(
+                    self.html_content, self.position, self.end
+                )
+            if match is None:
+                raise KeyError(key)
+            self.position = match.end()
+
+    def get(self, *keys):
+        """
+        Returns the decoded value of the last of the given keys,
+        after moving to the value of each of them in turn.
+        Raises a KeyError if one of them is not found.
+        """
+        self.seek(*keys)
+        value, self.position = decoder.raw_decode(
+            self.html_content, self.position
+        )
+
+        return value
@@ -0,0 +1,150 @@
+"""
+Module containing the reverse resolution of addresses to ENS names,
+with a cache of the names resolved.
+"""
+# std lib imports
+import logging
+
+# third party imports
+from django.conf import settings
+import ens
+import web3
+
+# our imports
+from .utils import redis_connection, web3_provider
+
+
+logger = logging.getLogger(__name__)
+
+# ENS ReverseRecords contract on mainnet, which reverse resolves many
+# addresses in a single call, and checks that each name resolves back
+# to its address like ens.ENS.name does
+REVERSE_RECORDS_ADDRESS = "0x3671aE578E63FdF66ad4F3E12CC0c0d71Ac7510C"
+REVERSE_RECORDS_ABI = [{
+    "inputs": [{
+        "internalType": "address[]", "name": "addresses", "type": "address[]"
+    }],
+    "name": "getNames",
+    "outputs": [{"internalType": "string[]", "name": "r", "type": "string[]"}],
+    "stateMutability": "view",
+    "type": "function"
+}]
+
+
+class EnsCache():
+    """
+    Remembers the ENS name each address reverse resolves to, and the
+    addresses that have none, which are most of them.
+
+    Names expire after TTL seconds, and addresses without a name after
+    NEGATIVE_TTL seconds, since an address rarely gets a name.
+    Addresses without a name are stored with an empty name.
+    """
+
+    key_prefix = "nametags:ens"
+
+    def __init__(self, redis_cursor):
+        """ Class initialization. """
+
+        self.redis_cursor = redis_cursor
+        self.ttl = settings.ENS_NAMES["TTL"]
+        self.negative_ttl = settings.ENS_NAMES["NEGATIVE_TTL"]
+
+    def key(self, address):
+        """
+        Returns the key of the name of the given address.
+        """
+        return f"{self.key_prefix}:{address.lower()}"
+
+    def load(self, addresses):
+        """
+        Returns a dictionary of the given addresses that are cached
+        to their ENS name, or None if they have none.
+        """
+        if len(addresses) == 0:
+            return {}
+
+        names = self.redis_cursor.mget(
+            [self.key(address) for address in addresses]
+        )
+
+        return {
+            address: name.decode() or None
+            for address, name in zip(addresses, names) if name is not None
+        }
+
+    def save(self, names):
+        """
+        Saves the given dictionary of addresses to their ENS name,
+        or None if they have none.
+        """
+        with self.redis_cursor.pipeline(transaction=False) as pipe:
+            for address, name in names.items():
+                ttl = self.ttl if name is not None else self.negative_ttl
+                if ttl > 0:
+                    pipe.set(self.key(address), name or "", ex=ttl)
+            pipe.execute()
+
+
+def resolve_name(address):
+    """
+    Returns the ENS name the given address reverse resolves to,
+    or None if it has none.
+    """
+    return resolve_names([address])[address]
+
+
+def resolve_names(addresses):
+    """
+    Returns a dictionary of the given addresses to the ENS name they
+    reverse resolve to, or None. Addresses that are not cached are
+    resolved at once, and cached.
+    """
+    cache = EnsCache(redis_connection())
+    names = cache.load(addresses)
+    missing = [address for address in addresses if address not in names]
+    if len(missing) == 0:
+        return names
+
+    if len(missing) == 1:
+        logger.info("resolving %s to an ENS name", missing[0])
+        resolved = {missing[0]: ens.ENS(web3_provider).name(missing[0])}
+    else:
+        resolved = lookup_names(missing)
+
+    cache.save(resolved)
+    names.update(resolved)
+
+    return names
+
+
+def lookup_names(addresses):
+    """
+    Returns a dictionary of the given addresses to the ENS name they
+    reverse resolve to, or None, with one call to the ReverseRecords
+    contract per ENS_BATCH_SIZE addresses. Chains without the contract,
+    e.g. test chains, resolve each address with ens.ENS instead.
+    """
+    reverse_records = web3.Web3(web3_provider).eth.contract(
+        address=REVERSE_RECORDS_ADDRESS, abi=REVERSE_RECORDS_ABI
+    )
+    size = max(1, settings.ENS_NAMES["BATCH_SIZE"])
+
+    names = {}
+    for start in range(0, len(addresses), size):
+        batch = addresses[start:start + size]
+        logger.info("resolving %s addresses to ENS names", len(batch))
+        try:
+            resolved = reverse_records.functions.getNames([
+                web3.Web3.toChecksumAddress(address) for address in batch
+            ]).call()
+        except web3.exceptions.BadFunctionCallOutput:
+            logger.info("no ReverseRecords contract, resolving one by one")
+            ens_obj = ens.ENS(web3_provider)
+            resolved = [ens_obj.name(address) for address in batch]
+
+        names.update({
+            address: name or None for address, name in zip(batch, resolved)
+        })
+
+    return names
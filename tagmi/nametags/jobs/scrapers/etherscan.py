@@ -2,15 +2,17 @@
 Module containing etherscan scraper.
 """
 # std lib imports
+import asyncio
+import concurrent.futures
 import logging
 
 # third party imports
-import lxml.html
-import rq
+from django.conf import settings
 
 # our imports
+from .async_base_scraper import AsyncBaseScraper
 from .base_scraper import BaseScraper
-from .utils import add_label_to_db
+from .rules import RULES
 
 
 logger = logging.getLogger(__name__)
@@ -26,13 +28,11 @@ class EtherscanScraper(BaseScraper):
     Etherscan scraper.
     """
 
-    def run(self):
+    source = "etherscan"
+
+    def prepare(self):
         """
-        Looks up an address on etherscan.
-        If the address has an associated label, the label is
-        added to the nametags table of the database.
-        Returns the label if it is found.
-        Returns None if no label is found.
+        Visits the etherscan home page.
         """
         # make request to etherscan home page
         self.get("https://etherscan.io/")
@@ -40,20 +40,71 @@ class EtherscanScraper(BaseScraper):
         # update headers
         self.headers.update(subsequent_headers)
 
-        # lookup address and parse label
-        address = rq.get_current_job().get_id()[0:42]
-        logger.info("making GET to address page")
-        resp = self.get(f"https://etherscan.io/address/{address}/")
-        label = self.parse_address_label(resp.text)
+    def load_state(self, state):
+        """
+        Restores the cookies of a session.
+        """
+        super().load_state(state)
+        self.headers.update(subsequent_headers)
+
+    def lookup(self, address):
+        """
+        Looks up an address on etherscan. The token page is requested
+        when the address page has no label, or along with the address
+        page when SCRAPE_ETHERSCAN["CONCURRENT_PAGES"] is set.
+        Returns the label if it is found.
+        Returns None if no label is found.
+        """
+        self.warm_up()
 
-        # if address lookup found nothing, do token lookup
+        if settings.SCRAPE_ETHERSCAN["CONCURRENT_PAGES"]:
+            return self.lookup_pages_at_once(address)
+
+        # lookup address, then token if the address has no label
+        logger.info("making GET to address page")
+        label = self.get_page(
+            f"https://etherscan.io/address/{address}/",
+            self.parse_address_label
+        )
         if label is None:
-            logger.info("No label found, making GET to token page")
-            resp = self.get(f"https://etherscan.io/token/{address}/")
-            label = self.parse_token_label(resp.text)
+            logger.info("making GET to token page")
+            label = self.get_page(
+                f"https://etherscan.io/token/{address}/",
+                self.parse_token_label
+            )
 
-        # store label in database
-        add_label_to_db(label, "etherscan", address)
+        return label
+
+    def lookup_pages_at_once(self, address):
+        """
+        Looks up an address on etherscan, requesting the address and token
+        pages at once, the token page by a fork of the session in another
+        thread. The address label is preferred.
+        Returns the label if it is found.
+        Returns None if no label is found.
+        """
+        token_scraper = self.fork()
+
+        # lookup address and token at once and parse labels
+        logger.info("making GETs to address and token pages")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+            token_label = pool.submit(
+                token_scraper.get_page,
+                f"https://etherscan.io/token/{address}/",
+                self.parse_token_label
+            )
+            address_label = self.get_page(
+                f"https://etherscan.io/address/{address}/",
+                self.parse_address_label
+            )
+            token_label = token_label.result()
+
+        self.join(token_scraper)
+
+        # the address label comes first, then the token label
+        label = address_label
+        if label is None:
+            label = token_label
 
         return label
 
@@ -61,30 +112,67 @@ class EtherscanScraper(BaseScraper):
     def parse_address_label(html_content):
         """
         Returns the address label if it exists in the html_content.
-        Returns None otherwise.
+        Returns None otherwise. Parsing stops as soon as the
+        label is found or is known to be absent.
         """
-        tree = lxml.html.fromstring(html_content)
-        value = tree.xpath("/html/body/div[1]/main/div[4]/div[1]/div[1]/div/div[1]/div/span/span")  # noqa: E501 pylint: disable=line-too-long
-
-        # match found
-        if len(value) != 0:
-            return value[0].text
-
-        return None
+        return RULES["etherscan"].stream("address_label", html_content)
 
     @staticmethod
     def parse_token_label(html_content):
         """
         Returns the token label if it exists in the html_content.
-        Returns None otherwise.
+        Returns None otherwise. Parsing stops as soon as the
+        label is found or is known to be absent.
         """
-        tree = lxml.html.fromstring(html_content)
-        value = tree.xpath(
-            "/html/body/div[1]/main/div[1]/div/div[1]/h1/div/span"
-        )
+        return RULES["etherscan"].stream("token_label", html_content)
+
+
+class AsyncEtherscanScraper(AsyncBaseScraper):
+    """
+    Etherscan scraper that runs on asyncio.
+    """
+
+    name = "etherscan_scraper"
+    source = "etherscan"
 
-        # match found
-        if len(value) != 0:
-            return value[0].text
+    async def run(self, address):
+        """
+        Looks up an address on etherscan, like EtherscanScraper.lookup.
+        Returns the label if it is found.
+        Returns None if no label is found.
+        """
+        # make request to etherscan home page
+        await self.fetch("GET", "https://etherscan.io/")
 
-        return None
+        # update headers
+        self.headers.update(subsequent_headers)
+
+        address_url = f"https://etherscan.io/address/{address}/"
+        token_url = f"https://etherscan.io/token/{address}/"
+
+        # lookup address and token at once and parse labels
+        if settings.SCRAPE_ETHERSCAN["CONCURRENT_PAGES"]:
+            logger.info("making GETs to address and token pages")
+            address_text, token_text = await asyncio.gather(
+                self.fetch("GET", address_url), self.fetch("GET", token_url)
+            )
+
+            # the address label comes first, then the token label
+            label = EtherscanScraper.parse_address_label(address_text)
+            if label is None:
+                label = EtherscanScraper.parse_token_label(token_text)
+
+            return label
+
+        # lookup address, then token if the address has no label
+        logger.info("making GET to address page")
+        label = EtherscanScraper.parse_address_label(
+            await self.fetch("GET", address_url)
+        )
+        if label is None:
+            logger.info("making GET to token page")
+            label = EtherscanScraper.parse_token_label(
+                await self.fetch("GET", token_url)
+            )
+
+        return label
@@ -2,17 +2,20 @@
 Module containing ethleaderboard scraper.
 """
 # std lib imports
+import asyncio
+import json
 import logging
 import re
-import time
 
 # third party imports
-import ens
-import rq
+from asgiref.sync import sync_to_async
 
 # our imports
+from .async_base_scraper import AsyncBaseScraper
 from .base_scraper import BaseScraper
-from .utils import add_label_to_db, web3_provider
+from .ens_names import resolve_name, resolve_names
+from .leaderboard_mirror import LeaderboardMirror
+from .utils import redis_connection
 
 
 logger = logging.getLogger(__name__)
@@ -32,46 +35,117 @@ def get_frens_req_headers():
     }
 
 
+def format_nametag(handles):
+    """
+    Returns a nametag of the links to the given twitter handles,
+    or None if there are none.
+    """
+    if len(handles) == 0:
+        return None
+
+    return ", ".join(f"https://twitter.com/{handle}" for handle in handles)
+
+
 class EthleaderboardScraper(BaseScraper):
     """
     Ethleaderboard scraper.
+    ENS names are looked up in the local mirror of the ethleaderboard
+    while it is fresh, and on ethleaderboard otherwise.
     """
 
-    def run(self):
+    source = "ethleaderboard"
+
+    def __init__(self):
+        super().__init__()
+        self.mirror = LeaderboardMirror(redis_connection())
+
+    def prepare(self):
+        """
+        Visits the ethleaderboard home page.
+        """
+        # make request to ethleaderboard home page
+        logger.info("making GET to ethleadboard home page")
+        self.get("https://ethleaderboard.xyz/")
+
+        # update headers for the requests to get associated twitters
+        self.headers.update(get_frens_req_headers())
+
+    def load_state(self, state):
+        """
+        Restores the cookies of a session.
+        """
+        super().load_state(state)
+        self.headers.update(get_frens_req_headers())
+
+    def prefetch(self, addresses):
+        """
+        Resolves the ENS names of the given addresses at once,
+        so that their lookups find the names in the cache.
+        """
+        resolve_names(addresses)
+
+    def lookup(self, address):
         """
         Looks up an ENS on Eth Leaderboard.
-        If the ENS has an associated label, the label is
-        added to the nametags table of the database.
         Returns a string of comma-separated labels if they are found.
         Returns None if the address does not resolve to an ENS name,
         or if no labels are found for the ENS name.
         """
         # check if the address resolves to an ENS name
-        address = rq.get_current_job().get_id()[0:42]
-        ens_obj = ens.ENS(web3_provider)
-        logger.info("resolving %s to an ENS name", address)
-        ens_name = ens_obj.name(address=address)
+        ens_name = resolve_name(address)
 
         if ens_name is None:
             logger.info("address did not resolve to an ENS name, exiting")
             return None
 
-        # make request to ethleaderboard home page
-        logger.info("making GET to ethleadboard home page")
-        self.get("https://ethleaderboard.xyz/")
-        time.sleep(2)
+        handles = self.mirror.lookup(ens_name)
+        if handles is not None:
+            logger.info("found %s in the ethleaderboard mirror", ens_name)
+            return format_nametag(handles)
 
-        # update headers and make request to get associated twitters
+        # only visit the home page once an address has an ENS name
+        self.warm_up()
+
+        # make request to get associated twitters
         logger.info("making GET to ethleaderboard frens/ endpoint")
-        self.headers.update(get_frens_req_headers())
         resp = self.get(
             "https://ethleaderboard.xyz/api/frens",
             params={"q": ens_name}
         )
-        data = resp.json()
 
-        # build nametag from matching results
-        nametag = ""
+        return self.build_nametag(resp.json(), ens_name)
+
+    def leaderboard(self):
+        """
+        Yields every account of the ethleaderboard,
+        fetched a page at a time.
+        """
+        self.warm_up()
+
+        skip = 0
+        while True:
+            logger.info("making GET to ethleaderboard frens/ page %s", skip)
+            data = self.get(
+                "https://ethleaderboard.xyz/api/frens",
+                params={"skip": skip}
+            ).json()
+            if len(data["frens"]) == 0:
+                return
+
+            yield from data["frens"]
+            skip += len(data["frens"])
+            if skip >= data.get("count", skip + 1):
+                return
+
+    @staticmethod
+    def build_nametag(data, ens_name):
+        """
+        Returns a nametag built from the twitter handles of the
+        results in the response data of the frens request
+        whose name matches the given ENS name.
+        Returns None if no result matches.
+        """
+        handles = []
         pattern = re.compile(rf"(.*\s)*{re.escape(ens_name)}", re.IGNORECASE)
         for item in data["frens"]:
             # skip if no match found
@@ -80,17 +154,54 @@ class EthleaderboardScraper(BaseScraper):
 
             # pull handle from json
             assert item['handle'] != ""
-            label = f"https://twitter.com/{item['handle']}"
-            nametag += f", {label}"
+            handles.append(item['handle'])
+
+        return format_nametag(handles)
+
 
-        # return if nametag is empty
-        if nametag == "":
+class AsyncEthleaderboardScraper(AsyncBaseScraper):
+    """
+    Ethleaderboard scraper that runs on asyncio.
+    """
+
+    name = "ethleaderboard_scraper"
+    source = "ethleaderboard"
+
+    async def run(self, address):
+        """
+        Looks up an ENS on Eth Leaderboard.
+        Returns a string of comma-separated labels if they are found.
+        Returns None if the address does not resolve to an ENS name,
+        or if no labels are found for the ENS name.
+        """
+        # check if the address resolves to an ENS name,
+        # web3 is blocking so it runs in a thread
+        ens_name = await asyncio.to_thread(resolve_name, address)
+
+        if ens_name is None:
+            logger.info("address did not resolve to an ENS name, exiting")
             return None
 
-        # strip ", " from beginning of nametag
-        nametag = nametag[2:]
+        # the mirror is in the database, which is blocking
+        mirror = LeaderboardMirror(redis_connection())
+        handles = await sync_to_async(mirror.lookup)(ens_name)
+        if handles is not None:
+            logger.info("found %s in the ethleaderboard mirror", ens_name)
+            return format_nametag(handles)
 
-        # store nametag in database and return it
-        add_label_to_db(nametag, "ethleaderboard", address)
+        # make request to ethleaderboard home page
+        logger.info("making GET to ethleadboard home page")
+        await self.fetch("GET", "https://ethleaderboard.xyz/")
+
+        # update headers and make request to get associated twitters
+        logger.info("making GET to ethleaderboard frens/ endpoint")
+        self.headers.update(get_frens_req_headers())
+        data = json.loads(
+            await self.fetch(
+                "GET",
+                "https://ethleaderboard.xyz/api/frens",
+                params={"q": ens_name}
+            )
+        )
 
-        return nametag
+        return EthleaderboardScraper.build_nametag(data, ens_name)
@@ -0,0 +1,291 @@
+"""
+Module containing the streaming extraction of labels from html pages.
+"""
+# std lib imports
+import re
+
+# third party imports
+import lxml.etree
+
+# our imports
+
+
+# number of characters fed to the extractor at a time
+CHUNK_SIZE = 16384
+
+STEP_PATTERN = re.compile(r"^([a-z0-9]+)(?:\[(\d+)\])?$")
+
+
+def parse_path(xpath):
+    """
+    Returns the steps of the given absolute xpath, e.g. /html/body/div[2],
+    as a list of (tag, position) tuples. The position of a step without
+    a predicate is None, it matches the children of any position.
+    """
+    if not xpath.startswith("/") or xpath.startswith("//"):
+        raise ValueError(f"{xpath} is not an absolute path")
+
+    steps = []
+    for step in xpath[1:].split("/"):
+        match = STEP_PATTERN.match(step)
+        if match is None:
+            raise ValueError(f"unsupported step {step} in {xpath}")
+        position = match.group(2)
+        steps.append((match.group(1), position and int(position)))
+
+    return steps
+
+
+class TagFeeder():
+    """
+    Feeds html to an lxml pull parser a whole tag at a time.
+
+    The push parser of libxml2 2.9 waits for more input when a chunk ends
+    inside a tag, and from then on sometimes holds back every event until
+    it is closed, e.g. after a tag with a stray quote. Cutting the chunks
+    after the last > they have avoids most of these stalls. The events
+    held back still come once the parser is closed, so the tree is the
+    same either way, only built later.
+    """
+
+    def __init__(self, parser):
+        """ Class initialization. """
+
+        self.parser = parser
+        self.buffer = ""
+
+    def feed(self, data):
+        """
+        Feeds the given html to the parser, up to the end of its last tag.
+        The rest is kept for the next chunk.
+        """
+        self.buffer += data
+        end = self.buffer.rfind(">") + 1
+        if end > 0:
+            self.parser.feed(self.buffer[:end])
+            self.buffer = self.buffer[end:]
+
+    def close(self):
+        """
+        Feeds the rest of the html to the parser and closes it.
+        """
+        if self.buffer:
+            self.parser.feed(self.buffer)
+            self.buffer = ""
+        self.parser.close()
+
+
+class PathState():
+    """
+    The state of one of the paths of an extractor. Elements that match
+    the first steps of the path and may still have children that match
+    the next step are open, keyed by element, with the depths, i.e. the
+    number of steps, they match, and the number of their children so far
+    per tag. The document is open, as None, until its root starts.
+    """
+
+    def __init__(self, steps):
+        """ Class initialization. """
+
+        self.steps = steps
+        self.open = {None: [0]}
+        self.counts = {None: {}}
+        self.element = None
+        self.decided = False
+        self.text = None
+
+    def start(self, element, parent):
+        """
+        Matches the given element, which started, against the path.
+        Returns True if the path may be decided since.
+        """
+        depths = self.open.get(parent)
+        if depths is None:
+            return parent is not None and parent is self.element
+
+        counts = self.counts[parent]
+        index = counts.get(element.tag, 0) + 1
+        counts[element.tag] = index
+
+        matched = []
+        for depth in list(depths):
+            tag, position = self.steps[depth]
+            if tag != element.tag or position not in (None, index):
+                continue
+            if position is not None:
+                # no other child of the parent can match this step
+                depths.remove(depth)
+            if depth + 1 == len(self.steps):
+                self.element = element
+            else:
+                matched.append(depth + 1)
+
+        # the document has a single root
+        if parent is None or not depths:
+            del self.open[parent]
+            del self.counts[parent]
+        if matched and self.element is None:
+            self.open[element] = matched
+            self.counts[element] = {}
+
+        return True
+
+    def end(self, element):
+        """
+        Forgets the given element, which was closed. Returns True if
+        the path may be decided since. The text of the element of the
+        path is kept, since it is cleared once closed.
+        """
+        if element is self.element:
+            self.text = element.text
+            self.decided = True
+            return True
+
+        if self.open.pop(element, None) is None:
+            return False
+
+        del self.counts[element]
+        return True
+
+    def decide(self, final):
+        """
+        Decides the text of the path once it is known, i.e. the first
+        element of the path in document order was closed or its first
+        child started, or no open element can lead to one. Once the html
+        is final, every element is closed.
+        """
+        if self.element is not None:
+            if final or len(self.element) != 0:
+                self.text = self.element.text
+                self.decided = True
+        elif final or not self.open:
+            self.decided = True
+
+
+class PathExtractor():
+    """
+    Extracts the text of the first of several absolute xpaths, e.g.
+    /html/body/div[1]/main/span, that has one, from html that is fed in
+    chunks. The xpaths after the first are fallbacks, in order.
+
+    The html is parsed by lxml's pull parser, so elements are placed like
+    lxml.html places them, and each path is matched against the children
+    of the elements it is open on as they start, instead of walking the
+    tree again. Elements are cleared once closed, so the tree of the page
+    is never kept whole. Extraction stops as soon as the text is known,
+    i.e. an element has a text and the elements of the paths before it
+    are provably absent, because the elements that could lead to them
+    were closed, or already had the child at the position of their step,
+    so the rest of the page is never parsed.
+    """
+
+    def __init__(self, xpaths):
+        """ Class initialization. """
+
+        self.paths = [PathState(parse_path(xpath)) for xpath in xpaths]
+        self.done = False
+        self.text = None
+
+        self.parser = lxml.etree.HTMLPullParser(events=("start", "end"))  # noqa: E501 pylint: disable=c-extension-no-member
+        self.feeder = TagFeeder(self.parser)
+        self.root = None
+
+    def feed(self, data):
+        """
+        Parses the given chunk of html. Does nothing once done.
+        """
+        if not self.done:
+            self.feeder.feed(data)
+            self.follow(final=False)
+
+    def close(self):
+        """
+        Parses the rest of the html, then returns the text of
+        the first path that has one, or None if none has.
+        """
+        if not self.done:
+            self.feeder.close()
+            self.follow(final=True)
+
+        return self.text
+
+    def follow(self, final):
+        """
+        Reads the events of the parser, then checks whether the text is
+        known. Stops reading as soon as it is.
+        """
+        for event, element in self.parser.read_events():
+            if event == "start":
+                changed = self.start(element)
+            else:
+                changed = self.end(element)
+            if changed and self.decide(final=False):
+                return
+
+        self.decide(final)
+
+    def start(self, element):
+        """
+        Matches the given element, which started, against the paths not
+        decided yet. Returns True if any of them may be decided since.
+        """
+        parent = element.getparent()
+        if parent is None:
+            self.root = element
+
+        changed = False
+        for path in self.paths:
+            if not path.decided and path.start(element, parent):
+                changed = True
+
+        return changed
+
+    def end(self, element):
+        """
+        Forgets the given element, which was closed, for the paths not
+        decided yet, then clears it and drops the children of its parent
+        before it. Returns True if any of the paths may be decided since.
+        """
+        changed = False
+        for path in self.paths:
+            if not path.decided and path.end(element):
+                changed = True
+
+        element.clear(keep_tail=True)
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+        return changed
+
+    def decide(self, final):
+        """
+        Decides the paths in order, up to the first one with a text.
+        Returns True once the text of the extractor is known.
+        """
+        for path in self.paths:
+            if not path.decided:
+                path.decide(final)
+            if not path.decided:
+                return False
+            if path.text:
+                self.text = path.text
+                break
+
+        self.done = True
+        return True
+
+
+def extract_text(xpaths, html_content):
+    """
+    Returns the text of the first of the given absolute xpaths that
+    has one in the given html content, or None if none has.
+    """
+    extractor = PathExtractor(xpaths)
+    for start in range(0, len(html_content), CHUNK_SIZE):
+        extractor.feed(html_content[start:start + CHUNK_SIZE])
+        if extractor.done:
+            break
+
+    return extractor.close()
@@ -0,0 +1,108 @@
+"""
+Module containing the local mirror of the ethleaderboard, which maps
+ENS names to the twitter handles of the accounts that have them.
+"""
+# std lib imports
+import re
+
+# third party imports
+from django.conf import settings
+from django.db import transaction
+
+# our imports
+from ...models import LeaderboardHandle
+
+
+# ENS names at the start of a twitter name or after a space,
+# like the names the ethleaderboard search results are matched on
+ENS_NAME_PATTERN = re.compile(r"(?:^|\s)(\S+?\.eth)", re.IGNORECASE)
+
+
+def ens_names(fren):
+    """
+    Returns the lowercase ENS names of the given ethleaderboard account,
+    the ones in its twitter name and the one it is listed under.
+    """
+    names = {name.lower() for name in ENS_NAME_PATTERN.findall(fren["name"])}
+    if fren.get("ens"):
+        names.add(fren["ens"].lower())
+
+    return names
+
+
+class LeaderboardMirror():
+    """
+    The twitter handles of the ethleaderboard accounts by ENS name, in
+    the database, so that the ethleaderboard scraper looks ENS names up
+    with an indexed query instead of a request to ethleaderboard.
+
+    The mirror is replaced as a whole by the sync_ethleaderboard command,
+    which records when it last synced in redis. The mirror is used for
+    MAX_AGE seconds after that, so the scraper goes back to ethleaderboard
+    if the command stops running. A MAX_AGE of 0 disables the mirror.
+    """
+
+    synced_key = "nametags:leaderboard:synced"
+
+    def __init__(self, redis_cursor):
+        """ Class initialization. """
+
+        self.redis_cursor = redis_cursor
+        self.max_age = settings.ETHLEADERBOARD_MIRROR["MAX_AGE"]
+
+    @property
+    def fresh(self):
+        """ Returns True if lookups should use the mirror. """
+        return self.max_age > 0 and \
+            self.redis_cursor.exists(self.synced_key) == 1
+
+    @staticmethod
+    def handles(ens_name):
+        """
+        Returns the twitter handles of the given ENS name,
+        the most followed first.
+        """
+        return list(
+            LeaderboardHandle.objects
+            .filter(ens_name=ens_name.lower())
+            .order_by("-followers", "handle")
+            .values_list("handle", flat=True)
+        )
+
+    def lookup(self, ens_name):
+        """
+        Returns the twitter handles of the given ENS name,
+        or None if the mirror should not be used.
+        """
+        if not self.fresh:
+            return None
+
+        return self.handles(ens_name)
+
+    def replace(self, frens):
+        """
+        Replaces the mirror with the given ethleaderboard accounts,
+        and records that it was synced.
+        Returns the number of handles mirrored.
+        """
+        handles = {}
+        for fren in frens:
+            if not fren.get("handle"):
+                continue
+            for ens_name in ens_names(fren):
+                handles[(ens_name, fren["handle"])] = LeaderboardHandle(
+                    ens_name=ens_name,
+                    handle=fren["handle"],
+                    followers=fren.get("followers") or 0
+                )
+
+        with transaction.atomic():
+            LeaderboardHandle.objects.all().delete()
+            LeaderboardHandle.objects.bulk_create(
+                handles.values(), batch_size=1000
+            )
+
+        if self.max_age > 0:
+            self.redis_cursor.set(self.synced_key, 1, ex=self.max_age)
+
+        return len(handles)
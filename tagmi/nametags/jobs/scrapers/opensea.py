@@ -2,16 +2,16 @@
 Module containing etherscan scraper.
 """
 # std lib imports
+from datetime import datetime
 import logging
-import time
 
 # third party imports
-import lxml.html
-import rq
 
 # our imports
+from .async_base_scraper import AsyncBaseScraper
 from .base_scraper import BaseScraper
-from .utils import add_label_to_db
+from .embedded import EmbeddedJSON
+from .rules import RULES
 
 
 logger = logging.getLogger(__name__)
@@ -22,111 +22,120 @@ class OpenseaScraper(BaseScraper):
     Opensea scraper.
     """
 
-    def run(self):
+    source = "opensea"
+
+    def prepare(self):
         """
-        Looks up an address on Opensea.
-        If the address has an associated profile, a label is
-        added to the nametags table of the database.
-        Returns a label if a profile is found.
-        Returns None if no profile is found.
+        Visits the opensea home page.
         """
         # make request to opensea home page
         logger.info("making GET to opensea home page")
         self.get("https://opensea.io/")
-        time.sleep(2)
 
-        # make profile request
-        address = rq.get_current_job().get_id()[0:42]
-        logger.info("making GET to opensea profile page")
-        resp = self.get(f"https://opensea.io/{address}")
-
-        # parse label
-        label = self.parse_label(resp.text)
-
-        # store label in database
-        add_label_to_db(label, "opensea", address)
+    def lookup(self, address):
+        """
+        Looks up an address on Opensea.
+        Returns a label if a profile is found.
+        Returns None if no profile is found.
+        """
+        self.warm_up()
 
-        return label
+        # make profile request and parse label
+        logger.info("making GET to opensea profile page")
+        return self.get_page(
+            f"https://opensea.io/{address}", self.parse_label
+        )
 
-    def parse_label(self, html_content):
+    @staticmethod
+    def parse_label(html_content):
         """
         Returns a string of profile metadata if a profile exists.
         Returns None if a profile does not exist.
         """
-        tree = lxml.html.fromstring(html_content)
-
-        # check if profile exists
-        joined = self._parse_joined(tree)
+        values = OpenseaScraper.parse_embedded(html_content)
+        if values is None:
+            logger.info("opensea page has no profile data, parsing html")
+            values = RULES["opensea"].extract(html_content)
 
         # profile does not exist
-        if joined is None:
+        if values["joined"] is None:
             return None
 
         # build a string containing profile metadata
-        username = self._parse_username(tree)
-        socials = self._parse_socials(tree)
-        collected = self._parse_tab(tree, "Collected")
-        created = self._parse_tab(tree, "Created")
-        favorited = self._parse_tab(tree, "Favorited")
-        label = f"Username: {username} - Socials: {socials} - " \
-                f"{joined} - Collected: {collected} - " \
-                f"Created: {created} - Favorited: {favorited}"
+        label = f"Username: {values['username']} - " \
+                f"Socials: {values['socials']} - {values['joined']} - " \
+                f"Collected: {values['collected']} - " \
+                f"Created: {values['created']} - " \
+                f"Favorited: {values['favorited']}"
 
         return label
 
-    def _parse_joined(self, lxml_tree):
+    @staticmethod
+    def parse_embedded(html_content):
         """
-        Returns profile joined date as a string.
-        Returns None if joined data does not exist.
+        Returns the same values as the extraction rules of opensea pages,
+        from the data of the profile page query that the page embeds for
+        next.js, without parsing the html.
+        Returns None if the page does not embed the data.
         """
-        return lxml_tree.xpath("/html/body/div[1]/div/main/div/div/div/div[4]/div/div/div[1]/div/div/div[2]/div")[0].text  # noqa: E501 pylint: disable=line-too-long
-
-    def _parse_username(self, lxml_tree):
-        """
-        Returns username as a string.
-        Returns None if username does not exist.
-        """
-        return lxml_tree.xpath("/html/body/div[1]/div/main/div/div/div/div[3]/div/div/div[1]/div/div[2]/h1")[0].text  # noqa: E501 pylint: disable=line-too-long
-
-    def _parse_socials(self, lxml_tree):
-        """
-        Returns social links as a string.
-        Returns None if socials do not exist.
-        """
-        # find the social links
-        share_div = lxml_tree.xpath('//*[@id="main"]/div/div/div/div[3]/div/div/div[2]/div/div/div[2]')  # noqa: E501 pylint: disable=line-too-long
-        socials_div = share_div[0].getprevious()
-        links = socials_div.iter(tag="a")
-
-        # build the string
-        to_ret = ""
-        for link in links:
-            href = link.get("href")
-            to_ret += f"{href} "
-
-        # return None if no socials were found
-        if to_ret == "":
+        payload = EmbeddedJSON(html_content, "__NEXT_DATA__")
+        try:
+            # the response of the profile page query, in the relay cache.
+            # it is decoded once so that the values are read from the
+            # objects they belong to, not from the assets after them
+            data = payload.get("relayCache", "json", "data")
+            account = data["account"]
+            user = account["user"]
+            if user is None:
+                return {"joined": None}
+            metadata = account.get("metadata") or {}
+            display_name = account.get("displayName")
+            collected, created = [
+                data[key]["searchItems"]["totalCount"]
+                for key in ["sidebarCollected", "sidebarCreated"]
+            ]
+            joined = datetime.fromisoformat(user["dateJoined"])
+        except (KeyError, TypeError, ValueError):
             return None
 
-        # format the string
-        to_ret = to_ret.strip()
+        socials = [
+            f"{url}{metadata[key]}" for key, url in [
+                ("twitterUsername", "https://twitter.com/"),
+                ("instagramUsername", "https://instagram.com/"),
+                ("websiteUrl", "")
+            ] if metadata.get(key)
+        ]
+
+        return {
+            "joined": joined.strftime("Joined %B %Y"),
+            "username": display_name or user["publicUsername"],
+            "socials": " ".join(socials) or None,
+            "collected": str(collected),
+            "created": str(created),
+            "favorited": str(user["favoriteAssetCount"])
+        }
+
+
+class AsyncOpenseaScraper(AsyncBaseScraper):
+    """
+    Opensea scraper that runs on asyncio.
+    """
 
-        return to_ret
+    name = "opensea_scraper"
+    source = "opensea"
 
-    def _parse_tab(self, lxml_tree, tab_text):
+    async def run(self, address):
         """
-        Returns the number that is next to the tab with
-        the given text. E.g, "Collected", "Created", etc.
-        Returns 0 if tab or number could not be found.
+        Looks up an address on Opensea.
+        Returns a label if a profile is found.
+        Returns None if no profile is found.
         """
-        # find tab with the given text
-        tab = lxml_tree.xpath(f'//span[contains(text(),"{tab_text}")]')
-        if len(tab) == 0:
-            return "0"
+        # make request to opensea home page
+        logger.info("making GET to opensea home page")
+        await self.fetch("GET", "https://opensea.io/")
 
-        # sibling element that contains number
-        amount = tab[0].getnext()
-        if amount is None:
-            return "0"
+        # make profile request and parse label
+        logger.info("making GET to opensea profile page")
+        text = await self.fetch("GET", f"https://opensea.io/{address}")
 
-        return amount.text
+        return OpenseaScraper.parse_label(text)
@@ -0,0 +1,149 @@
+"""
+Module containing the cache of the pages scraped from the sources.
+"""
+# std lib imports
+import json
+import time
+
+# third party imports
+from django.conf import settings
+
+# our imports
+
+
+class PageCache():
+    """
+    Remembers the pages fetched from the sources, so that a page that
+    has not changed since it was last scraped is neither parsed again
+    nor its label added to the database again.
+
+    The entry of a page holds its validators, the ETag and Last-Modified
+    headers that are sent back to the source in a conditional request,
+    the sha256 digest of its content and the label parsed from it.
+    Entries are stored in redis as json and expire after TTL seconds.
+    The cache holds up to MAX_ENTRIES pages, the least recently scraped
+    pages are evicted first. The urls of the pages of each source and
+    address are kept too, so that they can be forgotten when the tag of
+    the source is deleted, and the label is added again.
+    """
+
+    key_prefix = "nametags:page"
+
+    def __init__(self, redis_cursor):
+        """ Class initialization. """
+
+        self.redis_cursor = redis_cursor
+        self.ttl = settings.SCRAPE_PAGE_CACHE["TTL"]
+        self.max_entries = settings.SCRAPE_PAGE_CACHE["MAX_ENTRIES"]
+
+    @property
+    def enabled(self):
+        """ Returns True if pages should be cached. """
+        return self.ttl > 0 and self.max_entries > 0
+
+    @property
+    def index_key(self):
+        """
+        Returns the key of the sorted set of the cached urls,
+        scored by the time they were last saved.
+        """
+        return f"{self.key_prefix}:index"
+
+    def key(self, url):
+        """
+        Returns the key of the entry of the given url.
+        """
+        return f"{self.key_prefix}:{url}"
+
+    def urls_key(self, source, address):
+        """
+        Returns the key of the set of the urls cached
+        for the given source and address.
+        """
+        return f"{self.key_prefix}:urls:{source}:{address}"
+
+    def load(self, url):
+        """
+        Returns the entry of the given url, or None if there is none.
+        """
+        if not self.enabled:
+            return None
+
+        entry = self.redis_cursor.get(self.key(url))
+        if entry is None:
+            return None
+
+        return json.loads(entry)
+
+    @staticmethod
+    def validators(entry):
+        """
+        Returns the headers of a conditional request
+        for the page of the given entry.
+        """
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def save(self, entries, source=None, address=None):
+        """
+        Saves the given dictionary of urls to entries, as the pages of the
+        given source and address if any, then evicts the least recently
+        saved entries over MAX_ENTRIES.
+        """
+        if not self.enabled or not entries:
+            return
+
+        now = time.time()
+        with self.redis_cursor.pipeline() as pipe:
+            for url, entry in entries.items():
+                pipe.set(self.key(url), json.dumps(entry), ex=self.ttl)
+                pipe.zadd(self.index_key, {url: now})
+            if source is not None and address is not None:
+                urls_key = self.urls_key(source, address)
+                pipe.sadd(urls_key, *entries)
+                pipe.expire(urls_key, self.ttl)
+            pipe.execute()
+
+        self.evict()
+
+    def forget(self, source, address):
+        """
+        Deletes the entries of the pages of the given source and address,
+        so that they are parsed again the next time they are scraped.
+        Returns the number of entries deleted.
+        """
+        urls_key = self.urls_key(source, address)
+        urls = [url.decode() for url in self.redis_cursor.smembers(urls_key)]
+        with self.redis_cursor.pipeline() as pipe:
+            if urls:
+                pipe.zrem(self.index_key, *urls)
+                pipe.delete(*[self.key(url) for url in urls])
+            pipe.delete(urls_key)
+            pipe.execute()
+
+        return len(urls)
+
+    def evict(self):
+        """
+        Deletes the least recently saved entries over MAX_ENTRIES.
+        Returns the number of entries evicted.
+        """
+        extra = self.redis_cursor.zcard(self.index_key) - self.max_entries
+        if extra <= 0:
+            return 0
+
+        evicted = self.redis_cursor.zrange(self.index_key, 0, extra - 1)
+        with self.redis_cursor.pipeline() as pipe:
+            pipe.zrem(self.index_key, *evicted)
+            pipe.delete(*[self.key(url.decode()) for url in evicted])
+            pipe.execute()
+
+        return len(evicted)
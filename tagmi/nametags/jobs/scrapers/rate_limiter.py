@@ -0,0 +1,120 @@
+"""
+Module containing the rate limiter of the requests made to the sources.
+"""
+# std lib imports
+import logging
+import math
+import time
+import urllib.parse
+
+# third party imports
+from django.conf import settings
+import redis
+
+# our imports
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter():
+    """
+    Limits the rate of the requests made to each upstream host,
+    e.g. etherscan.io, with a token bucket per host that every worker
+    shares, so that the rate holds however many workers are running.
+
+    A bucket holds up to a burst of tokens and refills at the rate of its
+    host, in requests per second. Every request takes a token, and when
+    the bucket is empty the request waits until its token is refilled.
+    Buckets are stored in redis and timed with the clock of redis.
+    """
+
+    key_prefix = "nametags:ratelimit"
+
+    def __init__(self, redis_cursor):
+        """ Class initialization. """
+
+        self.redis_cursor = redis_cursor
+        self.rate = settings.SCRAPE_RATE_LIMIT["RATE"]
+        self.rates = settings.SCRAPE_RATE_LIMIT["RATES"]
+        self.burst = settings.SCRAPE_RATE_LIMIT["BURST"]
+
+    def key(self, host):
+        """
+        Returns the key of the bucket of the given host.
+        """
+        return f"{self.key_prefix}:{host}"
+
+    def host_rate(self, host):
+        """
+        Returns the number of requests per second allowed to the given
+        host, 0 or less if requests to the host are not limited.
+        """
+        return self.rates.get(host, self.rate)
+
+    def reserve(self, host):
+        """
+        Takes a token from the bucket of the given host.
+        Returns the number of seconds to wait before making the
+        request, 0 if a token was available.
+        """
+        rate = self.host_rate(host)
+        if rate <= 0:
+            return 0
+
+        key = self.key(host)
+        with self.redis_cursor.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    seconds, microseconds = pipe.time()
+                    now = seconds + microseconds / 1000000
+                    tokens, updated_at = pipe.hmget(
+                        key, "tokens", "updated_at"
+                    )
+
+                    # refill the bucket for the time elapsed, a missing
+                    # bucket is full. tokens below 0 are requests waiting
+                    if tokens is None:
+                        tokens = self.burst
+                    else:
+                        elapsed = max(0, now - float(updated_at))
+                        tokens = min(
+                            self.burst, float(tokens) + elapsed * rate
+                        )
+                    tokens -= 1
+
+                    # the bucket is forgotten once it would be full again
+                    pipe.multi()
+                    pipe.hset(
+                        key, mapping={"tokens": tokens, "updated_at": now}
+                    )
+                    pipe.expire(
+                        key, math.ceil((self.burst - tokens) / rate) + 1
+                    )
+                    pipe.execute()
+
+                    return max(0, -tokens / rate)
+
+                except redis.WatchError:
+                    continue
+
+    def delay(self, url):
+        """
+        Takes a token for a request to the given url. Returns the
+        number of seconds to wait before making the request.
+        """
+        host = urllib.parse.urlparse(url).hostname
+        delay = self.reserve(host)
+        if delay > 0:
+            logger.debug("rate limited, waiting %.2fs for %s", delay, host)
+
+        return delay
+
+    def wait(self, url):
+        """
+        Waits until a request to the given url is allowed.
+        """
+        delay = self.delay(url)
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,136 @@
+"""
+Module containing the registry of the extraction rules of the scrapers,
+i.e. the fields each source's pages are parsed into and where to find
+them. Rules are compiled once, when the module is imported.
+"""
+# std lib imports
+
+# third party imports
+import lxml.etree
+import lxml.html
+
+# our imports
+from .extract import extract_text, parse_path
+
+
+class Field():
+    """
+    A named value of a page, found by the first of its selectors that
+    matches. The selectors after the first are fallbacks, in order,
+    for when the layout of the page shifts.
+
+    Selectors are xpaths that select text or attribute values. A field
+    of many values joins the values selected with spaces, otherwise the
+    first value is used. Fields that match nothing have their default.
+    """
+
+    def __init__(self, name, selectors, many=False, default=None):
+        """ Class initialization. """
+
+        self.name = name
+        self.selectors = selectors
+        self.many = many
+        self.default = default
+        self.xpaths = []
+
+    def compile(self, streamed):
+        """
+        Compiles the selectors, into lxml xpaths that are evaluated on
+        the tree of a page, or into the paths of the streaming extractor,
+        which only supports absolute paths.
+        """
+        if streamed:
+            for selector in self.selectors:
+                parse_path(selector)
+        else:
+            self.xpaths = [
+                lxml.etree.XPath(selector)  # noqa: E501 pylint: disable=c-extension-no-member
+                for selector in self.selectors
+            ]
+
+    def evaluate(self, tree):
+        """
+        Returns the value of the field in the given tree.
+        """
+        for xpath in self.xpaths:
+            values = [str(value) for value in xpath(tree)]
+            if len(values) != 0:
+                return " ".join(values) if self.many else values[0]
+
+        return self.default
+
+
+class Rules():
+    """
+    The fields of the pages of a source.
+
+    The fields of most sources are evaluated on the tree of the page,
+    which is parsed once for all of them. Streamed sources look up a
+    single field of a page with the streaming extractor instead, which
+    follows all the selectors of the field in one pass and stops as soon
+    as the value is known.
+    """
+
+    def __init__(self, source, fields, streamed=False):
+        """ Class initialization. """
+
+        self.source = source
+        self.fields = {field.name: field for field in fields}
+        self.streamed = streamed
+        for field in fields:
+            field.compile(streamed)
+
+    def extract(self, html_content):
+        """
+        Returns a dictionary of the names of the fields
+        to their values in the given html content.
+        """
+        tree = lxml.html.fromstring(html_content)
+
+        return {
+            name: field.evaluate(tree) for name, field in self.fields.items()
+        }
+
+    def stream(self, name, html_content):
+        """
+        Returns the value of the field with the given name
+        in the given html content, with the streaming extractor.
+        """
+        field = self.fields[name]
+        value = extract_text(field.selectors, html_content)
+
+        return field.default if value is None else value
+
+
+RULES = {
+    "etherscan": Rules("etherscan", [
+        Field("address_label", [
+            "/html/body/div[1]/main/div[4]/div[1]/div[1]/div/div[1]/div/span/span"  # noqa: E501 pylint: disable=line-too-long
+        ]),
+        Field("token_label", [
+            "/html/body/div[1]/main/div[1]/div/div[1]/h1/div/span"
+        ])
+    ], streamed=True),
+    "opensea": Rules("opensea", [
+        Field("joined", [
+            "/html/body/div[1]/div/main/div/div/div/div[4]/div/div/div[1]/div/div/div[2]/div/text()",  # noqa: E501 pylint: disable=line-too-long
+            '//main//div[starts-with(normalize-space(text()), "Joined ")]/text()'  # noqa: E501 pylint: disable=line-too-long
+        ]),
+        Field("username", [
+            "/html/body/div[1]/div/main/div/div/div/div[3]/div/div/div[1]/div/div[2]/h1/text()",  # noqa: E501 pylint: disable=line-too-long
+            "//main//h1/text()"
+        ]),
+        Field("socials", [
+            'id("main")/div/div/div/div[3]/div/div/div[2]/div/div/div[2]/preceding-sibling::*[1]/descendant-or-self::a/@href'  # noqa: E501 pylint: disable=line-too-long
+        ], many=True),
+        Field("collected", [
+            '//span[contains(text(),"Collected")]/following-sibling::*[1]/text()'  # noqa: E501 pylint: disable=line-too-long
+        ], default="0"),
+        Field("created", [
+            '//span[contains(text(),"Created")]/following-sibling::*[1]/text()'  # noqa: E501 pylint: disable=line-too-long
+        ], default="0"),
+        Field("favorited", [
+            '//span[contains(text(),"Favorited")]/following-sibling::*[1]/text()'  # noqa: E501 pylint: disable=line-too-long
+        ], default="0")
+    ])
+}
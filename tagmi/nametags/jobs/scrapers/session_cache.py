@@ -0,0 +1,70 @@
+"""
+Module containing the cache of the warm session state of the sources.
+"""
+# std lib imports
+import json
+
+# third party imports
+from django.conf import settings
+
+# our imports
+
+
+class SessionCache():
+    """
+    Shares the state of warm scraper sessions between workers, e.g. the
+    cookies and csrf token a source handed out on its home page, so that
+    scrapers of the same source can skip the handshake.
+
+    The state of each source is stored in redis as json,
+    and expires after SCRAPE_SESSION_TTL seconds.
+    """
+
+    key_prefix = "nametags:session"
+
+    def __init__(self, redis_cursor):
+        """ Class initialization. """
+
+        self.redis_cursor = redis_cursor
+        self.ttl = settings.SCRAPE_SESSION_TTL
+
+    @property
+    def enabled(self):
+        """ Returns True if session state should be shared. """
+        return self.ttl > 0
+
+    def key(self, source):
+        """
+        Returns the key of the session state of the given source.
+        """
+        return f"{self.key_prefix}:{source}"
+
+    def load(self, source):
+        """
+        Returns the saved session state of the given source,
+        or None if there is none.
+        """
+        if not self.enabled:
+            return None
+
+        state = self.redis_cursor.get(self.key(source))
+        if state is None:
+            return None
+
+        return json.loads(state)
+
+    def save(self, source, state):
+        """
+        Saves the session state of the given source.
+        """
+        if self.enabled:
+            self.redis_cursor.set(
+                self.key(source), json.dumps(state), ex=self.ttl
+            )
+
+    def forget(self, source):
+        """
+        Deletes the session state of the given source,
+        e.g. because the source rejected it.
+        """
+        self.redis_cursor.delete(self.key(source))
@@ -0,0 +1,118 @@
+"""
+Module containing the connection pools and the sessions of the
+scrapers that live as long as the worker process.
+"""
+# std lib imports
+import collections
+import logging
+
+# third party imports
+from django.conf import settings
+from urllib3.util.retry import Retry
+import requests
+
+# our imports
+
+
+logger = logging.getLogger(__name__)
+
+
+def build_adapter():
+    """
+    Returns an adapter that keeps up to SCRAPE_HTTP["POOL_SIZE"]
+    keep-alive connections per host open, and retries requests that
+    fail to connect or get a 502, 503 or 504 response.
+    """
+    return requests.adapters.HTTPAdapter(
+        pool_connections=settings.SCRAPE_HTTP["POOL_SIZE"],
+        pool_maxsize=settings.SCRAPE_HTTP["POOL_SIZE"],
+        max_retries=Retry(
+            total=settings.SCRAPE_HTTP["RETRIES"],
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False
+        )
+    )
+
+
+# connection pools that live as long as the process and are shared by
+# its scrapers, so that a worker running many jobs keeps its
+# connections to the sources open. Headers and cookies are per scraper.
+adapters = {
+    "https://": build_adapter(),
+    "http://": build_adapter()
+}
+
+
+def connection_stats():
+    """
+    Returns a dictionary of hosts to the number of requests made to
+    them, the number of connections opened and the number of requests
+    that reused an open connection.
+    """
+    stats = collections.defaultdict(collections.Counter)
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            stats[pool.host]["requests"] += pool.num_requests
+            stats[pool.host]["connections"] += pool.num_connections
+
+    for counts in stats.values():
+        counts["reused"] = max(0, counts["requests"] - counts["connections"])
+
+    return {host: dict(counts) for host, counts in stats.items()}
+
+
+class SessionRegistry():
+    """
+    Keeps a scraper session per scraper class for the life of the worker
+    process, so that the jobs run by a warm worker reuse the cookies
+    of their source and its open connections.
+    A session that its source rejects resets itself, see BaseScraper.
+    """
+
+    def __init__(self):
+        """ Class initialization. """
+
+        self.sessions = {}
+        self.created = collections.Counter()
+        self.reused = collections.Counter()
+
+    def get(self, scraper_class):
+        """
+        Returns the session of the given scraper class,
+        which is created the first time.
+        """
+        name = scraper_class.__name__
+        scraper = self.sessions.get(scraper_class)
+        if scraper is None:
+            scraper = self.sessions[scraper_class] = scraper_class()
+            self.created[name] += 1
+        else:
+            self.reused[name] += 1
+
+        return scraper
+
+    def clear(self):
+        """
+        Forgets every session, e.g. after a fork.
+        """
+        self.sessions.clear()
+        self.created.clear()
+        self.reused.clear()
+
+    def summary(self):
+        """
+        Returns a line summarizing the reuse of sessions and connections.
+        """
+        hosts = ", ".join(
+            f"{host} {counts['reused']}/{counts['requests']}"
+            for host, counts in sorted(connection_stats().items())
+        )
+        return f"sessions created={sum(self.created.values())} " \
+               f"reused={sum(self.reused.values())}, " \
+               f"connections reused per host: {hosts or 'none'}"
+
+
+registry = SessionRegistry()
@@ -28,6 +28,20 @@ class BaseScraperTests(BaseTestCase):
         """ Assert that a requests session is being used. """
         self.assertTrue(isinstance(self.client, requests.Session))
 
+    def test_connection_pools_shared(self):
+        """
+        Assert that scrapers share their connection pools,
+        but not their headers.
+        """
+        other = BaseScraper()
+        other.headers.update({"Referer": "https://etherscan.io/"})
+
+        self.assertIs(
+            self.client.get_adapter("https://etherscan.io/"),
+            other.get_adapter("https://opensea.io/")
+        )
+        self.assertNotIn("Referer", self.client.headers)
+
     def test_headers(self):
         """ Assert that the correct headers are being used. """
         self.assertEqual(self.client.headers, constants.HEADERS)
@@ -49,3 +63,18 @@ class BaseScraperTests(BaseTestCase):
 
         with self.assertRaises(HTTPError):
             self.client.get("https://500.com/")
+
+    def test_state_restores_cookies(self):
+        """
+        Assert that the saved state of a session restores its cookies
+        in another session.
+        """
+        self.client.cookies.set(
+            "session", "abc", domain="dune.com", path="/"
+        )
+        other = BaseScraper()
+        other.load_state(self.client.save_state())
+
+        self.assertEqual(
+            other.cookies.get("session", domain="dune.com"), "abc"
+        )
@@ -3,8 +3,10 @@ Module containing tests for the dune.py scraper.
 """
 # std lib imports
 from unittest import mock
+import json
 
 # third party imports
+from asgiref.sync import async_to_sync
 from responses import matchers
 from responses.registries import OrderedRegistry
 import responses
@@ -13,10 +15,10 @@ import responses
 from ....basetest import BaseTestCase
 from .. import dune
 from ..base_scraper import BaseScraper
+from ..session_cache import SessionCache
 from ....models import Tag
 
 
-@mock.patch("nametags.jobs.scrapers.dune.time", mock.MagicMock())
 class DuneTests(BaseTestCase):
     """
     Tests the dune scraper.
@@ -223,3 +225,103 @@ class DuneTests(BaseTestCase):
         self.assertFalse(
             Tag.objects.filter(address=self.test_addr).exists()
         )
+
+    def test_session_reused(self):
+        """
+        Assert that a scraper that looks up several addresses only
+        visits the home page and gets a csrf token once.
+        """
+        # set up test
+        first = self._mock_landing_page_resp()
+        second = self._mock_csrf_resp()
+        third = self._mock_list_labels_resp(self.single_label_resp)
+
+        # look up the address twice with the same session
+        labels = [self.client.lookup(self.test_addr) for _ in range(2)]
+
+        # make assertions
+        self.assertEqual(labels, [self.label, self.label])
+        self.assertEqual(first.call_count, 1)
+        self.assertEqual(second.call_count, 1)
+        self.assertEqual(third.call_count, 2)
+
+    def test_saved_session_reused(self):
+        """
+        Assert that a scraper reuses the cookies and csrf token saved
+        by another scraper instead of redoing the handshake.
+        """
+        # set up test
+        first = self._mock_landing_page_resp()
+        second = self._mock_csrf_resp()
+        third = self._mock_list_labels_resp(self.single_label_resp)
+        self.client.session_cache = SessionCache(self.fake_redis)
+        other = dune.DuneScraper()
+        other.session_cache = SessionCache(self.fake_redis)
+
+        # look up the address with both scrapers
+        self.client.scrape(self.test_addr)
+        label = other.scrape(self.test_addr)
+
+        # make assertions
+        self.assertEqual(label, self.label)
+        self.assertEqual(first.call_count, 1)
+        self.assertEqual(second.call_count, 1)
+        self.assertEqual(third.call_count, 2)
+        self.assertTrue(other.reused)
+
+    def test_rejected_session_prepared_again(self):
+        """
+        Assert that a scraper whose saved session is rejected redoes
+        the handshake, retries the lookup and saves the new session.
+        """
+        # set up test
+        first = self._mock_landing_page_resp()
+        second = self._mock_csrf_resp()
+        rejected = self.mock_responses.add(
+            responses.POST, "https://dune.com/api/labels/list", status=403
+        )
+        cache = SessionCache(self.fake_redis)
+        cache.save("dune", {"cookies": [], "csrf": "expired"})
+        self.client.session_cache = cache
+
+        # the rejected request only matches the expired token
+        rejected.match = [
+            matchers.json_params_matcher(
+                {"csrf": "expired", "address_id": self.address_id}
+            )
+        ]
+        self._mock_list_labels_resp(self.single_label_resp)
+
+        # look up the address
+        label = self.client.scrape(self.test_addr)
+
+        # make assertions
+        self.assertEqual(label, self.label)
+        self.assertEqual(rejected.call_count, 1)
+        self.assertEqual(first.call_count, 1)
+        self.assertEqual(second.call_count, 1)
+        self.assertEqual(cache.load("dune")["csrf"], self.csrf_resp["csrf"])
+
+    def test_async_multiple_labels_found(self):
+        """
+        Assert that the async scraper sends the csrf token and the
+        address to the list labels endpoint and returns the nametag.
+        """
+        # set up test
+        pages = [
+            "",
+            json.dumps(self.csrf_resp),
+            json.dumps(self.multi_label_resp)
+        ]
+
+        # run the scraper
+        scraper = dune.AsyncDuneScraper()
+        with mock.patch.object(scraper, "fetch", side_effect=pages) as fetch:
+            nametag = async_to_sync(scraper.run)(self.test_addr)
+
+        # make assertions
+        self.assertEqual(nametag, f"{self.label}, {self.label}")
+        self.assertEqual(
+            fetch.call_args.kwargs["json"],
+            {"csrf": self.csrf_resp["csrf"], "address_id": self.address_id}
+        )
@@ -0,0 +1,53 @@
+"""
+Module containing tests for the extraction of embedded JSON payloads.
+"""
+# std lib imports
+
+# third party imports
+from django.test import SimpleTestCase
+
+# our imports
+from ..embedded import EmbeddedJSON
+
+
+class EmbeddedJSONTests(SimpleTestCase):
+    """
+    Tests the extraction of embedded JSON payloads.
+    """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        self.html_content = (
+            '<html><head><script>var a = {"name": "script"};</script>'
+            '<script id="data" type="application/json">'
+            '{"page": {"name": "page", "items": [1, 2]}, '
+            '"user": {"name": "user", "count": 3}}'
+            '</script></head><body>"name": "body"</body></html>'
+        )
+
+    def test_get(self):
+        """
+        Assert that values are looked up in the payload only, in the
+        order their keys appear in it.
+        """
+        payload = EmbeddedJSON(self.html_content, "data")
+
+        self.assertTrue(payload.found)
+        self.assertEqual(payload.get("items"), [1, 2])
+        self.assertEqual(payload.get("user"), {"name": "user", "count": 3})
+        with self.assertRaises(KeyError):
+            payload.get("name")
+
+        payload = EmbeddedJSON(self.html_content, "data")
+        self.assertEqual(payload.get("user", "name"), "user")
+
+    def test_missing_payload(self):
+        """
+        Assert that keys are not looked up in pages without the payload.
+        """
+        payload = EmbeddedJSON(self.html_content, "missing")
+
+        self.assertFalse(payload.found)
+        with self.assertRaises(KeyError):
+            payload.get("name")
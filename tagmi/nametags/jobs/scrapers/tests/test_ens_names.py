@@ -0,0 +1,138 @@
+"""
+Module containing tests for the reverse resolution of ENS names.
+"""
+# std lib imports
+from unittest import mock
+
+# third party imports
+from django.test import override_settings
+import web3
+
+# our imports
+from ....basetest import BaseTestCase
+from .. import ens_names
+
+
+class EnsNamesTests(BaseTestCase):
+    """
+    Tests the reverse resolution of ENS names and its cache.
+    """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        self.addresses = [f"0x{index:040x}" for index in range(1, 6)]
+        self.names = {
+            self.addresses[0]: "first.eth", self.addresses[3]: "fourth.eth"
+        }
+        self.cache = ens_names.EnsCache(self.fake_redis)
+
+        # outside of jobs, names are cached in the test redis
+        mock.patch.object(
+            ens_names, "redis_connection", return_value=self.fake_redis
+        ).start()
+
+    def _mock_reverse_records(self):
+        """
+        Patch the ReverseRecords contract, and return the mock of its
+        getNames function, which returns the test names.
+        """
+        contract = mock.patch("web3.eth.Eth.contract").start()
+        get_names = contract.return_value.functions.getNames
+        get_names.side_effect = lambda addresses: mock.Mock(**{
+            "call.return_value": [
+                self.names.get(address.lower(), "") for address in addresses
+            ]
+        })
+
+        return get_names
+
+    def test_name_cached(self):
+        """
+        Assert that an address is resolved once, and that names and
+        the addresses without one are cached with their own TTL.
+        """
+        # resolve each address twice
+        with mock.patch("ens.ENS") as mock_ens:
+            mock_ens.return_value.name.side_effect = self.names.get
+            names = [
+                ens_names.resolve_name(address)
+                for address in self.addresses[:2] * 2
+            ]
+
+        # make assertions
+        self.assertEqual(names, ["first.eth", None] * 2)
+        self.assertEqual(mock_ens.return_value.name.call_count, 2)
+        self.assertEqual(
+            self.fake_redis.ttl(self.cache.key(self.addresses[0])), 86400
+        )
+        self.assertEqual(
+            self.fake_redis.ttl(self.cache.key(self.addresses[1])), 259200
+        )
+
+    @override_settings(ENS_NAMES={
+        "TTL": 86400, "NEGATIVE_TTL": 0, "BATCH_SIZE": 100
+    })
+    def test_negative_cache_disabled(self):
+        """
+        Assert that addresses without a name are not cached
+        when their TTL is 0.
+        """
+        self.cache = ens_names.EnsCache(self.fake_redis)
+        self.cache.save({self.addresses[0]: "first.eth"})
+        self.cache.save({self.addresses[1]: None})
+
+        self.assertEqual(
+            self.cache.load(self.addresses[:2]),
+            {self.addresses[0]: "first.eth"}
+        )
+
+    @override_settings(ENS_NAMES={
+        "TTL": 86400, "NEGATIVE_TTL": 259200, "BATCH_SIZE": 2
+    })
+    def test_names_resolved_in_batches(self):
+        """
+        Assert that the addresses that are not cached are resolved
+        with one call per batch, and cached.
+        """
+        # set up test
+        get_names = self._mock_reverse_records()
+        self.cache.save({self.addresses[1]: None})
+
+        # resolve the addresses, then again
+        names = ens_names.resolve_names(self.addresses)
+        again = ens_names.resolve_names(self.addresses)
+
+        # make assertions
+        expected = {address: None for address in self.addresses}
+        expected.update(self.names)
+        self.assertEqual(names, expected)
+        self.assertEqual(again, expected)
+        self.assertEqual(
+            [call.args[0] for call in get_names.call_args_list], [
+                [web3.Web3.toChecksumAddress(address) for address in batch]
+                for batch in [self.addresses[0:3:2], self.addresses[3:5]]
+            ]
+        )
+
+    def test_chain_without_contract(self):
+        """
+        Assert that each address is resolved with ens.ENS on chains
+        without the ReverseRecords contract.
+        """
+        # set up test
+        get_names = self._mock_reverse_records()
+        get_names.side_effect = web3.exceptions.BadFunctionCallOutput
+
+        # resolve the addresses
+        with mock.patch("ens.ENS") as mock_ens:
+            mock_ens.return_value.name.side_effect = self.names.get
+            names = ens_names.resolve_names(self.addresses[:3])
+
+        # make assertions
+        self.assertEqual(names, {
+            self.addresses[0]: "first.eth", self.addresses[1]: None,
+            self.addresses[2]: None
+        })
+        self.assertEqual(mock_ens.return_value.name.call_count, 3)
@@ -6,13 +6,14 @@ from unittest import mock
 from pathlib import Path
 
 # third party imports
+from asgiref.sync import async_to_sync
+from django.test import override_settings
 from responses import matchers
-from responses.registries import OrderedRegistry
 import responses
 
 # our imports
 from ....basetest import BaseTestCase
-from .. import etherscan
+from .. import etherscan, extract
 from ..base_scraper import BaseScraper
 from ....models import Tag
 
@@ -30,113 +31,161 @@ class EtherscanTests(BaseTestCase):
         self.samples_dir = Path(__file__).parent.joinpath(
             "./samples/etherscan"
         )
+        self.empty_page = "<html><body>Nothing here</body></html>"
 
     def test_job_parent(self):
         """ Assert that the scraper is a child of the Base parent. """
         self.assertTrue(isinstance(self.client, BaseScraper))
 
-    def test_request_logic(self):
+    def _mock_lookup_pages(self, token=True):
         """
-        Assert that the job takes the following steps:
-            1. Makes a request to the etherscan home page.
-            2. Updates its headers.
-            3. Makes a request to lookup the desired address.
+        Register and return mock GET responses for the etherscan home page,
+        then the address and token pages, which expect the headers of
+        the requests that follow the home page. The token page is only
+        registered if token is True, e.g. not when the address page
+        has a label and the token page is not requested.
         """
-        # set up test
-        # register expected requests in particular order
-        # pylint: disable=protected-access
-        self.mock_responses._set_registry(OrderedRegistry)
-        first = self.mock_responses.add(responses.GET, "https://etherscan.io/")
-        second = self.mock_responses.add(
+        home = self.mock_responses.add(responses.GET, "https://etherscan.io/")
+        address_lookup = self.mock_responses.add(
             responses.GET,
             f"https://etherscan.io/address/{self.test_addr}/",
+            body=self.empty_page,
+            match=[
+                # expects certain headers to be there
+                matchers.header_matcher(etherscan.subsequent_headers)
+            ]
+        )
+        if not token:
+            return home, address_lookup, None
+
+        token_lookup = self.mock_responses.add(
+            responses.GET,
+            f"https://etherscan.io/token/{self.test_addr}/",
+            body=self.empty_page,
             match=[
                 # expects certain headers to be there
                 matchers.header_matcher(etherscan.subsequent_headers)
             ]
         )
 
+        return home, address_lookup, token_lookup
+
+    def test_request_logic(self):
+        """
+        Assert that the job takes the following steps:
+            1. Makes a request to the etherscan home page.
+            2. Updates its headers.
+            3. Makes a request to lookup the desired address, then
+               one to lookup the token since the address has no label.
+        """
+        # set up test
+        home, address_lookup, token_lookup = self._mock_lookup_pages()
+
         # run the job
         self.queue.enqueue(self.client.run, job_id=self.test_addr)
 
         # make assertions
-        self.assertEqual(first.call_count, 1)
-        self.assertEqual(second.call_count, 1)
+        self.assertEqual(home.call_count, 1)
+        self.assertEqual(address_lookup.call_count, 1)
+        self.assertEqual(token_lookup.call_count, 1)
+        self.assertEqual(
+            [call.request.url for call in self.mock_responses.calls],
+            [
+                "https://etherscan.io/",
+                f"https://etherscan.io/address/{self.test_addr}/",
+                f"https://etherscan.io/token/{self.test_addr}/"
+            ]
+        )
 
-    @mock.patch(
-        "nametags.jobs.scrapers.etherscan.EtherscanScraper.parse_address_label"
-    )
-    def test_address_lookup_found(self, mock_parse_label):
+    def test_token_page_skipped(self):
         """
-        Assert that a nametag is added to the database if it
-        is found during an address lookup.
+        Assert that the token page is not requested
+        when the address page has a label.
         """
         # set up test
-        fake_tag = "Etherscan Address Label"
-        mock_parse_label.return_value = fake_tag
-
-        # register expected requests in particular order
-        # pylint: disable=protected-access
-        self.mock_responses._set_registry(OrderedRegistry)
-        self.mock_responses.add(responses.GET, "https://etherscan.io/")
-        self.mock_responses.add(
-            responses.GET,
-            f"https://etherscan.io/address/{self.test_addr}/",
-            match=[
-                # expects certain headers to be there
-                matchers.header_matcher(etherscan.subsequent_headers)
-            ]
+        address_lookup_html = Path(self.samples_dir, "address_lookup.html")
+        with open(address_lookup_html, "r", encoding="utf-8") as fobj:
+            html_content = fobj.read()
+        self._mock_lookup_pages(token=False)
+        self.mock_responses.replace(
+            responses.GET, f"https://etherscan.io/address/{self.test_addr}/",
+            body=html_content
         )
 
         # run the job
-        self.queue.enqueue(self.client.run, job_id=self.test_addr)
+        job = self.queue.enqueue(self.client.run, job_id=self.test_addr)
 
         # make assertions
-        tag = Tag.objects.get(nametag=fake_tag)
-        self.assertEqual(tag.nametag, fake_tag)
+        self.assertEqual(job.result, "Flexpool.io")
+        self.assertNotIn(
+            f"https://etherscan.io/token/{self.test_addr}/",
+            [call.request.url for call in self.mock_responses.calls]
+        )
 
+    @override_settings(SCRAPE_ETHERSCAN={"CONCURRENT_PAGES": True})
+    def test_token_lookup_forked(self):
+        """
+        Assert that with concurrent pages, the token page is fetched by a
+        fork of the session, with its cookies, and that its page is cached
+        with the lookup.
+        """
+        # set up test
+        self._mock_lookup_pages()
+        self.mock_responses.replace(
+            responses.GET, "https://etherscan.io/",
+            headers={"Set-Cookie": "session=abc; Domain=etherscan.io"}
+        )
+        address_url = f"https://etherscan.io/address/{self.test_addr}/"
+        token_url = f"https://etherscan.io/token/{self.test_addr}/"
+
+        # look up the address
+        with mock.patch.object(
+            BaseScraper, "get_page", autospec=True,
+            side_effect=BaseScraper.get_page
+        ) as get_page:
+            self.client.scrape(self.test_addr)
+
+        # make assertions
+        scrapers = {
+            call.args[1]: call.args[0] for call in get_page.call_args_list
+        }
+        self.assertIs(scrapers[address_url], self.client)
+        self.assertIsNot(scrapers[token_url], self.client)
+        token_request, = [
+            call.request for call in self.mock_responses.calls
+            if call.request.url == token_url
+        ]
+        self.assertEqual(token_request.headers["Cookie"], "session=abc")
+        self.assertEqual(set(self.client.pages), {address_url, token_url})
+
+    @override_settings(SCRAPE_ETHERSCAN={"CONCURRENT_PAGES": True})
     @mock.patch(
         "nametags.jobs.scrapers.etherscan.EtherscanScraper.parse_address_label"
     )
     @mock.patch(
         "nametags.jobs.scrapers.etherscan.EtherscanScraper.parse_token_label"
     )
-    def test_address_lookup_not_found(self, mock_token, mock_address):
+    def test_address_lookup_found(self, mock_parse_token, mock_parse_addr):
         """
-        Assert that a token lookup is done if no label is found
-        during an address lookup.
+        Assert that a nametag is added to the database if it
+        is found during an address lookup, even if a token
+        label is found too when both pages are requested at once.
         """
         # set up test
-        mock_address.return_value = None
-        mock_token.return_value = None
-
-        # register expected requests in particular order
-        # pylint: disable=protected-access
-        self.mock_responses._set_registry(OrderedRegistry)
-        self.mock_responses.add(responses.GET, "https://etherscan.io/")
-        self.mock_responses.add(
-            responses.GET,
-            f"https://etherscan.io/address/{self.test_addr}/",
-            match=[
-                # expects certain headers to be there
-                matchers.header_matcher(etherscan.subsequent_headers)
-            ]
-        )
-        token_lookup = self.mock_responses.add(
-            responses.GET,
-            f"https://etherscan.io/token/{self.test_addr}/",
-            match=[
-                # expects certain headers to be there
-                matchers.header_matcher(etherscan.subsequent_headers)
-            ]
-        )
+        fake_tag = "Etherscan Address Label"
+        mock_parse_addr.return_value = fake_tag
+        mock_parse_token.return_value = "Etherscan Token Label"
+        self._mock_lookup_pages()
 
         # run the job
         self.queue.enqueue(self.client.run, job_id=self.test_addr)
 
         # make assertions
-        self.assertEqual(token_lookup.call_count, 1)
-        self.assertEqual(mock_token.call_count, 1)
+        tag = Tag.objects.get(nametag=fake_tag)
+        self.assertEqual(tag.nametag, fake_tag)
+        self.assertFalse(
+            Tag.objects.filter(nametag="Etherscan Token Label").exists()
+        )
 
     @mock.patch(
         "nametags.jobs.scrapers.etherscan.EtherscanScraper.parse_address_label"
@@ -153,27 +202,7 @@ class EtherscanTests(BaseTestCase):
         mock_parse_addr.return_value = None
         fake_tag = "Etherscan Token Label"
         mock_parse_token.return_value = fake_tag
-
-        # register expected requests in particular order
-        # pylint: disable=protected-access
-        self.mock_responses._set_registry(OrderedRegistry)
-        self.mock_responses.add(responses.GET, "https://etherscan.io/")
-        self.mock_responses.add(
-            responses.GET,
-            f"https://etherscan.io/address/{self.test_addr}/",
-            match=[
-                # expects certain headers to be there
-                matchers.header_matcher(etherscan.subsequent_headers)
-            ]
-        )
-        self.mock_responses.add(
-            responses.GET,
-            f"https://etherscan.io/token/{self.test_addr}/",
-            match=[
-                # expects certain headers to be there
-                matchers.header_matcher(etherscan.subsequent_headers)
-            ]
-        )
+        self._mock_lookup_pages()
 
         # run the job
         self.queue.enqueue(self.client.run, job_id=self.test_addr)
@@ -182,48 +211,114 @@ class EtherscanTests(BaseTestCase):
         tag = Tag.objects.get(nametag=fake_tag)
         self.assertEqual(tag.nametag, fake_tag)
 
-    @mock.patch(
-        "nametags.jobs.scrapers.etherscan.EtherscanScraper.parse_address_label"
-    )
-    @mock.patch(
-        "nametags.jobs.scrapers.etherscan.EtherscanScraper.parse_token_label"
-    )
-    def test_token_lookup_not_found(self, mock_parse_addr, mock_parse_token):
+    def test_token_lookup_not_found(self):
         """
         Assert that no nametag is added to the database if it
         can't be found in an address or token lookup.
         """
         # set up test
-        mock_parse_addr.return_value = None
-        mock_parse_token.return_value = None
         expected_count = Tag.objects.count()
+        self._mock_lookup_pages()
 
-        # register expected requests in particular order
-        # pylint: disable=protected-access
-        self.mock_responses._set_registry(OrderedRegistry)
-        self.mock_responses.add(responses.GET, "https://etherscan.io/")
-        self.mock_responses.add(
-            responses.GET,
-            f"https://etherscan.io/address/{self.test_addr}/",
-            match=[
-                # expects certain headers to be there
-                matchers.header_matcher(etherscan.subsequent_headers)
-            ]
+        # run the job
+        job = self.queue.enqueue(self.client.run, job_id=self.test_addr)
+
+        # make assertions
+        self.assertIsNone(job.result)
+        self.assertEqual(Tag.objects.count(), expected_count)
+
+    @mock.patch("nametags.jobs.scrapers.base_scraper.add_label_to_db")
+    @mock.patch(
+        "nametags.jobs.scrapers.etherscan.EtherscanScraper.parse_address_label"
+    )
+    def test_unchanged_page_skipped(self, mock_parse_label, mock_add_label):
+        """
+        Assert that a page with the same content as when it was last
+        scraped is not parsed again, and that its label is not added
+        to the database again, while a page that changed is.
+        """
+        # set up test
+        mock_parse_label.return_value = "Etherscan Address Label"
+        url = f"https://etherscan.io/address/{self.test_addr}/"
+        self._mock_lookup_pages(token=False)
+
+        # scrape the same page twice, then a changed page
+        labels = [
+            self.queue.enqueue(self.client.run, job_id=self.test_addr).result
+            for _ in range(2)
+        ]
+        self.mock_responses.replace(
+            responses.GET, url, body="<html><body>New label</body></html>"
         )
-        self.mock_responses.add(
-            responses.GET,
-            f"https://etherscan.io/token/{self.test_addr}/",
-            match=[
-                # expects certain headers to be there
-                matchers.header_matcher(etherscan.subsequent_headers)
-            ]
+        self.queue.enqueue(self.client.run, job_id=self.test_addr)
+
+        # make assertions
+        self.assertEqual(labels, ["Etherscan Address Label"] * 2)
+        self.assertEqual(mock_parse_label.call_count, 2)
+        self.assertEqual(mock_add_label.call_count, 2)
+
+    @mock.patch("nametags.jobs.scrapers.base_scraper.add_label_to_db")
+    def test_not_modified_page(self, mock_add_label):
+        """
+        Assert that the validators of a page are sent back to etherscan,
+        and that the cached label is returned when the page
+        is not modified.
+        """
+        # set up test
+        address_lookup_html = Path(self.samples_dir, "address_lookup.html")
+        with open(address_lookup_html, "r", encoding="utf-8") as fobj:
+            html_content = fobj.read()
+        url = f"https://etherscan.io/address/{self.test_addr}/"
+        self._mock_lookup_pages(token=False)
+        self.mock_responses.replace(
+            responses.GET, url, body=html_content, headers={"ETag": '"v1"'}
         )
 
-        # run the job
+        # scrape the page, then again when it is not modified
+        first = self.client.scrape(self.test_addr)
+        self.client.store(first, self.test_addr)
+        not_modified = self.mock_responses.replace(
+            responses.GET, url, status=304,
+            match=[matchers.header_matcher({"If-None-Match": '"v1"'})]
+        )
+        second = self.client.scrape(self.test_addr)
+        self.client.store(second, self.test_addr)
+
+        # make assertions
+        self.assertEqual([first, second], ["Flexpool.io"] * 2)
+        self.assertEqual(not_modified.call_count, 1)
+        self.assertEqual(mock_add_label.call_count, 1)
+
+    def test_deleted_tag_added_back(self):
+        """
+        Assert that the pages of a tag that is deleted are forgotten,
+        so that the next scrape adds its label back even though
+        the pages have not changed.
+        """
+        # set up test
+        address_lookup_html = Path(self.samples_dir, "address_lookup.html")
+        with open(address_lookup_html, "r", encoding="utf-8") as fobj:
+            html_content = fobj.read()
+        self._mock_lookup_pages(token=False)
+        self.mock_responses.replace(
+            responses.GET, f"https://etherscan.io/address/{self.test_addr}/",
+            body=html_content
+        )
+
+        # scrape the address, delete its tag, then scrape it again
+        self.queue.enqueue(self.client.run, job_id=self.test_addr)
+        with mock.patch(
+            "nametags.signals.redis_client",
+            return_value=self.client.page_cache.redis_cursor
+        ):
+            Tag.objects.all().delete()
         self.queue.enqueue(self.client.run, job_id=self.test_addr)
 
         # make assertions
-        self.assertEqual(Tag.objects.count(), expected_count)
+        self.assertEqual(
+            list(Tag.objects.values_list("nametag", "source")),
+            [("Flexpool.io", "etherscan")]
+        )
 
     def test_parse_address_label(self):
         """
@@ -271,6 +366,33 @@ class EtherscanTests(BaseTestCase):
         # make assertions
         self.assertEqual(label, "Tether USD")
 
+    def test_parse_stops_early(self):
+        """
+        Assert that parsing stops once the label is found, before the
+        rest of the page is parsed. A label whose path has steps without
+        a predicate is only known to be absent once their parents close,
+        like lxml would also look further for it.
+        """
+        # set up test
+        address_lookup_html = Path(self.samples_dir, "address_lookup.html")
+        with open(address_lookup_html, "r", encoding="utf-8") as fobj:
+            html_content = fobj.read()
+
+        # make requests
+        with mock.patch.object(
+            extract.PathExtractor, "feed", autospec=True,
+            side_effect=extract.PathExtractor.feed
+        ) as feed:
+            label = self.client.parse_address_label(html_content)
+            found_chunks = feed.call_count
+            absent = self.client.parse_token_label(html_content)
+
+        # make assertions
+        self.assertEqual(label, "Flexpool.io")
+        self.assertIsNone(absent)
+        total_chunks = len(html_content) / extract.CHUNK_SIZE
+        self.assertLess(found_chunks, total_chunks)
+
     def test_parse_token_label_not_found(self):
         """
         Assert that None is returned if a label is not found
@@ -284,3 +406,32 @@ class EtherscanTests(BaseTestCase):
 
         # make assertions
         self.assertEqual(label, None)
+
+    def test_async_token_lookup(self):
+        """
+        Assert that the async scraper looks up the address and the
+        token, and returns the token label when no address label
+        is found.
+        """
+        # set up test
+        token_lookup_html = Path(self.samples_dir, "token_lookup.html")
+        with open(token_lookup_html, "r", encoding="utf-8") as fobj:
+            html_content = fobj.read()
+        pages = ["", "<html><body>Nothing here</body></html>", html_content]
+
+        # run the scraper
+        scraper = etherscan.AsyncEtherscanScraper()
+        with mock.patch.object(scraper, "fetch", side_effect=pages) as fetch:
+            label = async_to_sync(scraper.run)(self.test_addr)
+
+        # make assertions
+        self.assertEqual(label, "Tether USD")
+        self.assertEqual(
+            [call.args[1] for call in fetch.call_args_list],
+            [
+                "https://etherscan.io/",
+                f"https://etherscan.io/address/{self.test_addr}/",
+                f"https://etherscan.io/token/{self.test_addr}/"
+            ]
+        )
+        self.assertEqual(scraper.headers["Referer"], "https://etherscan.io/")
@@ -13,7 +13,7 @@ import responses
 
 # our imports
 from ....basetest import BaseTestCase
-from .. import ethleaderboard
+from .. import ens_names, ethleaderboard
 from ..base_scraper import BaseScraper
 from ....models import Tag
 
@@ -218,3 +218,74 @@ class EthleaderboardTests(BaseTestCase):
             Tag.objects.filter(address=self.test_addr).exists(),
         )
         self.assertEqual(job.result, None)
+
+    def test_prefetch_ens_names(self):
+        """
+        Assert that the ENS names of a batch of addresses are resolved
+        at once, and that their lookups find them in the cache.
+        """
+        # set up test
+        self._mock_landing_page_resp()
+        self._mock_results_resp(self.single_result_resp, self.test_ens_name)
+        addresses = [self.test_addr, f"0x{'1' * 40}"]
+        mock.patch.object(
+            ens_names, "redis_connection", return_value=self.fake_redis
+        ).start()
+
+        # prefetch the batch, then run the job of an address
+        with mock.patch.object(
+            ens_names, "lookup_names",
+            return_value=dict(zip(addresses, [self.test_ens_name, None]))
+        ) as lookup_names, mock.patch("ens.ENS") as mock_ens:
+            self.client.prefetch(addresses)
+            job = self.queue.enqueue(self.client.run, job_id=self.test_addr)
+
+        # make assertions
+        lookup_names.assert_called_once_with(addresses)
+        self.assertEqual(mock_ens.return_value.name.call_count, 0)
+        self.assertEqual(job.result, "https://twitter.com/seekmine")
+
+    def test_mirror_lookup(self):
+        """
+        Assert that ENS names are looked up in the mirror once it is
+        synced, without any request to ethleaderboard.
+        """
+        # set up test without registering any mock responses
+        self.client.mirror.replace(self.multi_results_resp["frens"])
+
+        # make the address resolve to an ens name
+        # then run the job
+        with mock.patch("ens.ENS") as mock_ens:
+            mock_ens.return_value.name.return_value = self.test_ens_name
+            job = self.queue.enqueue(self.client.run, job_id=self.test_addr)
+
+        # make assertions
+        self.assertEqual(
+            job.result.split(", ")[0], "https://twitter.com/seekmine"
+        )
+        self.assertEqual(len(job.result.split(", ")), 5)
+
+    def test_leaderboard_pages(self):
+        """
+        Assert that the whole leaderboard is fetched a page at a time,
+        until the count of accounts is reached.
+        """
+        # set up test
+        frens = self.multi_results_resp["frens"]
+        self._mock_landing_page_resp()
+        pages = [
+            self.mock_responses.add(
+                responses.GET,
+                "https://ethleaderboard.xyz/api/frens",
+                match=[matchers.query_string_matcher(f"skip={skip}")],
+                json={"frens": frens[skip:skip + 25], "count": len(frens)}
+            )
+            for skip in [0, 25, 50]
+        ]
+
+        # fetch the leaderboard
+        accounts = list(self.client.leaderboard())
+
+        # make assertions
+        self.assertEqual(accounts, frens)
+        self.assertEqual([page.call_count for page in pages], [1, 1, 1])
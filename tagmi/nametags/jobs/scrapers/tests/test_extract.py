@@ -0,0 +1,201 @@
+"""
+Module containing tests for the streaming extraction of labels.
+"""
+# std lib imports
+from pathlib import Path
+from unittest import mock
+
+# third party imports
+from django.test import SimpleTestCase
+import lxml.html
+
+# our imports
+from .. import extract
+from ..rules import RULES
+
+
+class ExtractTests(SimpleTestCase):
+    """
+    Tests the streaming extraction of labels.
+    """
+
+    def assert_same_as_tree(self, html_content, xpaths):
+        """
+        Assert that the text extracted at each of the given xpaths is
+        the text lxml finds there, whatever the size of the chunks.
+        """
+        tree = lxml.html.fromstring(html_content)
+        for xpath in xpaths:
+            value = tree.xpath(xpath)
+            expected = value[0].text if len(value) != 0 else None
+            for size in [1, 7, len(html_content)]:
+                extractor = extract.PathExtractor([xpath])
+                for start in range(0, len(html_content), size):
+                    extractor.feed(html_content[start:start + size])
+
+                self.assertEqual(extractor.close(), expected, (xpath, size))
+
+    def test_implied_end_tags(self):
+        """
+        Assert that elements are counted like lxml does when end tags
+        are left out, void or stray.
+        """
+        html_content = (
+            "<html><body><p>intro<div>one</div><ul><li>a<li>b</ul>"
+            "<br><div>two<img src='x.png'></span>"
+            "<div>three &amp; more<b>bold</b> tail</div></body></html>"
+        )
+
+        self.assert_same_as_tree(html_content, [
+            "/html/body/div[1]", "/html/body/div[2]", "/html/body/div[3]",
+            "/html/body/ul/li[2]", "/html/body/div[4]"
+        ])
+
+    def test_implied_elements(self):
+        """
+        Assert that elements are placed like lxml places them when the
+        body, or the head and the body, are left out.
+        """
+        self.assert_same_as_tree(
+            "<html><div><span>Hi</span>",
+            ["/html/body/div/span", "/html/div/span"]
+        )
+        self.assert_same_as_tree(
+            "<html><head><title>title</title></head>"
+            "<div>one</div><div>two</div></html>",
+            ["/html/head/title", "/html/body/div[1]", "/html/body/div[2]"]
+        )
+        self.assert_same_as_tree(
+            "<html><title>title</title><meta charset='utf-8'>"
+            "<div>one</div></html>",
+            ["/html/head/title", "/html/body/div", "/html/div"]
+        )
+
+    def test_nested_elements(self):
+        """
+        Assert that links and forms nested in themselves
+        are placed like lxml places them.
+        """
+        self.assert_same_as_tree(
+            "<html><body><a>one<a>two</a></a><a>three</a></body></html>",
+            [
+                "/html/body/a[1]", "/html/body/a[2]", "/html/body/a[3]",
+                "/html/body/a[1]/a"
+            ]
+        )
+        self.assert_same_as_tree(
+            "<html><body><form><form><div>one</div></form>"
+            "<div>two</div></form></body></html>",
+            [
+                "/html/body/form/div[1]", "/html/body/form/div[2]",
+                "/html/body/form/form/div"
+            ]
+        )
+
+    def test_whole_tags_fed(self):
+        """
+        Assert that the parser is only fed whole tags,
+        and the rest of the html once it is closed.
+        """
+        parser = mock.Mock()
+        feeder = extract.TagFeeder(parser)
+
+        for chunk in ["<html><bo", "dy a='>'><div", ">text", "</div"]:
+            feeder.feed(chunk)
+        feeder.close()
+
+        self.assertEqual(
+            [call.args[0] for call in parser.feed.call_args_list],
+            ["<html>", "<body a='>'>", "<div>", "text</div"]
+        )
+        parser.close.assert_called_once()
+
+    def test_raw_text_and_quotes(self):
+        """
+        Assert that tags in scripts and comments are not counted, and
+        that stray quotes in a tag do not hide the tags after it.
+        """
+        html_content = (
+            "<html><head><script>var a = '<div>';</script></head><body>"
+            "<!-- <div>hidden</div> --><a title=\"b\" \" href='/'>link</a>"
+            "<div data-x=\"a>b\">one</div><div>two</div></body></html>"
+        )
+
+        self.assert_same_as_tree(html_content, [
+            "/html/head/script", "/html/body/a", "/html/body/div[1]",
+            "/html/body/div[2]"
+        ])
+
+    def test_recorded_pages(self):
+        """
+        Assert that the labels of the recorded etherscan pages are found.
+        """
+        samples_dir = Path(__file__).parent.joinpath("./samples/etherscan")
+        for page, label in [
+            ("address_lookup.html", "Flexpool.io"),
+            ("token_lookup.html", "Tether USD")
+        ]:
+            path = Path(samples_dir, page)
+            with open(path, "r", encoding="utf-8") as fobj:
+                html_content = fobj.read()
+
+            self.assertIn(label, [
+                extract.extract_text(field.selectors, html_content)
+                for field in RULES["etherscan"].fields.values()
+            ])
+
+    def test_fallback_paths(self):
+        """
+        Assert that the text of the first path that has one is extracted,
+        once the paths before it are known to be absent.
+        """
+        html_content = (
+            "<html><body><div>one</div><div><span></span></div>"
+            "<div>three</div></body></html>"
+        )
+
+        for xpaths, expected in [
+            (["/html/body/div[2]/span", "/html/body/div[3]"], "three"),
+            (["/html/body/div[4]", "/html/body/div[1]"], "one"),
+            (["/html/body/div[3]", "/html/body/div[1]"], "three"),
+            (["/html/body/p", "/html/body/div[2]/span"], None)
+        ]:
+            self.assertEqual(
+                extract.extract_text(xpaths, html_content), expected, xpaths
+            )
+
+    def test_absent_before_end(self):
+        """
+        Assert that a path is known to be absent once the parents of its
+        positional steps had the child at their position or were closed,
+        and that the elements closed so far are dropped.
+        """
+        html_content = (
+            "<html><body><div><p>one</p></div><div><span>two</span></div>"
+            + "<section><p>more</p></section>" * 100 + "</body></html>"
+        )
+
+        for xpath in ["/html/body[1]/div[1]/span", "/html/body[1]/div[2]/p"]:
+            extractor = extract.PathExtractor([xpath])
+            extractor.feed(html_content[:100])
+
+            self.assertTrue(extractor.done, xpath)
+            self.assertIsNone(extractor.close(), xpath)
+
+        # a body could follow until the html is closed
+        extractor = extract.PathExtractor(["/html/body/div[3]"])
+        end = html_content.index("</body>")
+        for start in range(0, end, 100):
+            extractor.feed(html_content[start:min(start + 100, end)])
+            self.assertFalse(extractor.done)
+            self.assertLessEqual(len(extractor.root.find("body")), 2)
+
+        extractor.feed(html_content[end:])
+        self.assertIsNone(extractor.close())
+
+    def test_unsupported_path(self):
+        """
+        Assert that xpaths that are not absolute paths are rejected.
+        """
+        with self.assertRaises(ValueError):
+            extract.PathExtractor(["//div[@id='main']"])
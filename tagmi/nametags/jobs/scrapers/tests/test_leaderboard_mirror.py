@@ -0,0 +1,88 @@
+"""
+Module containing tests for the local mirror of the ethleaderboard.
+"""
+# std lib imports
+from pathlib import Path
+import json
+
+# third party imports
+from django.test import override_settings
+
+# our imports
+from ....basetest import BaseTestCase
+from ....models import LeaderboardHandle
+from ..ethleaderboard import EthleaderboardScraper
+from ..leaderboard_mirror import LeaderboardMirror
+
+
+class LeaderboardMirrorTests(BaseTestCase):
+    """
+    Tests the local mirror of the ethleaderboard.
+    """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        self.mirror = LeaderboardMirror(self.fake_redis)
+        path = Path(__file__).parent.joinpath(
+            "./samples/ethleaderboard/multiple_results.json"
+        )
+        with open(path, "r", encoding="utf-8") as fobj:
+            self.results_resp = json.loads(fobj.read())
+
+    def test_same_handles_as_search(self):
+        """
+        Assert that the handles of an ENS name in the mirror are the
+        ones the scraper finds in the search results of ethleaderboard.
+        """
+        self.mirror.replace(self.results_resp["frens"])
+
+        for ens_name in ["master.eth", "Duckmaster.eth", "sakemaster.eth"]:
+            nametag = EthleaderboardScraper.build_nametag(
+                self.results_resp, ens_name
+            )
+            expected = nametag.split(", ") if nametag else []
+            self.assertCountEqual(
+                [
+                    f"https://twitter.com/{handle}"
+                    for handle in self.mirror.lookup(ens_name)
+                ],
+                expected,
+                ens_name
+            )
+
+    def test_replace(self):
+        """
+        Assert that syncing replaces the whole mirror,
+        and that the most followed handles come first.
+        """
+        self.mirror.replace(self.results_resp["frens"])
+        self.mirror.replace([
+            {"name": "Master.eth", "handle": "second", "followers": 1},
+            {"name": "a.eth | master.eth", "handle": "first", "followers": 2},
+            {"name": "No name", "handle": "none"}
+        ])
+
+        self.assertEqual(self.mirror.lookup("master.eth"), ["first", "second"])
+        self.assertEqual(self.mirror.lookup("a.eth"), ["first"])
+        self.assertEqual(LeaderboardHandle.objects.count(), 3)
+
+    def test_stale_mirror(self):
+        """
+        Assert that the mirror is not used before it is synced,
+        once it is older than its max age, or when it is disabled.
+        """
+        self.assertIsNone(self.mirror.lookup("master.eth"))
+
+        self.mirror.replace(self.results_resp["frens"])
+        self.assertEqual(
+            self.fake_redis.ttl(self.mirror.synced_key), 172800
+        )
+        self.fake_redis.delete(self.mirror.synced_key)
+        self.assertIsNone(self.mirror.lookup("master.eth"))
+
+        with override_settings(ETHLEADERBOARD_MIRROR={"MAX_AGE": 0}):
+            mirror = LeaderboardMirror(self.fake_redis)
+            mirror.replace(self.results_resp["frens"])
+            self.assertIsNone(mirror.lookup("master.eth"))
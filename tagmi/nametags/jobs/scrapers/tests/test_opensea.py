@@ -2,7 +2,9 @@
 Module containing tests for the opensea.py scraper.
 """
 # std lib imports
+from unittest import mock
 from pathlib import Path
+import json
 
 # third party imports
 from responses.registries import OrderedRegistry
@@ -141,3 +143,69 @@ class OpenseaTests(BaseTestCase):
             Tag.objects.filter(address=self.test_addr)
             .exists()
         )
+
+    def test_parse_label_embedded_data(self):
+        """
+        Assert that the label is built from the data the page embeds,
+        without parsing the html, and that it is the same label as the
+        one built from the html of pages that do not embed the data.
+        """
+        for page in ["profile_found.html", "profile_not_found.html"]:
+            with open(Path(self.samples_dir, page), encoding="utf-8") as fobj:
+                html_content = fobj.read()
+
+            # parse the page, then the page without the embedded data
+            with mock.patch.object(
+                opensea.RULES["opensea"], "extract",
+                wraps=opensea.RULES["opensea"].extract
+            ) as extract:
+                embedded = self.client.parse_label(html_content)
+                self.assertFalse(extract.called)
+                parsed = self.client.parse_label(
+                    html_content.replace('id="__NEXT_DATA__"', "")
+                )
+                self.assertTrue(extract.called)
+
+            # make assertions
+            self.assertEqual(embedded, parsed)
+
+    def test_parse_embedded_account_fields(self):
+        """
+        Assert that the values of the profile are read from the account
+        only, not from the objects that come after it in the payload.
+        """
+        # set up test, the account has no metadata or display name
+        # but an asset after it does
+        data = {
+            "account": {
+                "user": {
+                    "publicUsername": "user",
+                    "favoriteAssetCount": 2,
+                    "dateJoined": "2021-03-01T00:00:00"
+                }
+            },
+            "sidebarCollected": {"searchItems": {"totalCount": 5}},
+            "sidebarCreated": {"searchItems": {"totalCount": 1}},
+            "assets": [{
+                "displayName": "asset",
+                "metadata": {"twitterUsername": "asset"},
+                "sidebarCollected": {"searchItems": {"totalCount": 9}}
+            }]
+        }
+        payload = {"props": {"relayCache": [["AccountPageQuery", {
+            "json": {"data": data}
+        }]]}}
+        html_content = (
+            '<html><body><script id="__NEXT_DATA__" type="application/json">'
+            f'{json.dumps(payload)}</script></body></html>'
+        )
+
+        # make assertions
+        self.assertEqual(self.client.parse_embedded(html_content), {
+            "joined": "Joined March 2021",
+            "username": "user",
+            "socials": None,
+            "collected": "5",
+            "created": "1",
+            "favorited": "2"
+        })
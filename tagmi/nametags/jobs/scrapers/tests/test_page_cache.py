@@ -0,0 +1,97 @@
+"""
+Module containing tests for the page cache of the scrapers.
+"""
+# std lib imports
+
+# third party imports
+from django.test import override_settings
+
+# our imports
+from ....basetest import BaseTestCase
+from .. import page_cache
+
+
+@override_settings(SCRAPE_PAGE_CACHE={"TTL": 60, "MAX_ENTRIES": 2})
+class PageCacheTests(BaseTestCase):
+    """
+    Tests the page cache.
+    """
+
+    def setUp(self):
+        """ Runs before each test. """
+        super().setUp()
+        self.cache = page_cache.PageCache(self.fake_redis)
+        self.entry = {
+            "etag": '"abc"',
+            "last_modified": "Wed, 21 Oct 2015 07:28:00 GMT",
+            "digest": "0" * 64,
+            "label": "Flexpool.io"
+        }
+
+    def test_entry_saved(self):
+        """
+        Assert that a saved entry is loaded with a ttl, and that its
+        validators are sent back in a conditional request.
+        """
+        self.cache.save({"https://etherscan.io/a/": self.entry})
+
+        self.assertEqual(
+            self.cache.load("https://etherscan.io/a/"), self.entry
+        )
+        self.assertIsNone(self.cache.load("https://etherscan.io/b/"))
+        self.assertGreater(
+            self.fake_redis.ttl(self.cache.key("https://etherscan.io/a/")), 0
+        )
+        self.assertEqual(
+            self.cache.validators(self.entry),
+            {
+                "If-None-Match": '"abc"',
+                "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"
+            }
+        )
+        self.assertEqual(self.cache.validators(None), {})
+
+    def test_least_recent_evicted(self):
+        """
+        Assert that the least recently saved entries are evicted
+        once the cache is full.
+        """
+        for page in ["a", "b", "c"]:
+            self.cache.save({f"https://etherscan.io/{page}/": self.entry})
+
+        self.assertIsNone(self.cache.load("https://etherscan.io/a/"))
+        self.assertIsNotNone(self.cache.load("https://etherscan.io/b/"))
+        self.assertIsNotNone(self.cache.load("https://etherscan.io/c/"))
+        self.assertEqual(self.fake_redis.zcard(self.cache.index_key), 2)
+
+    def test_pages_forgotten(self):
+        """
+        Assert that only the pages of the given source
+        and address are forgotten.
+        """
+        self.cache.save(
+            {"https://etherscan.io/a/": self.entry}, "etherscan", "0xa"
+        )
+        self.cache.save(
+            {"https://opensea.io/a": self.entry}, "opensea", "0xa"
+        )
+
+        self.assertEqual(self.cache.forget("etherscan", "0xa"), 1)
+        self.assertIsNone(self.cache.load("https://etherscan.io/a/"))
+        self.assertIsNotNone(self.cache.load("https://opensea.io/a"))
+        self.assertEqual(
+            self.fake_redis.zrange(self.cache.index_key, 0, -1),
+            [b"https://opensea.io/a"]
+        )
+        self.assertEqual(self.cache.forget("etherscan", "0xa"), 0)
+
+    @override_settings(SCRAPE_PAGE_CACHE={"TTL": 0, "MAX_ENTRIES": 2})
+    def test_disabled(self):
+        """
+        Assert that nothing is cached when the ttl is 0.
+        """
+        cache = page_cache.PageCache(self.fake_redis)
+        cache.save({"https://etherscan.io/a/": self.entry})
+
+        self.assertIsNone(cache.load("https://etherscan.io/a/"))
+        self.assertEqual(self.fake_redis.keys(), [])
@@ -0,0 +1,99 @@
+"""
+Module containing tests for the rate limiter of the scrapers.
+"""
+# std lib imports
+from unittest import mock
+
+# third party imports
+from django.test import override_settings
+import responses
+
+# our imports
+from ....basetest import BaseTestCase
+from .. import rate_limiter
+from ..base_scraper import BaseScraper
+
+
+@override_settings(SCRAPE_RATE_LIMIT={
+    "RATE": 2,
+    "RATES": {"dune.com": 0.5, "etherscan.io": 0},
+    "BURST": 2
+})
+class RateLimiterTests(BaseTestCase):
+    """
+    Tests the rate limiter.
+    """
+
+    def setUp(self):
+        """ Runs before each test. """
+        super().setUp()
+        self.limiter = rate_limiter.RateLimiter(self.fake_redis)
+
+    def test_burst_then_rate(self):
+        """
+        Assert that a burst of requests is allowed right away,
+        and that the next requests wait for their turn.
+        """
+        delays = [self.limiter.reserve("opensea.io") for _ in range(4)]
+
+        self.assertEqual(delays[:2], [0, 0])
+        self.assertAlmostEqual(delays[2], 0.5, places=1)
+        self.assertAlmostEqual(delays[3], 1, places=1)
+
+    def test_bucket_refills(self):
+        """
+        Assert that the bucket refills while no requests are made.
+        """
+        for _ in range(3):
+            self.limiter.reserve("opensea.io")
+
+        # a second later, one request is waiting and two tokens were added
+        key = self.limiter.key("opensea.io")
+        updated_at = float(self.fake_redis.hget(key, "updated_at"))
+        self.fake_redis.hset(key, "updated_at", updated_at - 1)
+
+        self.assertEqual(self.limiter.reserve("opensea.io"), 0)
+        self.assertGreater(self.limiter.reserve("opensea.io"), 0)
+
+    def test_hosts_limited_separately(self):
+        """
+        Assert that every host has its own bucket and rate,
+        and that hosts with a rate of 0 are not limited.
+        """
+        for _ in range(2):
+            self.limiter.reserve("opensea.io")
+
+        self.assertEqual(self.limiter.reserve("dune.com"), 0)
+        self.assertEqual(self.limiter.reserve("dune.com"), 0)
+        self.assertAlmostEqual(
+            self.limiter.reserve("dune.com"), 2, places=1
+        )
+        self.assertEqual(
+            [self.limiter.reserve("etherscan.io") for _ in range(5)],
+            [0] * 5
+        )
+
+    def test_buckets_shared(self):
+        """
+        Assert that limiters sharing a redis instance share their buckets.
+        """
+        other = rate_limiter.RateLimiter(self.fake_redis)
+        self.limiter.reserve("opensea.io")
+        other.reserve("opensea.io")
+
+        self.assertGreater(self.limiter.reserve("opensea.io"), 0)
+
+    @mock.patch("nametags.jobs.scrapers.rate_limiter.time.sleep")
+    def test_requests_wait(self, mock_sleep):
+        """
+        Assert that the requests of the scrapers wait for the limiter.
+        """
+        self.mock_responses.add(responses.GET, "https://opensea.io/")
+        scraper = BaseScraper()
+        scraper.rate_limiter = self.limiter
+
+        for _ in range(3):
+            scraper.get("https://opensea.io/")
+
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args.args[0], 0.5, places=1)
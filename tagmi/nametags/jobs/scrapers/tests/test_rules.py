@@ -0,0 +1,96 @@
+"""
+Module containing tests for the extraction rules of the scrapers.
+"""
+# std lib imports
+from pathlib import Path
+
+# third party imports
+from django.test import SimpleTestCase
+
+# our imports
+from ..rules import Field, Rules, RULES
+
+
+class RulesTests(SimpleTestCase):
+    """
+    Tests the extraction rules of the scrapers.
+    """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        self.samples_dir = Path(__file__).parent.joinpath("./samples")
+        self.html_content = (
+            "<html><body><div><h1>Title</h1><a href='/a'>a</a>"
+            "<a href='/b'>b</a></div><div id='new'>Moved</div></body></html>"
+        )
+
+    def test_fallback_selectors(self):
+        """
+        Assert that the first selector that matches is used,
+        in the order the selectors are given.
+        """
+        rules = Rules("test", [
+            Field("title", ["/html/body/div[2]/h1/text()", "//h1/text()"]),
+            Field("moved", [
+                "/html/body/div[1]/span/text()", '//*[@id="new"]/text()',
+                "//h1/text()"
+            ])
+        ])
+
+        values = rules.extract(self.html_content)
+
+        self.assertEqual(values, {"title": "Title", "moved": "Moved"})
+
+    def test_many_and_defaults(self):
+        """
+        Assert that the values of fields of many values are joined, and
+        that fields that match nothing have their default.
+        """
+        rules = Rules("test", [
+            Field("links", ["//a/@href"], many=True),
+            Field("first_link", ["//a/@href"]),
+            Field("count", ["//span/text()"], default="0"),
+            Field("missing", ["//span/text()"])
+        ])
+
+        values = rules.extract(self.html_content)
+
+        self.assertEqual(values, {
+            "links": "/a /b", "first_link": "/a", "count": "0",
+            "missing": None
+        })
+
+    def test_streamed_fields(self):
+        """
+        Assert that streamed fields are looked up with the streaming
+        extractor, and that only absolute paths are accepted for them.
+        """
+        rules = Rules("test", [
+            Field("moved", ["/html/body/div[3]", "/html/body/div[2]"]),
+            Field("missing", ["/html/body/p"], default="none")
+        ], streamed=True)
+
+        self.assertEqual(rules.stream("moved", self.html_content), "Moved")
+        self.assertEqual(rules.stream("missing", self.html_content), "none")
+        with self.assertRaises(ValueError):
+            Rules("test", [Field("title", ["//h1"])], streamed=True)
+
+    def test_opensea_rules(self):
+        """
+        Assert that the fields of the recorded opensea profile pages
+        are extracted.
+        """
+        path = Path(self.samples_dir, "opensea/profile_found.html")
+        with open(path, "r", encoding="utf-8") as fobj:
+            found = RULES["opensea"].extract(fobj.read())
+        path = Path(self.samples_dir, "opensea/profile_not_found.html")
+        with open(path, "r", encoding="utf-8") as fobj:
+            not_found = RULES["opensea"].extract(fobj.read())
+
+        self.assertEqual(found, {
+            "joined": "Joined October 2019", "username": "thgirbx",
+            "socials": "https://twitter.com/seekmine", "collected": "351",
+            "created": "3", "favorited": "8"
+        })
+        self.assertIsNone(not_found["joined"])
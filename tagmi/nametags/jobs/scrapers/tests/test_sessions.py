@@ -0,0 +1,126 @@
+"""
+Module containing tests for the sessions of the scrapers.
+"""
+# std lib imports
+
+# third party imports
+from django.conf import settings
+import requests
+import responses
+
+# our imports
+from ....basetest import BaseTestCase
+from .. import sessions
+from ..base_scraper import BaseScraper
+
+
+class MockScraper(BaseScraper):
+    """ Mock scraper that visits a home page to get a cookie. """
+
+    source = "mock"
+
+    def prepare(self):
+        self.get("https://mock.com/")
+
+    def lookup(self, address):
+        self.warm_up()
+        return self.get(f"https://mock.com/{address}").text
+
+
+class SessionsTests(BaseTestCase):
+    """
+    Tests the sessions of the scrapers.
+    """
+
+    def mock_home(self):
+        """ Mocks the home page that sets the cookie of the session. """
+        return self.mock_responses.add(
+            responses.GET, "https://mock.com/",
+            headers={"Set-Cookie": "session=abc; Path=/"}
+        )
+
+    def test_session_kept_per_class(self):
+        """
+        Assert that the registry keeps a session per scraper class.
+        """
+        first = sessions.registry.get(MockScraper)
+        second = sessions.registry.get(MockScraper)
+        other = sessions.registry.get(BaseScraper)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(sum(sessions.registry.created.values()), 2)
+        self.assertEqual(sessions.registry.reused["MockScraper"], 1)
+
+    def test_expired_session_reset(self):
+        """
+        Assert that a kept session that the source rejects is reset,
+        prepared again, and that the lookup is retried.
+        """
+        home = self.mock_home()
+        self.mock_responses.add(
+            responses.GET, f"https://mock.com/{self.test_addr}", body="label"
+        )
+        scraper = sessions.registry.get(MockScraper)
+        scraper.scrape(self.test_addr)
+
+        # the cookie of the session expires
+        self.mock_responses.replace(
+            responses.GET, f"https://mock.com/{self.test_addr}", status=403
+        )
+        self.mock_responses.add(
+            responses.GET, f"https://mock.com/{self.test_addr}", body="label"
+        )
+        scraper.headers.update({"Referer": "https://mock.com/"})
+
+        # make assertions
+        self.assertEqual(scraper.scrape(self.test_addr), "label")
+        self.assertEqual(home.call_count, 2)
+        self.assertNotIn("Referer", scraper.headers)
+        self.assertEqual(scraper.cookies.get("session"), "abc")
+
+    def test_rejected_fresh_session_raises(self):
+        """
+        Assert that a lookup is not retried if the session
+        was prepared for it.
+        """
+        home = self.mock_home()
+        self.mock_responses.add(
+            responses.GET, f"https://mock.com/{self.test_addr}", status=403
+        )
+        scraper = sessions.registry.get(MockScraper)
+
+        with self.assertRaises(requests.HTTPError):
+            scraper.scrape(self.test_addr)
+        self.assertEqual(home.call_count, 1)
+
+    def test_adapters_configured(self):
+        """
+        Assert that the connection pools are sized and retry
+        as configured.
+        """
+        adapter = sessions.adapters["https://"]
+
+        self.assertEqual(
+            adapter.max_retries.total, settings.SCRAPE_HTTP["RETRIES"]
+        )
+        self.assertEqual(
+            adapter._pool_maxsize,  # pylint: disable=protected-access
+            settings.SCRAPE_HTTP["POOL_SIZE"]
+        )
+
+    def test_connection_stats(self):
+        """
+        Assert that the requests that reuse a connection are counted.
+        """
+        poolmanager = sessions.adapters["https://"].poolmanager
+        self.addCleanup(poolmanager.clear)
+        pool = poolmanager.connection_from_url("https://mock.com/")
+        pool.num_requests = 5
+        pool.num_connections = 2
+
+        self.assertEqual(
+            sessions.connection_stats()["mock.com"],
+            {"requests": 5, "connections": 2, "reused": 3}
+        )
+        self.assertIn("mock.com 3/5", sessions.registry.summary())
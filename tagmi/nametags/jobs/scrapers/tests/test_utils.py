@@ -0,0 +1,70 @@
+"""
+Module containing tests for the utilities of scraper jobs.
+"""
+# std lib imports
+from unittest import mock
+
+# third party imports
+
+# our imports
+from ....basetest import BaseTestCase
+from ....models import Address, Tag
+from .. import utils
+
+
+class AddLabelTests(BaseTestCase):
+    """
+    Tests adding the labels found by scrapers to the database.
+    """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        self.publish = mock.patch.object(
+            utils, "publish_address_changed"
+        ).start()
+
+    def test_label_replaced(self):
+        """
+        Assert that an address has one tag per source, whose nametag
+        is replaced when the label of the source changes.
+        """
+        # add labels of the same source, and one of another
+        utils.add_label_to_db("Collected: 1", "opensea", self.test_addr)
+        first = Tag.objects.get(address=self.test_addr)
+        utils.add_label_to_db("Collected: 2", "opensea", self.test_addr)
+        utils.add_label_to_db("Collected: 2", "opensea", self.test_addr)
+        utils.add_label_to_db("Label", "etherscan", self.test_addr)
+
+        # make assertions
+        tags = Tag.objects.filter(address=self.test_addr).order_by("id")
+        self.assertEqual(
+            [(tag.nametag, tag.source) for tag in tags],
+            [("Collected: 2", "opensea"), ("Label", "etherscan")]
+        )
+        self.assertEqual(tags[0].id, first.id)
+        self.assertGreater(tags[0].modified, first.modified)
+        self.assertEqual(tags[0].created, first.created)
+        self.assertEqual(self.publish.call_count, 3)
+
+    def test_user_tags_kept(self):
+        """
+        Assert that a label that is already a nametag of the
+        address, e.g. one added by a user, is not added again.
+        """
+        # set up test
+        address = Address.objects.create(pubkey=self.test_addr)
+        Tag.objects.create(
+            address=address, nametag="Label", created_by_session_id="user"
+        )
+
+        # add the same label and another one
+        utils.add_label_to_db("Label", "etherscan", self.test_addr)
+        utils.add_label_to_db("Other", "etherscan", self.test_addr)
+
+        # make assertions
+        self.assertEqual(
+            set(Tag.objects.values_list("nametag", "source")),
+            {("Label", ""), ("Other", "etherscan")}
+        )
@@ -7,9 +7,14 @@ import uuid
 
 # third party imports
 from django.conf import settings
+from django.db import IntegrityError, transaction
+import redis
+import rq
 import web3
 
 # our imports
+from ..label_sink import LabelSink, trim_label
+from ...pubsub import publish_address_changed
 from ...models import Address, Tag
 
 
@@ -19,35 +24,67 @@ web3_provider = web3.providers.HTTPProvider(
 )
 
 
+def redis_connection():
+    """
+    Returns the redis connection of the current rq job,
+    or a new connection to REDIS_URL outside of jobs.
+    """
+    job = rq.get_current_job()
+    if job is not None:
+        return job.connection
+
+    return redis.from_url(settings.REDIS_URL)
+
+
 def add_label_to_db(label, source, address):
     """
-    Adds the given label to the Tags database.
+    Adds the given label to the Tags database, or to the label sink
+    when it is enabled, which adds it later along with other labels.
+    An address has one tag per source, whose nametag is replaced
+    when the label found by the source changes.
     Does nothing if the given label is None.
     Returns None.
     """
     if label is None:
         return
 
+    if settings.LABEL_SINK["ENABLED"]:
+        LabelSink(redis_connection()).emit(label, source, address)
+        return
+
+    label = trim_label(label)
+
     # get or create address
     address_obj, _ = Address.objects.get_or_create(
         pubkey=address
     )
 
-    # create Tag if it does not exist
-    if not Tag.objects.filter(
-        address=address_obj, nametag=label
-    ).exists():
-        logger.info("new label found, adding it to Tags table")
-
-        # trim to 255 chars if needed
-        if len(label) > 255:
-            label = label[0:252]
-            label += "..."
-
-        # add to db
-        Tag.objects.create(
-            address=address_obj,
-            nametag=label,
-            created_by_session_id=str(uuid.uuid4()),
-            source=source
-        )
+    # the tag of the source is updated in place when its label changes
+    try:
+        with transaction.atomic():
+            tag = Tag.objects.select_for_update().filter(
+                address=address_obj, source=source
+            ).first()
+            if Tag.objects.filter(
+                address=address_obj, nametag=label
+            ).exists():
+                return
+
+            if tag is None:
+                logger.info("new label found, adding it to Tags table")
+                Tag.objects.create(
+                    address=address_obj,
+                    nametag=label,
+                    created_by_session_id=str(uuid.uuid4()),
+                    source=source
+                )
+            else:
+                logger.info("label changed, updating it in Tags table")
+                tag.nametag = label
+                tag.save()
+
+    # the tag was added by another job at the same time
+    except IntegrityError:
+        return
+
+    publish_address_changed(address_obj.pubkey, "tags")
@@ -0,0 +1,223 @@
+"""
+Module containing a supervisor that runs worker processes and
+keeps them running. To be used for running several workers in one dyno.
+"""
+# std lib imports
+import logging
+import multiprocessing
+import os
+import signal
+import time
+
+# third party imports
+
+# our imports
+
+
+logger = logging.getLogger(__name__)
+STOP_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+
+def run_child(target, args):
+    """
+    Entry point of the child processes.
+    Children get their own process group so that a ctrl+c in the terminal
+    only reaches the supervisor, which forwards it to them once.
+    Heroku sends SIGTERM to every process of the dyno, so children can
+    get it twice, and their workers only take the first as a request to
+    stop, see workers.StopOnceMixin.
+    The stop signals are blocked until the handlers inherited from the
+    supervisor are reset, so that a signal sent right after the fork
+    is not lost.
+    """
+    os.setpgrp()
+    for signum in STOP_SIGNALS:
+        signal.signal(signum, signal.SIG_DFL)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+    target(*args)
+
+
+class Child():
+    """
+    A process run by the supervisor.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, index, target, args):
+        """ Class initialization. """
+
+        self.index = index
+        self.target = target
+        self.args = args
+        self.process = None
+        self.started_at = None
+        self.restarts = 0
+
+        # number of shutdown requests forwarded to the process
+        self.stops = 0
+
+        # crashes in a row without running for long, and when to restart
+        self.crashes = 0
+        self.restart_at = None
+
+    @property
+    def alive(self):
+        """ Returns True if the process of the child is running. """
+        return self.process is not None and self.process.is_alive()
+
+    def uptime(self):
+        """ Returns the number of seconds the process has been running. """
+        if not self.alive:
+            return 0
+
+        return int(time.monotonic() - self.started_at)
+
+
+class Supervisor():
+    """
+    Runs a process per target and restarts the ones that exit, with a
+    delay that grows while a process keeps exiting soon after starting.
+
+    Processes are forked, so whatever the supervisor has loaded, e.g.
+    django and the scrapers, is only loaded once. SIGTERM and SIGINT are
+    forwarded to the processes, e.g. for docker stop, which only signals
+    the supervisor. The processes shut down warmly, and the supervisor
+    exits once they have all exited.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    poll_interval = 1
+    max_restart_delay = 60
+
+    def __init__(self, targets, status_interval=60, describe=None,
+                 write=None):
+        """
+        Class initialization.
+        targets is a list of (function, args) tuples to run in processes.
+        The status of the processes is written every status_interval
+        seconds with write, describe can return more details about
+        the process with the given pid.
+        """
+        self.children = [
+            Child(index, target, args)
+            for index, (target, args) in enumerate(targets)
+        ]
+        self.status_interval = status_interval
+        self.describe = describe
+        self.write = write or logger.info
+        self.stop_requests = 0
+        self.forwarded = []
+        self.context = multiprocessing.get_context("fork")
+
+    def start_child(self, child):
+        """
+        Starts the process of the given child.
+        """
+        child.process = self.context.Process(
+            target=run_child,
+            args=(child.target, child.args)
+        )
+        blocked = signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+        try:
+            child.process.start()
+        finally:
+            signal.pthread_sigmask(signal.SIG_SETMASK, blocked)
+        child.started_at = time.monotonic()
+        child.restart_at = None
+        child.stops = 0
+
+    def request_stop(self, signum, frame):
+        """
+        Stops restarting the processes, and forwards the signal to the
+        running ones. A second SIGINT is forwarded too, for a cold shutdown.
+        """
+        # pylint: disable=unused-argument
+        self.stop_requests += 1
+        self.forwarded.append(signum)
+        self.forward_stop()
+
+    def forward_stop(self):
+        """
+        Sends the running processes the shutdown requests that they
+        have not been sent yet, e.g. when they started after the request.
+        """
+        for child in self.children:
+            while child.alive and child.stops < len(self.forwarded):
+                os.kill(child.process.pid, self.forwarded[child.stops])
+                child.stops += 1
+
+    def supervise(self):
+        """
+        Restarts the processes that have exited, once their delay is over.
+        """
+        now = time.monotonic()
+        for child in self.children:
+            if child.alive or self.stop_requests:
+                continue
+
+            # schedule the restart of a process that just exited
+            if child.restart_at is None:
+                uptime = now - child.started_at
+                child.crashes = 1 if uptime > self.max_restart_delay \
+                    else child.crashes + 1
+                delay = min(2 ** (child.crashes - 1), self.max_restart_delay)
+                child.restart_at = now + delay
+                self.write(
+                    f"child {child.index} (pid {child.process.pid}) exited "
+                    f"with code {child.process.exitcode}, "
+                    f"restarting in {delay}s"
+                )
+
+            if now >= child.restart_at:
+                self.start_child(child)
+                child.restarts += 1
+
+    def status(self):
+        """
+        Returns a line describing the status of each process.
+        """
+        lines = []
+        for child in self.children:
+            pid = child.process.pid
+            state = "running" if child.alive else \
+                f"exited ({child.process.exitcode})"
+            line = f"child {child.index} pid={pid} {state} " \
+                   f"uptime={child.uptime()}s restarts={child.restarts}"
+            if self.describe is not None and child.alive:
+                line += f" {self.describe(pid)}"
+            lines.append(line)
+
+        return lines
+
+    def report(self):
+        """
+        Writes the status of each process.
+        """
+        for line in self.status():
+            self.write(line)
+
+    def run(self):
+        """
+        Starts a process per target and supervises them
+        until they have all exited after a shutdown request.
+        """
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        for child in self.children:
+            self.start_child(child)
+
+        reported_at = time.monotonic()
+        while not self.stop_requests or any(c.alive for c in self.children):
+            self.supervise()
+            self.forward_stop()
+
+            if time.monotonic() - reported_at >= self.status_interval:
+                self.report()
+                reported_at = time.monotonic()
+
+            time.sleep(self.poll_interval)
+
+        for child in self.children:
+            child.process.join()
+        self.report()
@@ -0,0 +1,206 @@
+""" Module containing tests for the micro-batches of scraper jobs. """
+
+# std lib imports
+from unittest import mock
+
+# third party imports
+from django.test import override_settings
+import rq
+
+# our imports
+from ..basetest import BaseTestCase
+from ..models import Tag
+from . import batches
+from . import constants
+from .controllers import ScraperJobsController
+from .policies import RescrapePolicy
+from .queue import Queue
+from .scraper_jobs import ScraperJob
+from .scrapers.base_scraper import BaseScraper
+
+
+class MockBatchScraper(BaseScraper):
+    """
+    Mock scraper that counts how many times it is prepared,
+    and fails to look up the addresses in fail_addresses.
+    """
+
+    source = "mock"
+    prepared = 0
+    fail_addresses = []
+
+    def prepare(self):
+        MockBatchScraper.prepared += 1
+
+    def lookup(self, address):
+        self.warm_up()
+        if address in self.fail_addresses:
+            raise Exception("fail")
+
+        return f"Label {address[-4:]}"
+
+
+class MockBatchScraperJob(ScraperJob):
+    """ Mock scraper job that runs the mock scraper. """
+
+    # pylint: disable=C0116,C0321
+    @property
+    def name(self): return "mock_scraper"
+    @property
+    def scraper_class(self): return MockBatchScraper
+    def run(self): return None
+
+
+@override_settings(SCRAPE_BATCH={"SIZE": 2, "WINDOW": 2})
+class BatchesTests(BaseTestCase):
+    """ Tests the micro-batches of scraper jobs. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        mock.patch.object(
+            constants, "scraper_jobs_to_run", [MockBatchScraperJob]
+        ).start()
+        MockBatchScraper.prepared = 0
+        MockBatchScraper.fail_addresses = []
+        self.controller = ScraperJobsController(
+            redis_cursor=self.fake_redis,
+            redis_queue=self.queue
+        )
+        self.policy = RescrapePolicy(self.fake_redis)
+        self.addresses = [
+            f"0x{str(number) * 40}" for number in range(1, 4)
+        ]
+
+    def batch_of(self, address):
+        """
+        Returns the id of the batch job that the job of the given
+        address depends on.
+        """
+        job = rq.job.Job.fetch(address, connection=self.fake_redis)
+        return job.fetch_dependencies()[0].id
+
+    def run_batch(self, job_id):
+        """
+        Runs the given scheduled batch job, and enqueues
+        the jobs that depend on it as a worker would.
+        """
+        job = rq.job.Job.fetch(job_id, connection=self.fake_redis)
+        job = self.queue.enqueue_job(job)
+        Queue(connection=self.fake_redis).enqueue_dependents(job)
+        return job
+
+    def test_addresses_coalesced(self):
+        """
+        Assert that the addresses join the open batch until it is full,
+        and that the address jobs wait on their batch job.
+        """
+        for address in self.addresses:
+            self.controller.create_jobs(address)
+
+        # two addresses in the first batch, one in the second
+        job_ids = [self.batch_of(address) for address in self.addresses]
+        first, second = job_ids[1:]
+        self.assertEqual(job_ids, [first, first, second])
+        self.assertNotEqual(first, second)
+        self.assertEqual(batches.batch_source(first), "mock_scraper")
+
+        # batch jobs run once their window is over
+        job = rq.job.Job.fetch(first, connection=self.fake_redis)
+        self.assertEqual(job.get_status(), rq.job.JobStatus.SCHEDULED)
+        self.assertEqual(
+            rq.job.Job.fetch(self.addresses[0], connection=self.fake_redis)
+            .get_status(),
+            rq.job.JobStatus.DEFERRED
+        )
+
+    def test_batch_shares_setup(self):
+        """
+        Assert that a batch job prepares its scraper once, prefetches for
+        all its addresses at once, records the result of every address
+        and enqueues the address jobs.
+        """
+        for address in self.addresses[:2]:
+            self.controller.create_jobs(address)
+        job_id = self.batch_of(self.addresses[0])
+
+        # run the batch job
+        with mock.patch.object(MockBatchScraper, "prefetch") as prefetch:
+            job = self.run_batch(job_id)
+
+        # make assertions
+        self.assertEqual(MockBatchScraper.prepared, 1)
+        prefetch.assert_called_once_with(self.addresses[:2])
+        self.assertEqual(job.result, {
+            self.addresses[0]: "Label 1111",
+            self.addresses[1]: "Label 2222"
+        })
+        self.assertEqual(
+            self.policy.stale_sources(self.addresses[1], ["mock_scraper"]),
+            []
+        )
+        tag = Tag.objects.get(address=self.addresses[1])
+        self.assertEqual((tag.nametag, tag.source), ("Label 2222", "mock"))
+        self.assertEqual(
+            rq.job.Job.fetch(self.addresses[0], connection=self.fake_redis)
+            .get_status(),
+            rq.job.JobStatus.QUEUED
+        )
+
+        # a new address opens a new batch
+        self.controller.create_jobs(self.addresses[2])
+        self.assertNotEqual(self.batch_of(self.addresses[2]), job_id)
+
+    def test_failures_recorded_per_address(self):
+        """
+        Assert that an address that fails does not stop the others,
+        and that its failure is recorded without backing it off.
+        """
+        MockBatchScraper.fail_addresses = [self.addresses[0]]
+        for address in self.addresses[:2]:
+            self.controller.create_jobs(address)
+        job_id = self.batch_of(self.addresses[0])
+
+        # run the batch job
+        job = self.run_batch(job_id)
+
+        # make assertions
+        self.assertEqual(job.result, {
+            self.addresses[0]: None,
+            self.addresses[1]: "Label 2222"
+        })
+        self.assertFalse(
+            Tag.objects.filter(address=self.addresses[0]).exists()
+        )
+        self.assertEqual(
+            self.policy.stale_sources(self.addresses[0], ["mock_scraper"]),
+            []
+        )
+        self.assertIsNone(self.fake_redis.get(
+            self.policy.misses_key(self.addresses[0], "mock_scraper")
+        ))
+
+    def test_failed_batch_recorded(self):
+        """
+        Assert that the addresses of a batch job that fails
+        before looking them up are recorded as failures.
+        """
+        self.controller.create_jobs(self.addresses[0])
+        job_id = self.batch_of(self.addresses[0])
+
+        # the scraper can not be created
+        with mock.patch.object(
+            MockBatchScraper, "__init__", side_effect=Exception("fail")
+        ):
+            job = self.run_batch(job_id)
+
+        # make assertions
+        self.assertEqual(job.get_status(), rq.job.JobStatus.FAILED)
+        self.assertEqual(
+            self.policy.stale_sources(self.addresses[0], ["mock_scraper"]),
+            []
+        )
+        self.assertEqual(
+            batches.Batches(self.fake_redis).addresses(job_id), []
+        )
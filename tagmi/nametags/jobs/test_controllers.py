@@ -2,13 +2,18 @@
 
 # std lib imports
 from unittest import mock
+import time
 
 # third party imports
+from django.conf import settings
+from django.test import override_settings
 import rq
 
 # our imports
 from ..basetest import BaseTestCase
+from . import constants
 from .controllers import ScraperJobsController
+from .queue import Queue
 
 
 class MockScraperSuccess:
@@ -188,6 +193,90 @@ class ScraperJobsControllerTests(BaseTestCase):
             self.assertGreater(job.created_at, prev_created_at)
             prev_created_at = job.created_at
 
+            # forget the retry so that the next status is retried too
+            self.controller.retries.clear(self.test_addr)
+
+    @mock.patch("rq.job.Job.get_status")
+    def test_failed_job_backoff(self, mock_job_status):
+        """
+        Assert that an address whose jobs keep failing is not
+        retried again until its backoff has elapsed.
+        """
+        # set up test
+        # the retried jobs are not run so that they keep failing
+        mock_job_status.return_value = rq.job.JobStatus.FAILED
+        self.queue.enqueue("", job_id=self.test_addr)
+
+        with mock.patch.object(self.controller, "create_jobs") as mock_create:
+            # first failure is retried right away
+            stale, enqueued = self.controller.enqueue_if_stale(
+                self.test_addr
+            )
+            self.assertTrue(stale)
+            self.assertTrue(enqueued)
+            self.assertEqual(mock_create.call_count, 1)
+
+            # the next lookup is in backoff and does not enqueue jobs
+            stale, enqueued = self.controller.enqueue_if_stale(
+                self.test_addr
+            )
+            self.assertTrue(stale)
+            self.assertFalse(enqueued)
+            self.assertEqual(mock_create.call_count, 1)
+            self.assertGreater(self.controller.retry_after(self.test_addr), 0)
+
+            # once the backoff has elapsed the address is retried
+            with mock.patch(
+                "nametags.jobs.policies.time.time",
+                return_value=time.time() + 3600
+            ):
+                stale, enqueued = self.controller.enqueue_if_stale(
+                    self.test_addr
+                )
+            self.assertTrue(stale)
+            self.assertTrue(enqueued)
+            self.assertEqual(mock_create.call_count, 2)
+
+    def test_successful_jobs_clear_retries(self):
+        """
+        Assert that the retries of an address are cleared
+        once its scraper jobs have finished running.
+        """
+        # set up test
+        self.controller.retries.record_attempt(self.test_addr)
+        self.assertGreater(self.controller.retry_after(self.test_addr), 0)
+
+        # run the jobs
+        with mock.patch(
+            "nametags.jobs.constants.scraper_jobs_to_run",
+            [MockScraperSuccess]
+        ):
+            self.controller.create_jobs(self.test_addr)
+
+        # make assertions
+        self.assertEqual(self.controller.retry_after(self.test_addr), 0)
+        self.assertEqual(self.controller.retries.in_backoff(), [])
+
+    def test_compact_jobs(self):
+        """
+        Assert that in compact mode no jobs are left in redis once the
+        scraper jobs of an address have finished, and that the address
+        is still fresh.
+        """
+        # run the jobs
+        with mock.patch(
+            "nametags.jobs.constants.scraper_jobs_to_run",
+            [MockScraperSuccess]
+        ), override_settings(RQ=dict(settings.RQ, COMPACT_JOBS=True)):
+            self.controller.create_jobs(self.test_addr)
+
+            # make assertions
+            self.assertEqual(self.fake_redis.keys("rq:job:*"), [])
+            self.assertEqual(
+                self.controller.enqueue_if_stale(self.test_addr),
+                (False, False)
+            )
+
     def test_parent_job_runs_after_child_failure(self):
         """
         Assert that the parent job runs regardless of
@@ -231,3 +320,227 @@ class ScraperJobsControllerTests(BaseTestCase):
             assert (failed_job.id in str(parent_job.dependency_ids[0])) \
                 or (failed_job.id in str(parent_job.dependency_ids[1]))
             self.assertEqual(parent_job.allow_dependency_failures, 1)
+
+    def test_only_stale_sources_enqueued(self):
+        """
+        Assert that only the sources whose re-scrape interval
+        has elapsed are scraped again, and that an address
+        whose sources are all fresh is not stale.
+        """
+        # set up test
+        with mock.patch(
+            "nametags.jobs.constants.scraper_jobs_to_run",
+            [MockScraperSuccess, MockScraperFail]
+        ):
+            controller = ScraperJobsController(
+                redis_cursor=self.fake_redis,
+                redis_queue=self.queue
+            )
+            controller.policy.record_result(
+                self.test_addr, "scraper_success", None
+            )
+
+            # call controller
+            stale, enqueued = controller.enqueue_if_stale(self.test_addr)
+
+            # assert that only the stale source was scraped
+            self.assertTrue(stale)
+            self.assertTrue(enqueued)
+            with self.assertRaises(rq.exceptions.NoSuchJobError):
+                rq.job.Job.fetch(
+                    f"{self.test_addr}_scraper_success",
+                    connection=self.fake_redis
+                )
+            rq.job.Job.fetch(
+                f"{self.test_addr}_scraper_fail",
+                connection=self.fake_redis
+            )
+
+            # assert that the address is fresh once the
+            # parent job has expired and every source is fresh
+            self.fake_redis.delete(f"rq:job:{self.test_addr}")
+            stale, enqueued = controller.enqueue_if_stale(self.test_addr)
+            self.assertFalse(stale)
+            self.assertFalse(enqueued)
+
+    def test_lanes(self):
+        """
+        Assert that jobs are sent to the interactive lane by default,
+        and to the background lane when asked to.
+        """
+        # set up test
+        with mock.patch(
+            "nametags.jobs.constants.scraper_jobs_to_run",
+            [MockScraperSuccess]
+        ):
+            for lane in [None, constants.BACKGROUND_LANE]:
+                kwargs = {} if lane is None else {"lane": lane}
+                controller = ScraperJobsController(
+                    redis_cursor=self.fake_redis,
+                    **kwargs
+                )
+
+                # call controller
+                controller.create_jobs(self.test_addr)
+
+                # make assertions
+                job = rq.job.Job.fetch(
+                    f"{self.test_addr}_scraper_success",
+                    connection=self.fake_redis
+                )
+                expected = constants.source_queue_name(
+                    lane or constants.INTERACTIVE_LANE,
+                    "scraper_success"
+                )
+                self.assertEqual(job.origin, expected)
+                parent_job = rq.job.Job.fetch(
+                    self.test_addr,
+                    connection=self.fake_redis
+                )
+                self.assertEqual(
+                    parent_job.origin,
+                    lane or constants.INTERACTIVE_LANE
+                )
+
+    def test_background_jobs_promoted(self):
+        """
+        Assert that looking up an address whose jobs are waiting in
+        the background lane moves them to the interactive lane.
+        """
+        # set up test
+        with mock.patch(
+            "nametags.jobs.constants.scraper_jobs_to_run",
+            [MockScraperSuccess]
+        ):
+            background = ScraperJobsController(
+                redis_cursor=self.fake_redis,
+                lane=constants.BACKGROUND_LANE
+            )
+            background.create_jobs(self.test_addr)
+
+            # call controller
+            interactive = ScraperJobsController(redis_cursor=self.fake_redis)
+            stale, enqueued = interactive.enqueue_if_stale(self.test_addr)
+
+        # make assertions
+        self.assertTrue(stale)
+        self.assertFalse(enqueued)
+        background_queue = Queue(
+            constants.source_queue_name(
+                constants.BACKGROUND_LANE, "scraper_success"
+            ),
+            connection=self.fake_redis
+        )
+        interactive_queue = Queue(
+            constants.source_queue_name(
+                constants.INTERACTIVE_LANE, "scraper_success"
+            ),
+            connection=self.fake_redis
+        )
+        self.assertEqual(background_queue.job_ids, [])
+        self.assertEqual(
+            interactive_queue.job_ids,
+            [f"{self.test_addr}_scraper_success"]
+        )
+        parent_job = rq.job.Job.fetch(
+            self.test_addr,
+            connection=self.fake_redis
+        )
+        self.assertEqual(parent_job.origin, constants.INTERACTIVE_LANE)
+
+    def test_refresh_expiring(self):
+        """
+        Assert that only the sources whose results will be stale
+        soon are refreshed, and that nothing is refreshed while
+        jobs are in progress.
+        """
+        # set up test
+        with mock.patch(
+            "nametags.jobs.constants.scraper_jobs_to_run",
+            [MockScraperSuccess, MockScraperFail]
+        ):
+            controller = ScraperJobsController(
+                redis_cursor=self.fake_redis,
+                lane=constants.BACKGROUND_LANE
+            )
+            controller.policy.record_result(
+                self.test_addr, "scraper_success", "label"
+            )
+            controller.policy.record_result(
+                self.test_addr, "scraper_fail", "label"
+            )
+            self.fake_redis.expire(
+                controller.policy.fresh_key(self.test_addr, "scraper_fail"),
+                10
+            )
+
+            # call controller
+            refreshed = controller.refresh_expiring(self.test_addr, 60)
+
+            # assert that only the expiring source was refreshed
+            self.assertTrue(refreshed)
+            queue = Queue(
+                constants.source_queue_name(
+                    constants.BACKGROUND_LANE, "scraper_fail"
+                ),
+                connection=self.fake_redis
+            )
+            self.assertEqual(
+                queue.job_ids,
+                [f"{self.test_addr}_scraper_fail"]
+            )
+            with self.assertRaises(rq.exceptions.NoSuchJobError):
+                rq.job.Job.fetch(
+                    f"{self.test_addr}_scraper_success",
+                    connection=self.fake_redis
+                )
+
+            # assert that jobs in progress are not refreshed again
+            refreshed = controller.refresh_expiring(self.test_addr, 60)
+            self.assertFalse(refreshed)
+
+    def test_refreshing_address_not_stale(self):
+        """
+        Assert that an address is not stale while its sources are
+        being refreshed, and that the address job is left as is.
+        """
+        # set up test
+        with mock.patch(
+            "nametags.jobs.constants.scraper_jobs_to_run",
+            [MockScraperSuccess]
+        ):
+            self.controller.create_jobs(self.test_addr)
+            self.fake_redis.expire(
+                self.controller.policy.fresh_key(
+                    self.test_addr, "scraper_success"
+                ),
+                10
+            )
+
+            # refresh the address in the background
+            controller = ScraperJobsController(
+                redis_cursor=self.fake_redis,
+                lane=constants.BACKGROUND_LANE
+            )
+            self.assertTrue(controller.refresh_expiring(self.test_addr, 60))
+            refresh_job = rq.job.Job.fetch(
+                constants.refresh_job_id(self.test_addr),
+                connection=self.fake_redis
+            )
+            self.assertEqual(
+                refresh_job.get_status(),
+                rq.job.JobStatus.DEFERRED
+            )
+
+            # make assertions
+            self.assertEqual(
+                self.controller.enqueue_if_stale(self.test_addr),
+                (False, False)
+            )
+            self.assertTrue(
+                rq.job.Job.fetch(
+                    self.test_addr,
+                    connection=self.fake_redis
+                ).is_finished
+            )
+            self.assertFalse(controller.refresh_expiring(self.test_addr, 60))
@@ -0,0 +1,185 @@
+""" Module containing tests for the async scrape engine. """
+
+# std lib imports
+from unittest import mock
+import asyncio
+import time
+
+# third party imports
+from django.conf import settings
+from django.test import override_settings
+import rq
+
+# our imports
+from ..basetest import BaseTestCase
+from ..models import Tag
+from . import engine
+from .controllers import ScraperJobsController
+from .policies import RescrapePolicy
+from .scrapers.async_base_scraper import AsyncBaseScraper
+
+
+class MockSlowScraper(AsyncBaseScraper):
+    """ Mock scraper that finds a label after a while. """
+
+    name = "slow_scraper"
+    source = "slow"
+
+    async def run(self, address):
+        await asyncio.sleep(0.3)
+        return "Slow Label"
+
+
+class MockOtherSlowScraper(AsyncBaseScraper):
+    """ Mock scraper that finds no label after a while. """
+
+    name = "other_slow_scraper"
+    source = "other_slow"
+
+    async def run(self, address):
+        await asyncio.sleep(0.3)
+
+
+class MockFailScraper(AsyncBaseScraper):
+    """ Mock scraper that errors out. """
+
+    name = "fail_scraper"
+    source = "fail"
+
+    async def run(self, address):
+        raise Exception("fail")
+
+
+class MockHangScraper(AsyncBaseScraper):
+    """ Mock scraper that never finishes. """
+
+    name = "hang_scraper"
+    source = "hang"
+
+    async def run(self, address):
+        await asyncio.sleep(60)
+
+
+@override_settings(SCRAPE_ENGINE={
+    "ENGINE": "async",
+    "SOURCE_TIMEOUT": 5,
+    "SOURCE_TIMEOUTS": {"hang_scraper": 0.1}
+})
+class EngineTests(BaseTestCase):
+    """ Tests the async scrape engine. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        self.scrapers = [
+            MockSlowScraper,
+            MockOtherSlowScraper,
+            MockFailScraper,
+            MockHangScraper
+        ]
+        mock.patch.object(
+            engine, "async_scrapers_to_run", self.scrapers
+        ).start()
+        self.policy = RescrapePolicy(self.fake_redis)
+
+    def test_sources_run_concurrently(self):
+        """
+        Assert that the sources run at the same time, and that
+        failing sources do not stop the others from being recorded.
+        """
+        # run the job
+        started = time.monotonic()
+        job = self.queue.enqueue(
+            engine.scrape_address, self.test_addr, job_id=self.test_addr
+        )
+        elapsed = time.monotonic() - started
+
+        # make assertions
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(job.result, {
+            "slow_scraper": "Slow Label",
+            "other_slow_scraper": None,
+            "fail_scraper": None,
+            "hang_scraper": None
+        })
+        tag = Tag.objects.get(address=self.test_addr)
+        self.assertEqual((tag.nametag, tag.source), ("Slow Label", "slow"))
+
+        # every source is fresh, and only the one without
+        # a label is backing off
+        names = [scraper.name for scraper in self.scrapers]
+        self.assertEqual(self.policy.stale_sources(self.test_addr, names), [])
+        self.assertEqual(
+            self.fake_redis.get(
+                self.policy.misses_key(self.test_addr, "other_slow_scraper")
+            ),
+            b"1"
+        )
+
+    def test_store_failure_isolated(self):
+        """
+        Assert that a label that cannot be stored only fails its source,
+        and that the results of the other sources are still recorded.
+        """
+        # the first label stored fails
+        add_label_to_db = mock.Mock(side_effect=[ValueError("bad"), None])
+        with mock.patch.object(engine, "add_label_to_db", add_label_to_db):
+            job = self.queue.enqueue(
+                engine.scrape_address,
+                self.test_addr,
+                ["slow_scraper", "other_slow_scraper"],
+                job_id=self.test_addr
+            )
+
+        # make assertions
+        self.assertEqual(job.result, {
+            "slow_scraper": None,
+            "other_slow_scraper": None
+        })
+        self.assertEqual(add_label_to_db.call_count, 2)
+        self.assertEqual(
+            self.policy.stale_sources(
+                self.test_addr, ["slow_scraper", "other_slow_scraper"]
+            ),
+            []
+        )
+        self.assertIsNone(self.fake_redis.get(
+            self.policy.misses_key(self.test_addr, "slow_scraper")
+        ))
+        self.assertEqual(
+            self.fake_redis.get(
+                self.policy.misses_key(self.test_addr, "other_slow_scraper")
+            ),
+            b"1"
+        )
+
+    def test_only_given_sources_run(self):
+        """
+        Assert that only the given sources run.
+        """
+        job = self.queue.enqueue(
+            engine.scrape_address,
+            self.test_addr,
+            ["slow_scraper"],
+            job_id=self.test_addr
+        )
+
+        self.assertEqual(job.result, {"slow_scraper": "Slow Label"})
+
+    def test_controller_enqueues_single_job(self):
+        """
+        Assert that the controller enqueues a single job for the address
+        that covers every source, with room for the slowest one.
+        """
+        controller = ScraperJobsController(
+            redis_cursor=self.fake_redis,
+            redis_queue=self.queue
+        )
+        with override_settings(RQ=dict(settings.RQ, COMPACT_JOBS=False)):
+            controller.create_jobs(self.test_addr)
+
+        job = rq.job.Job.fetch(self.test_addr, connection=self.fake_redis)
+        self.assertEqual(job.get_status(), rq.job.JobStatus.FINISHED)
+        self.assertEqual(job.timeout, 5 + engine.JOB_TIMEOUT_MARGIN)
+        self.assertEqual(self.fake_redis.keys("rq:job:*_*"), [])
@@ -0,0 +1,115 @@
+""" Module containing tests for the write-behind sink of scraper labels. """
+
+# std lib imports
+from io import StringIO
+from unittest import mock
+
+# third party imports
+from django.core.management import call_command
+from django.test import override_settings
+
+# our imports
+from ..basetest import BaseTestCase
+from ..models import Address, Tag
+from .label_sink import LabelSink
+from .scrapers import utils
+
+
+@override_settings(LABEL_SINK={"ENABLED": True, "BATCH_SIZE": 2, "WAIT": 0})
+class LabelSinkTests(BaseTestCase):
+    """ Tests the write-behind sink of scraper labels. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        self.sink = LabelSink(self.fake_redis)
+        self.addresses = [f"0x{index:040x}" for index in range(1, 4)]
+
+        # outside of jobs, labels are pushed onto the test redis
+        mock.patch.object(
+            utils, "redis_connection", return_value=self.fake_redis
+        ).start()
+        self.publish = mock.patch(
+            "nametags.jobs.label_sink.publish_address_changed"
+        ).start()
+
+    def test_add_label_emits(self):
+        """
+        Assert that scrapers push their labels onto the sink
+        instead of adding them to the database.
+        """
+        utils.add_label_to_db("Label", "etherscan", self.addresses[0])
+        utils.add_label_to_db(None, "etherscan", self.addresses[1])
+
+        self.assertEqual(Tag.objects.count(), 0)
+        self.assertEqual(self.sink.pending(), 1)
+        self.assertEqual(
+            self.sink.claim(), [(self.addresses[0], "Label", "etherscan")]
+        )
+
+    def test_flush(self):
+        """
+        Assert that claimed labels are added to the database a batch at a
+        time, skipping existing ones, and that subscribers are told about
+        the addresses with new nametags.
+        """
+        # set up test
+        address = Address.objects.create(pubkey=self.addresses[0])
+        Tag.objects.create(
+            address=address, nametag="Known", created_by_session_id="s"
+        )
+        self.sink.emit("Known", "etherscan", self.addresses[0])
+        self.sink.emit("x" * 300, "opensea", self.addresses[1])
+        self.sink.emit("Label", "etherscan", self.addresses[2])
+
+        # flush the first batch
+        entries = self.sink.claim()
+        created = self.sink.flush(entries)
+
+        # make assertions
+        self.assertEqual([entry[0] for entry in entries], self.addresses[:2])
+        self.assertEqual(created, 1)
+        tag = Tag.objects.get(address=self.addresses[1])
+        self.assertEqual(tag.nametag, "x" * 252 + "...")
+        self.assertEqual(tag.source, "opensea")
+        self.publish.assert_called_once_with(
+            self.addresses[1], "tags", redis_cursor=mock.ANY
+        )
+        self.assertEqual(self.sink.pending(), 1)
+
+    def test_unflushed_batch_claimed_again(self):
+        """
+        Assert that a batch that was claimed but not flushed
+        is claimed again, before newer labels.
+        """
+        self.sink.emit("First", "etherscan", self.addresses[0])
+        first = self.sink.claim()
+        self.sink.emit("Second", "etherscan", self.addresses[1])
+        self.sink.emit("Third", "etherscan", self.addresses[2])
+
+        again = self.sink.claim()
+
+        self.assertEqual(first, [(self.addresses[0], "First", "etherscan")])
+        self.assertEqual(again, first + [
+            (self.addresses[1], "Second", "etherscan")
+        ])
+
+    def test_flush_labels_command(self):
+        """
+        Assert that the command flushes every pending label, then exits.
+        """
+        # set up test
+        mock.patch("redis.from_url", return_value=self.fake_redis).start()
+        for index, address in enumerate(self.addresses):
+            self.sink.emit(f"Label {index}", "etherscan", address)
+
+        # run the command
+        out = StringIO()
+        call_command("flush_labels", once=True, stdout=out)
+
+        # make assertions
+        self.assertEqual(Tag.objects.count(), 3)
+        self.assertEqual(self.sink.pending(), 0)
+        self.assertIn("Flushed 2 labels, 2 new nametags", out.getvalue())
+        self.assertIn("Flushed 1 labels, 1 new nametags", out.getvalue())
@@ -0,0 +1,55 @@
+""" Module containing tests for the redis memory accounting. """
+
+# std lib imports
+
+# third party imports
+from django.test import SimpleTestCase
+
+# our imports
+from .memory import key_family
+
+
+class KeyFamilyTests(SimpleTestCase):
+    """ Tests the key_family function. """
+
+    def test_job_families(self):
+        """
+        Assert that scraper jobs, address jobs and their
+        dependency sets are told apart.
+        """
+        address = "0x7f101fe45e6649a6fb8f3f8b43ed03d353f2b90c"
+
+        self.assertEqual(
+            key_family(f"rq:job:{address}_opensea_scraper"), "scraper jobs"
+        )
+        self.assertEqual(key_family(f"rq:job:{address}"), "address jobs")
+        self.assertEqual(
+            key_family(f"rq:job:{address}_refresh"), "address jobs"
+        )
+        self.assertEqual(
+            key_family(f"rq:job:{address}:dependencies"), "job dependencies"
+        )
+        self.assertEqual(
+            key_family(f"rq:job:{address}_opensea_scraper:dependents"),
+            "job dependencies"
+        )
+        self.assertEqual(
+            key_family("rq:finished:interactive"), "job registries"
+        )
+
+    def test_policy_families(self):
+        """
+        Assert that the keys of the re-scrape and retry policies
+        have their own families, and that unknown keys are other.
+        """
+        address = "0x7f101fe45e6649a6fb8f3f8b43ed03d353f2b90c"
+
+        self.assertEqual(
+            key_family(f"nametags:rescrape:{address}:opensea_scraper:fresh"),
+            "rescrape freshness"
+        )
+        self.assertEqual(
+            key_family(f"nametags:retry:{address}:attempts"),
+            "scrape retries"
+        )
+        self.assertEqual(key_family("unknown"), "other")
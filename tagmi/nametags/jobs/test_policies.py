@@ -0,0 +1,168 @@
+""" Module containing tests for the re-scrape policy. """
+
+# std lib imports
+
+# third party imports
+from django.test import override_settings
+
+# our imports
+from ..basetest import BaseTestCase
+from .policies import RescrapePolicy, RetryPolicy
+
+
+@override_settings(RESCRAPE={
+    "BASE_INTERVAL": 100,
+    "MAX_INTERVAL": 1000,
+    "MULTIPLIER": 2
+})
+class RescrapePolicyTests(BaseTestCase):
+    """ Tests the RescrapePolicy class. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        self.policy = RescrapePolicy(self.fake_redis)
+        self.source = "scraper_success"
+
+    def test_stale_without_results(self):
+        """
+        Assert that a source is stale if no result was recorded for it.
+        """
+        stale = self.policy.stale_sources(self.test_addr, [self.source])
+        self.assertEqual(stale, [self.source])
+
+    def test_fresh_after_result(self):
+        """
+        Assert that a source is fresh after a result was recorded for it.
+        """
+        self.policy.record_result(self.test_addr, self.source, "label")
+
+        stale = self.policy.stale_sources(self.test_addr, [self.source])
+        self.assertEqual(stale, [])
+
+    def test_interval_grows_without_label(self):
+        """
+        Assert that the interval grows exponentially while a source
+        keeps returning no label, and that it is capped.
+        """
+        intervals = [
+            self.policy.record_result(self.test_addr, self.source, None)
+            for _ in range(6)
+        ]
+
+        self.assertEqual(intervals, [100, 200, 400, 800, 1000, 1000])
+        ttl = self.fake_redis.ttl(
+            self.policy.fresh_key(self.test_addr, self.source)
+        )
+        self.assertGreater(ttl, 100)
+
+    def test_interval_resets_with_label(self):
+        """
+        Assert that the interval goes back to the base interval
+        when a source returns a label.
+        """
+        for _ in range(3):
+            self.policy.record_result(self.test_addr, self.source, None)
+
+        interval = self.policy.record_result(
+            self.test_addr, self.source, "label"
+        )
+        self.assertEqual(interval, 100)
+
+        interval = self.policy.record_result(
+            self.test_addr, self.source, None
+        )
+        self.assertEqual(interval, 100)
+
+    def test_reset(self):
+        """
+        Assert that resetting a source caps its freshness
+        to the base interval and resets its backoff.
+        """
+        for _ in range(4):
+            self.policy.record_result(self.test_addr, self.source, None)
+
+        self.policy.reset(self.test_addr, [self.source])
+
+        ttl = self.fake_redis.ttl(
+            self.policy.fresh_key(self.test_addr, self.source)
+        )
+        self.assertLessEqual(ttl, 100)
+        interval = self.policy.record_result(
+            self.test_addr, self.source, None
+        )
+        self.assertEqual(interval, 100)
+
+    def test_failure_does_not_back_off(self):
+        """
+        Assert that a failure marks the source fresh for the base
+        interval without growing the backoff.
+        """
+        self.policy.record_failure(self.test_addr, self.source)
+
+        stale = self.policy.stale_sources(self.test_addr, [self.source])
+        self.assertEqual(stale, [])
+        self.assertFalse(self.fake_redis.exists(
+            self.policy.misses_key(self.test_addr, self.source)
+        ))
+
+
+@override_settings(SCRAPE_RETRY={
+    "BASE_DELAY": 10,
+    "MAX_DELAY": 50,
+    "MAX_RETRIES": 5
+}, RESCRAPE={
+    "BASE_INTERVAL": 100,
+    "MAX_INTERVAL": 1000,
+    "MULTIPLIER": 2
+})
+class RetryPolicyTests(BaseTestCase):
+    """ Tests the RetryPolicy class. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        self.policy = RetryPolicy(self.fake_redis)
+
+    def test_delay_grows_and_is_capped(self):
+        """
+        Assert that the delay between retries grows exponentially
+        up to the maximum delay, and that the address is only retried
+        after the base re-scrape interval once it hits the retry cap.
+        """
+        delays = [
+            self.policy.record_attempt(self.test_addr) for _ in range(6)
+        ]
+        self.assertEqual(delays, [10, 20, 40, 50, 100, 100])
+
+    def test_retry_after(self):
+        """
+        Assert that an address can be retried right away unless it
+        is in backoff, and that clearing it ends the backoff.
+        """
+        self.assertEqual(self.policy.retry_after(self.test_addr), 0)
+
+        self.policy.record_attempt(self.test_addr)
+        retry_after = self.policy.retry_after(self.test_addr)
+        self.assertGreater(retry_after, 0)
+        self.assertLessEqual(retry_after, 10)
+
+        self.policy.clear(self.test_addr)
+        self.assertEqual(self.policy.retry_after(self.test_addr), 0)
+
+    def test_in_backoff(self):
+        """
+        Assert that the addresses waiting to be retried are listed
+        with their number of retries.
+        """
+        self.policy.record_attempt(self.test_addr)
+        self.policy.record_attempt(self.test_addr)
+
+        in_backoff = self.policy.in_backoff()
+        self.assertEqual(len(in_backoff), 1)
+        address, attempts, retry_after = in_backoff[0]
+        self.assertEqual(address, self.test_addr)
+        self.assertEqual(attempts, 2)
+        self.assertGreater(retry_after, 0)
@@ -0,0 +1,51 @@
+""" Module containing tests for the popularity tracker. """
+
+# std lib imports
+
+# third party imports
+
+# our imports
+from ..basetest import BaseTestCase
+from .popularity import PopularityTracker
+
+
+class PopularityTrackerTests(BaseTestCase):
+    """ Tests the PopularityTracker class. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        self.tracker = PopularityTracker(self.fake_redis)
+        self.addrs = [f"0x{str(i) * 40}" for i in range(3)]
+
+    def test_hottest(self):
+        """
+        Assert that the most looked up addresses are returned first.
+        """
+        for count, address in enumerate(self.addrs):
+            for _ in range(count + 1):
+                self.tracker.record(address)
+
+        self.assertEqual(
+            self.tracker.hottest(2),
+            [self.addrs[2], self.addrs[1]]
+        )
+
+    def test_decay(self):
+        """
+        Assert that decaying scales the scores and
+        only keeps the most looked up addresses.
+        """
+        for count, address in enumerate(self.addrs):
+            for _ in range(count + 1):
+                self.tracker.record(address)
+
+        self.tracker.decay(0.5, 2)
+
+        self.assertEqual(
+            self.tracker.hottest(3),
+            [self.addrs[2], self.addrs[1]]
+        )
+        score = self.fake_redis.zscore(self.tracker.key, self.addrs[2])
+        self.assertEqual(score, 1.5)
@@ -0,0 +1,180 @@
+""" Module containing tests for the worker supervisor. """
+
+# std lib imports
+import multiprocessing
+import os
+import signal
+import time
+
+# third party imports
+from django.test import SimpleTestCase
+
+# our imports
+from .supervisor import Supervisor
+
+
+def exit_now():
+    """ Target of a process that exits right away. """
+    return None
+
+
+def sleep():
+    """ Target of a process that runs until it is stopped. """
+    time.sleep(60)
+
+
+def stop_supervisor(signum=signal.SIGINT):
+    """
+    Target of a process that asks its supervisor to shut down
+    with the given signal, and only signals the supervisor.
+    """
+    os.kill(os.getppid(), signum)
+    time.sleep(60)
+
+
+def count_stops(pids, dyno_size=None):
+    """
+    Target of a process that exits with the number of SIGTERMs it got.
+    Every process puts its pid in pids, and the one given the dyno_size
+    sends SIGTERM to all of them and the supervisor, like heroku does.
+    """
+    stops = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stops.append(signum))
+    pids.put(os.getpid())
+
+    if dyno_size is not None:
+        to_stop = [pids.get(timeout=5) for _ in range(dyno_size)]
+        for pid in to_stop + [os.getppid()]:
+            os.kill(pid, signal.SIGTERM)
+
+    # wait for the first signal, and for any signal forwarded after it
+    deadline = time.monotonic() + 10
+    while not stops and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.5)
+    os._exit(len(stops))  # pylint: disable=protected-access
+
+
+class SupervisorTests(SimpleTestCase):
+    """ Tests the Supervisor class. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        self.lines = []
+        for signum in [signal.SIGTERM, signal.SIGINT]:
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+
+    def supervisor(self, targets):
+        """
+        Returns a supervisor of the given targets that polls quickly,
+        and stops its processes after the test.
+        """
+        supervisor = Supervisor(targets, write=self.lines.append)
+        supervisor.poll_interval = 0.05
+
+        def kill():
+            for child in supervisor.children:
+                if child.alive:
+                    child.process.kill()
+                    child.process.join()
+
+        self.addCleanup(kill)
+        return supervisor
+
+    def test_exited_process_restarted(self):
+        """
+        Assert that a process that exits is restarted after a delay
+        that grows while it keeps exiting right after starting.
+        """
+        supervisor = self.supervisor([(exit_now, ())])
+        child = supervisor.children[0]
+
+        delays = []
+        for _ in range(3):
+            supervisor.start_child(child)
+            child.process.join()
+            supervisor.supervise()
+            delays.append(round(child.restart_at - time.monotonic()))
+
+        self.assertEqual(delays, [1, 2, 4])
+
+        # restart once the delay is over
+        first_pid = child.process.pid
+        child.restart_at = 0
+        supervisor.supervise()
+        self.assertNotEqual(child.process.pid, first_pid)
+        self.assertEqual(child.restarts, 1)
+
+    def test_stop_forwarded(self):
+        """
+        Assert that a shutdown request is forwarded to
+        the processes and that they are not restarted.
+        """
+        supervisor = self.supervisor([(sleep, ()), (sleep, ())])
+        for child in supervisor.children:
+            supervisor.start_child(child)
+
+        supervisor.request_stop(signal.SIGINT, None)
+        for child in supervisor.children:
+            child.process.join(timeout=5)
+            self.assertEqual(child.process.exitcode, -signal.SIGINT)
+
+        supervisor.supervise()
+        self.assertEqual(
+            [child.restarts for child in supervisor.children], [0, 0]
+        )
+
+    def test_run(self):
+        """
+        Assert that run returns once every process has exited after
+        a SIGINT, and that the status of each process is reported.
+        """
+        supervisor = self.supervisor([(stop_supervisor, ()), (sleep, ())])
+
+        supervisor.run()
+
+        self.assertFalse(any(c.alive for c in supervisor.children))
+        self.assertEqual(len(self.lines), 2, self.lines)
+        self.assertIn("exited (-2)", self.lines[0])
+
+    def test_sigterm_forwarded(self):
+        """
+        Assert that when only the supervisor gets SIGTERM, e.g. from
+        docker stop, it is forwarded and every process exits.
+        """
+        supervisor = self.supervisor([
+            (stop_supervisor, (signal.SIGTERM,)), (sleep, ()), (sleep, ())
+        ])
+
+        supervisor.run()
+
+        self.assertEqual(supervisor.stop_requests, 1)
+        self.assertEqual(
+            [child.process.exitcode for child in supervisor.children],
+            [-signal.SIGTERM] * 3
+        )
+
+    def test_heroku_sigterm(self):
+        """
+        Assert that when heroku sends SIGTERM to the supervisor and
+        to every process, each process gets it, and the supervisor
+        forwards it once more, which the workers ignore. Signals that
+        arrive at once may only be handled once.
+        """
+        pids = multiprocessing.get_context("fork").Queue()
+        supervisor = self.supervisor([
+            (count_stops, (pids, 3)),
+            (count_stops, (pids,)),
+            (count_stops, (pids,))
+        ])
+
+        supervisor.run()
+
+        self.assertEqual(supervisor.stop_requests, 1)
+        self.assertEqual(
+            [child.stops for child in supervisor.children], [1, 1, 1]
+        )
+        for child in supervisor.children:
+            self.assertIn(child.process.exitcode, [1, 2])
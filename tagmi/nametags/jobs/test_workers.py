@@ -0,0 +1,169 @@
+""" Module containing tests for the job workers. """
+
+# std lib imports
+from unittest import mock
+import os
+import signal
+import time
+
+# third party imports
+
+# our imports
+from ..basetest import BaseTestCase
+from .queue import Queue
+from .workers import WarmWorker, WeightedHerokuWorker
+from .workers import close_unusable_connections
+
+
+def stop_worker_and_sleep(seconds, stops=1):
+    """
+    Job that asks its worker to shut down the given number of times,
+    like Heroku and the supervisor do when a dyno is stopped, then
+    sleeps for the given seconds.
+    """
+    for _ in range(stops):
+        os.kill(os.getpid(), signal.SIGTERM)
+    time.sleep(seconds)
+
+
+class WeightedHerokuWorkerTests(BaseTestCase):
+    """ Tests the WeightedHerokuWorker class. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        self.queues = [
+            Queue(name, connection=self.fake_redis)
+            for name in ["high", "low", "other"]
+        ]
+
+    def test_queues_kept(self):
+        """
+        Assert that reordering the queues keeps all of them.
+        """
+        worker = WeightedHerokuWorker(
+            self.queues,
+            connection=self.fake_redis,
+            weights={"high": 9, "low": 1}
+        )
+
+        for _ in range(20):
+            worker.reorder_queues(reference_queue=self.queues[0])
+            self.assertCountEqual(
+                worker.queue_names(),
+                ["high", "low", "other"]
+            )
+
+    def test_weighted_order(self):
+        """
+        Assert that queues are checked first in proportion to their weight.
+        """
+        worker = WeightedHerokuWorker(
+            self.queues[0:2],
+            connection=self.fake_redis,
+            weights={"high": 1, "low": 0}
+        )
+
+        for _ in range(20):
+            worker.reorder_queues(reference_queue=self.queues[1])
+            self.assertEqual(worker.queue_names(), ["high", "low"])
+
+
+class WarmWorkerTests(BaseTestCase):
+    """ Tests the WarmWorker class. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        self.queue = Queue("high", connection=self.fake_redis)
+        self.worker = WarmWorker(
+            [self.queue],
+            connection=self.fake_redis,
+            weights={"high": 9}
+        )
+
+        # the worker installs its own signal handlers
+        for signum in [signal.SIGINT, signal.SIGTERM, signal.SIGRTMIN]:
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+
+    def test_jobs_run_in_worker_process(self):
+        """
+        Assert that jobs run in the process of the worker.
+        """
+        jobs = [self.queue.enqueue(os.getpid) for _ in range(3)]
+
+        self.worker.work(burst=True, logging_level="ERROR")
+
+        for job in jobs:
+            self.assertEqual(job.return_value, os.getpid())
+
+    @mock.patch("nametags.jobs.workers.connections")
+    def test_unusable_connections_closed(self, mock_connections):
+        """
+        Assert that only the database connections that are
+        open and no longer usable are closed.
+        """
+        usable, unusable, closed = mock.Mock(), mock.Mock(), mock.Mock()
+        usable.is_usable.return_value = True
+        unusable.is_usable.return_value = False
+        closed.connection = None
+        mock_connections.all.return_value = [usable, unusable, closed]
+
+        close_unusable_connections()
+
+        usable.close.assert_not_called()
+        unusable.close.assert_called_once()
+        closed.close.assert_not_called()
+
+    def test_shutdown_stops_job(self):
+        """
+        Assert that a job running when the worker is asked to shut down
+        is stopped imminent_shutdown_delay seconds later, and that the
+        worker exits.
+        """
+        self.worker.imminent_shutdown_delay = 1
+        job = self.queue.enqueue(
+            stop_worker_and_sleep, 10, job_timeout=30
+        )
+        self.queue.enqueue(os.getpid)
+
+        start = time.monotonic()
+        self.worker.work(burst=True, logging_level="ERROR")
+        job.refresh()
+
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertTrue(job.is_failed)
+        self.assertIn("ShutDownImminentException", job.exc_info)
+        self.assertEqual(self.queue.count, 1)
+
+    def test_second_sigterm_ignored(self):
+        """
+        Assert that a second SIGTERM does not make a cold shutdown,
+        so that the running job finishes before the worker exits.
+        """
+        job = self.queue.enqueue(stop_worker_and_sleep, 0.5, stops=2)
+        self.queue.enqueue(os.getpid)
+
+        self.worker.work(burst=True, logging_level="ERROR")
+        job.refresh()
+
+        self.assertTrue(job.is_finished)
+        self.assertEqual(self.queue.count, 1)
+
+    def test_shutdown_keeps_job_timeout(self):
+        """
+        Assert that a job running past its timeout still times out
+        when the worker is asked to shut down during the job.
+        """
+        self.worker.imminent_shutdown_delay = 3
+        job = self.queue.enqueue(stop_worker_and_sleep, 10, job_timeout=1)
+
+        start = time.monotonic()
+        self.worker.work(burst=True, logging_level="ERROR")
+        job.refresh()
+
+        self.assertLess(time.monotonic() - start, 3)
+        self.assertTrue(job.is_failed)
+        self.assertIn("JobTimeoutException", job.exc_info)
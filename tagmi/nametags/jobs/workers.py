@@ -0,0 +1,182 @@
+"""
+Module containing subclasses of RQ's workers. To be used for running jobs.
+"""
+# std lib imports
+import os
+import random
+import signal
+import threading
+
+# third party imports
+from django.db import connections
+from rq.worker import HerokuWorker, SimpleWorker, WorkerStatus
+from rq.worker import ShutDownImminentException
+
+# our imports
+from .scrapers import sessions
+
+
+class WeightedQueuesMixin():
+    """
+    Mixin for RQ's workers that drains their queues by weight.
+
+    After every job the queues are shuffled so that each queue is
+    checked first with a probability proportional to its weight.
+    Higher priority queues are therefore drained faster without
+    starving lower priority queues.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, queues, *args, weights=None, **kwargs):
+        """
+        Class initialization.
+        weights maps queue names to their weight, queues without
+        a weight have a weight of 1.
+        """
+        super().__init__(queues, *args, **kwargs)
+        self.weights = weights or {}
+
+    def reorder_queues(self, reference_queue):
+        """
+        Overrides base class method.
+        Orders the queues by a weighted random draw.
+        """
+        # pylint: disable=unused-argument
+        queues = list(self._ordered_queues)
+        weights = [self.weights.get(queue.name, 1) for queue in queues]
+
+        ordered = []
+        while queues:
+            # fall back to the remaining order if only zero weights are left
+            if sum(weights) == 0:
+                ordered.extend(queues)
+                break
+
+            index = random.choices(range(len(queues)), weights=weights)[0]
+            ordered.append(queues.pop(index))
+            weights.pop(index)
+
+        self._ordered_queues = ordered
+
+
+class StopOnceMixin():
+    """
+    Mixin for RQ's workers that only take the first SIGTERM as a request
+    to stop. Heroku sends SIGTERM to every process of the dyno, and the
+    supervisor forwards the SIGTERM it gets to its workers as well, so a
+    worker can get it twice. rq takes a second signal as a request for a
+    cold shutdown, which kills the running job, so only a SIGINT after
+    the first request does that.
+    """
+
+    def request_stop(self, signum, frame):
+        """
+        Overrides base class method.
+        Ignores the next SIGTERMs once a shutdown is requested.
+        """
+        try:
+            super().request_stop(signum, frame)
+        finally:
+            signal.signal(signal.SIGTERM, self.ignore_stop)
+
+    def ignore_stop(self, signum, frame):
+        """
+        Handles a SIGTERM once a shutdown is requested.
+        """
+        # pylint: disable=unused-argument
+        self.log.debug("Shut down already requested, ignoring SIGTERM")
+
+
+class WeightedHerokuWorker(StopOnceMixin, WeightedQueuesMixin, HerokuWorker):
+    """
+    Subclass of RQ's HerokuWorker that drains its queues by weight.
+    Forks a work horse for every job.
+    """
+
+
+def close_unusable_connections():
+    """
+    Closes the database connections that are no longer usable,
+    so that the next query reconnects, and keeps the others open.
+    """
+    for connection in connections.all():
+        if connection.connection is not None and \
+                not connection.is_usable():
+            connection.close()
+
+
+class WarmWorker(StopOnceMixin, WeightedQueuesMixin, SimpleWorker):
+    """
+    Subclass of RQ's SimpleWorker that drains its queues by weight.
+
+    Jobs run in the worker's own process instead of a work horse forked
+    per job, so django, database connections, connection pools to the
+    sources and the web3 provider stay warm between jobs. Database
+    connections are health checked before every job, and the reuse of
+    scraper sessions and connections is logged after every job.
+
+    Like HerokuWorker, a SIGTERM while a job is running makes the job
+    raise ShutDownImminentException imminent_shutdown_delay seconds
+    later, so that it fails cleanly before Heroku kills the dyno.
+    The delay is kept by a timer thread, which signals the job with
+    SIGRTMIN like HerokuWorker signals its work horse, since SIGALRM
+    is taken by the job timeout.
+    """
+
+    imminent_shutdown_delay = 6
+
+    def __init__(self, *args, **kwargs):
+        """ Class initialization. """
+
+        super().__init__(*args, **kwargs)
+        self.shutdown_timer = None
+
+    def execute_job(self, job, queue):
+        """
+        Overrides base class method.
+        Checks the database connections before running the job,
+        and logs the reuse of scraper sessions and connections after it.
+        """
+        close_unusable_connections()
+        try:
+            super().execute_job(job, queue)
+        finally:
+            if self.shutdown_timer is not None:
+                self.shutdown_timer.cancel()
+        self.log.info(sessions.registry.summary())
+
+    def handle_warm_shutdown_request(self):
+        """
+        Overrides base class method.
+        Stops the running job after imminent_shutdown_delay seconds,
+        unless it finishes first. The job timeout still applies.
+        """
+        if self.get_state() != WorkerStatus.BUSY:
+            self.log.info("Warm shut down requested")
+            return
+
+        self.log.warning(
+            "Imminent shutdown, raising ShutDownImminentException in %d "
+            "seconds", self.imminent_shutdown_delay
+        )
+        signal.signal(signal.SIGRTMIN, self.request_force_stop_job)
+        self.shutdown_timer = threading.Timer(
+            self.imminent_shutdown_delay,
+            os.kill, args=(os.getpid(), signal.SIGRTMIN)
+        )
+        self.shutdown_timer.daemon = True
+        self.shutdown_timer.start()
+
+    def request_force_stop_job(self, signum, frame):
+        """
+        Stops the running job by raising ShutDownImminentException.
+        Does nothing if the job has finished in the meantime.
+        """
+        # pylint: disable=unused-argument
+        if self.get_state() != WorkerStatus.BUSY:
+            return
+
+        self.log.warning("raising ShutDownImminentException to cancel job")
+        raise ShutDownImminentException(
+            f"shut down imminent (signal: {signum})", {}
+        )
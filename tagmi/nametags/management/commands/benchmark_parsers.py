@@ -0,0 +1,189 @@
+"""
+Script that benchmarks the parsing of the labels of the scrapers
+on recorded pages, e.g. the etherscan address and token pages and
+the opensea profile pages.
+"""
+# std lib imports
+from pathlib import Path
+import multiprocessing
+import resource
+import time
+
+# third party imports
+from django.core.management.base import BaseCommand
+import lxml.html
+
+# our imports
+from nametags.jobs.scrapers.opensea import OpenseaScraper
+from nametags.jobs.scrapers.rules import RULES
+
+
+SAMPLES_DIR = Path(__file__).parent.joinpath(
+    "../../jobs/scrapers/tests/samples"
+)
+
+
+def parse_dom(xpath):
+    """
+    Returns a function that returns the text of the element at the given
+    xpath by building the tree of the whole page, like the etherscan
+    scraper used to.
+    """
+    def parse(html_content):
+        value = lxml.html.fromstring(html_content).xpath(xpath)
+        if len(value) != 0:
+            return value[0].text
+
+        return None
+
+    return parse
+
+
+def parse_stream(name):
+    """
+    Returns a function that returns the value of the etherscan
+    field with the given name from a stream of the page.
+    """
+    def parse(html_content):
+        return RULES["etherscan"].stream(name, html_content)
+
+    return parse
+
+
+def parse_opensea(html_content):
+    """
+    Returns the label of an opensea profile page like the opensea
+    scraper used to, with a query per field, each run on the tree
+    when it is called.
+    """
+    tree = lxml.html.fromstring(html_content)
+    joined = tree.xpath("/html/body/div[1]/div/main/div/div/div/div[4]/div/div/div[1]/div/div/div[2]/div")[0].text  # noqa: E501 pylint: disable=line-too-long
+    if joined is None:
+        return None
+
+    username = tree.xpath("/html/body/div[1]/div/main/div/div/div/div[3]/div/div/div[1]/div/div[2]/h1")[0].text  # noqa: E501 pylint: disable=line-too-long
+    share_div = tree.xpath('//*[@id="main"]/div/div/div/div[3]/div/div/div[2]/div/div/div[2]')  # noqa: E501 pylint: disable=line-too-long
+    socials = " ".join(
+        link.get("href") for link in share_div[0].getprevious().iter(tag="a")
+    ) or None
+    tabs = []
+    for tab_text in ["Collected", "Created", "Favorited"]:
+        tab = tree.xpath(f'//span[contains(text(),"{tab_text}")]')
+        amount = tab[0].getnext() if len(tab) != 0 else None
+        tabs.append("0" if amount is None else amount.text)
+
+    return f"Username: {username} - Socials: {socials} - " \
+           f"{joined} - Collected: {tabs[0]} - " \
+           f"Created: {tabs[1]} - Favorited: {tabs[2]}"
+
+
+def etherscan_cases():
+    """
+    Returns the etherscan cases, i.e. the recorded page, the field and
+    the previous and the current parse functions, for each page and field.
+    """
+    return [
+        (
+            f"etherscan/{page}", name,
+            parse_dom(field.selectors[0]), parse_stream(name)
+        )
+        for page in ["address_lookup.html", "token_lookup.html"]
+        for name, field in RULES["etherscan"].fields.items()
+    ]
+
+
+def opensea_cases():
+    """
+    Returns the opensea cases, for each recorded profile page.
+    """
+    return [
+        (
+            f"opensea/{page}", "label",
+            parse_opensea, OpenseaScraper.parse_label
+        )
+        for page in ["profile_found.html", "profile_not_found.html"]
+    ]
+
+
+def mean_time(parse, html_content, repeat):
+    """
+    Returns the mean number of milliseconds the given parse
+    function takes over the given number of runs.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(html_content)
+
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def peak_memory(parse, html_content):
+    """
+    Returns the number of kilobytes the peak resident memory of a forked
+    process grows by while it runs the given parse function once.
+    Measured in a process of its own, since most of the memory of lxml
+    is allocated by libxml2 and cannot be traced from python.
+    """
+    reader, writer = multiprocessing.Pipe(duplex=False)
+
+    def run():
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        parse(html_content)
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        writer.send(after - before)
+
+    process = multiprocessing.get_context("fork").Process(target=run)
+    process.start()
+    growth = reader.recv()
+    process.join()
+
+    return growth
+
+
+class Command(BaseCommand):
+    """ Class representing a django manage.py command. """
+
+    help = "\
+        Compares how the scrapers used to parse recorded pages with how \
+        they parse them now, i.e. building the tree of etherscan pages to \
+        find a label with extracting it from a stream of the page, and \
+        querying the tree of opensea pages once per field with decoding \
+        the profile data the page embeds. Reports the mean time and the \
+        growth of the peak memory of each. \
+        "
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat", type=int, default=20,
+            help="Number of times each page is parsed to time it."
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'page':<36} {'field':<14} {'found':<6} {'old ms':>8} "
+            f"{'new ms':>8} {'old KB':>8} {'new KB':>8}"
+        )
+        for page, field, previous, current in \
+                etherscan_cases() + opensea_cases():
+            with open(SAMPLES_DIR.joinpath(page), encoding="utf-8") as fobj:
+                html_content = fobj.read()
+
+            # both parsers must agree before they are compared
+            found = current(html_content)
+            if found != previous(html_content):
+                self.stderr.write(f"{page} {field}: parsers disagree")
+                continue
+
+            times = [
+                mean_time(parse, html_content, options["repeat"])
+                for parse in [previous, current]
+            ]
+            memory = [
+                peak_memory(parse, html_content)
+                for parse in [previous, current]
+            ]
+            self.stdout.write(
+                f"{page:<36} {field:<14} {str(found is not None):<6} "
+                f"{times[0]:>8.1f} {times[1]:>8.1f} "
+                f"{memory[0]:>8} {memory[1]:>8}"
+            )
@@ -0,0 +1,100 @@
+"""
+Script that benchmarks the number of jobs per second run by a worker
+that forks a work horse per job and by a warm worker, on jobs that query
+the database and make a request, like the scraper jobs.
+"""
+# std lib imports
+import time
+
+# third party imports
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+import redis
+import requests
+
+# our imports
+from nametags.jobs.queue import Queue
+from nametags.jobs.scrapers.sessions import adapters
+from nametags.jobs.workers import WarmWorker, WeightedHerokuWorker
+from nametags.models import Address
+
+
+QUEUE_NAME = "benchmark_workers"
+
+
+def benchmark_job(url):
+    """
+    Job that queries the database, then gets the given
+    url, if any, through the connection pools of the scrapers.
+    """
+    Address.objects.exists()
+
+    if url:
+        session = requests.Session()
+        for prefix, adapter in adapters.items():
+            session.mount(prefix, adapter)
+        session.get(url, timeout=settings.SCRAPE_HTTP["TIMEOUT"])
+
+
+def run_jobs(worker_class, queue, count, url):
+    """
+    Runs the given number of jobs with a worker of the given class.
+    Returns a tuple of the number of seconds it took and
+    the number of jobs that failed.
+    """
+    queue.empty()
+    failed_before = queue.failed_job_registry.count
+    for _ in range(count):
+        queue.enqueue(benchmark_job, url, result_ttl=0, failure_ttl=60)
+
+    worker = worker_class([queue], connection=queue.connection)
+    start = time.perf_counter()
+    worker.work(burst=True, logging_level="WARNING")
+    elapsed = time.perf_counter() - start
+
+    return (elapsed, queue.failed_job_registry.count - failed_before)
+
+
+class Command(BaseCommand):
+    """ Class representing a django manage.py command. """
+
+    help = "\
+        Compares how many jobs per second the worker that forks a work \
+        horse per job runs with the warm worker of heroku-worker --warm, \
+        on a queue of its own in the redis instance at REDIS_URL. \
+        "
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--jobs", type=int, default=200,
+            help="Number of jobs run by each worker."
+        )
+        parser.add_argument(
+            "--url", type=str, default=None,
+            help="Url each job gets, e.g. of a source or a local server. "
+                 "Jobs only query the database by default."
+        )
+
+    def handle(self, *args, **options):
+        connection = redis.from_url(settings.REDIS_URL)
+        queue = Queue(QUEUE_NAME, connection=connection)
+
+        # work horses must not share the database connections of this process
+        connections.close_all()
+
+        self.stdout.write(
+            f"{'worker':<8} {'jobs':>6} {'failed':>7} {'seconds':>8} "
+            f"{'jobs/s':>8}"
+        )
+        for name, worker_class in [
+                ("fork", WeightedHerokuWorker), ("warm", WarmWorker)]:
+            elapsed, failed = run_jobs(
+                worker_class, queue, options["jobs"], options["url"]
+            )
+            self.stdout.write(
+                f"{name:<8} {options['jobs']:>6} {failed:>7} "
+                f"{elapsed:>8.2f} {options['jobs'] / elapsed:>8.1f}"
+            )
+
+        queue.empty()
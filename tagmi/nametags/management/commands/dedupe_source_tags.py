@@ -0,0 +1,54 @@
+"""
+Script that collapses the duplicate tags of scraper sources, which were
+added whenever the label found by a scraper changed, into the latest tag
+of each address and source.
+"""
+# std lib imports
+
+# third party imports
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# our imports
+from nametags.constants import SCRAPER_SOURCES
+from nametags.dedupe import collapse_source_tags, duplicate_source_tags
+from nametags.models import Tag, Vote
+
+
+class Command(BaseCommand):
+    """ Class representing a django manage.py command. """
+
+    help = "\
+        Collapses the tags of each address and scraper source into the \
+        latest one, moving the votes of the others to it. \
+        With --dry-run, reports how many tags would be deleted. \
+        "
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Report the duplicate tags without deleting them."
+        )
+
+    def handle(self, *args, **options):
+        duplicates = duplicate_source_tags(Tag, SCRAPER_SOURCES)
+        groups = 0
+        extra = 0
+        for group in duplicates:
+            groups += 1
+            extra += group["count"] - 1
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"Would delete {extra} duplicate tags "
+                f"of {groups} addresses and sources"
+            )
+            return
+
+        with transaction.atomic():
+            deleted = collapse_source_tags(Tag, Vote, SCRAPER_SOURCES)
+
+        self.stdout.write(
+            f"Deleted {deleted} duplicate tags "
+            f"of {groups} addresses and sources"
+        )
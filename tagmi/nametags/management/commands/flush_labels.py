@@ -0,0 +1,66 @@
+"""
+Script that adds the labels found by the scrapers to the database,
+when the label sink is enabled. Meant to run as a single process
+alongside the workers, e.g. as a dyno of its own.
+"""
+# std lib imports
+import signal
+import time
+
+# third party imports
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+import redis
+
+# our imports
+from nametags.jobs.label_sink import LabelSink
+
+
+class Command(BaseCommand):
+    """ Class representing a django manage.py command. """
+
+    help = "\
+        Adds the labels that scraper jobs pushed onto the label sink to \
+        the database, LABEL_SINK_BATCH_SIZE at a time, until it is stopped. \
+        With --once, flushes the labels that are pending and exits. \
+        "
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stopping = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Flush the labels that are pending, then exit."
+        )
+
+    def stop(self, signum, frame):
+        """
+        Stops after the batch being flushed.
+        """
+        # pylint: disable=unused-argument
+        self.stopping = True
+
+    def handle(self, *args, **options):
+        sink = LabelSink(redis.from_url(settings.REDIS_URL))
+        wait = 0 if options["once"] else settings.LABEL_SINK["WAIT"]
+        if not options["once"]:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        while not self.stopping:
+            entries = sink.claim(wait=wait)
+            if len(entries) == 0:
+                if options["once"]:
+                    break
+                continue
+
+            started_at = time.monotonic()
+            close_old_connections()
+            created = sink.flush(entries)
+            self.stdout.write(
+                f"Flushed {len(entries)} labels, {created} new nametags, "
+                f"in {time.monotonic() - started_at:.3f}s"
+            )
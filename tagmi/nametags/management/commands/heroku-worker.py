@@ -4,40 +4,194 @@ Django command that runs a worker which connects to and
 listens on the redis instance hosted at environment variable REDIS_URL.
 """
 # std lib imports
+import os
+import socket
 import urllib.parse
 
 # third party imports
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import connections
 from redis import Redis
 from rq import Connection
-from rq.worker import HerokuWorker as Worker
 
 # our imports
+from nametags.jobs import constants
+from nametags.jobs.controllers import ScraperJobsController
 from nametags.jobs.queue import Queue
+from nametags.jobs.supervisor import Supervisor
+from nametags.jobs.workers import WarmWorker
+from nametags.jobs.workers import WeightedHerokuWorker as Worker
 
 
-listen = ['default']
+lane_weights = {
+    constants.INTERACTIVE_LANE: settings.RQ["INTERACTIVE_WEIGHT"],
+    constants.BACKGROUND_LANE: settings.RQ["BACKGROUND_WEIGHT"]
+}
 redis_url = settings.REDIS_URL
 url = urllib.parse.urlparse(redis_url)
 
 
+def source_queues(source_name):
+    """
+    Returns the names of the queues of the given source, one per lane.
+    """
+    return [
+        constants.source_queue_name(lane, source_name)
+        for lane in constants.lanes
+    ]
+
+
+def lane_queues():
+    """
+    Returns the names of the queues of the jobs that run after all
+    the scraper jobs of an address have finished.
+    Default is kept so that jobs enqueued before the lanes existed still run.
+    """
+    return constants.lanes + ['default']
+
+
+def queue_weights():
+    """
+    Returns a dictionary of queue names to the weight of their lane.
+    """
+    weights = dict(lane_weights)
+    for source_name in ScraperJobsController.source_names():
+        for lane, weight in lane_weights.items():
+            weights[constants.source_queue_name(lane, source_name)] = weight
+
+    return weights
+
+
+def redis_connection():
+    """
+    Returns a connection to the redis instance at REDIS_URL.
+    """
+    return Redis(
+        host=url.hostname, port=url.port, db=0, password=url.password
+    )
+
+
+def worker_name(pid):
+    """
+    Returns the name of the worker run by the process with the given pid.
+    """
+    return f"{socket.gethostname()}.{pid}"
+
+
+def work(listen, worker_class=Worker):
+    """
+    Runs a worker of the given class on the given
+    queue names until it is stopped.
+    """
+    with Connection(redis_connection()):
+        worker = worker_class(
+            map(Queue, listen),
+            name=worker_name(os.getpid()),
+            weights=queue_weights()
+        )
+
+        # the scheduler enqueues batch jobs once their window is over
+        worker.work(with_scheduler=True)
+
+
+def describe_worker(pid):
+    """
+    Returns the state of the worker run by the process
+    with the given pid, as recorded by the worker in redis.
+    """
+    worker = Worker.find_by_key(
+        Worker.redis_worker_namespace_prefix + worker_name(pid),
+        connection=redis_connection()
+    )
+    if worker is None:
+        return "state=unregistered"
+
+    return f"state={worker.state} job={worker.get_current_job_id()} " \
+           f"successful={worker.successful_job_count} " \
+           f"failed={worker.failed_job_count}"
+
+
 class Command(BaseCommand):
     """
     Runs RQ workers on specified queues. Note that all queues passed into a
     single rqworker command must share the same connection.
+    The interactive and background queues are drained by weight.
+    When more than one worker runs, they run in child processes of a
+    supervisor that restarts them when they exit.
 
     Example usage:
     python manage.py heroku-worker
+    python manage.py heroku-worker --per-source
+    python manage.py heroku-worker --warm
+    python manage.py heroku-worker --processes 4 --queues interactive,default
     """
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--per-source",
+            action="store_true",
+            help="Run separate workers for each source, as many as set in "
+                 "RQ_SOURCE_WORKERS (1 by default), plus one worker for "
+                 "the jobs that run after the scraper jobs."
+        )
+        parser.add_argument(
+            "--warm",
+            action="store_true",
+            help="Run jobs in the worker processes instead of forking a "
+                 "process per job, keeping database and http connections "
+                 "open between jobs."
+        )
+        parser.add_argument(
+            "--processes", type=int, default=1,
+            help="Number of worker processes to run, each listening on "
+                 "the given queues. Ignored with --per-source."
+        )
+        parser.add_argument(
+            "--queues", type=str, default=None,
+            help="Comma separated names of the queues to listen on, "
+                 "every queue by default. Ignored with --per-source."
+        )
+        parser.add_argument(
+            "--status-interval", type=int, default=60,
+            help="Seconds between reports of the status of each worker "
+                 "process."
+        )
+
     def handle(self, *args, **options):
         """ Main entrypoint into the django command. """
+        worker_class = WarmWorker if options["warm"] else Worker
 
-        conn = Redis(
-            host=url.hostname, port=url.port, db=0, password=url.password
-        )
+        # workers listening on the given queues, or every queue
+        if not options["per_source"]:
+            if options["queues"]:
+                listen = options["queues"].split(",")
+            else:
+                listen = lane_queues()
+                for source_name in ScraperJobsController.source_names():
+                    listen += source_queues(source_name)
+
+            # a single worker runs in this process
+            if options["processes"] == 1:
+                work(listen, worker_class)
+                return
+
+            to_listen = [listen] * options["processes"]
 
-        with Connection(conn):
-            worker = Worker(map(Queue, listen))
-            worker.work()
+        # separate workers for each source
+        else:
+            to_listen = [lane_queues()]
+            for source_name in ScraperJobsController.source_names():
+                count = settings.RQ["SOURCE_WORKERS"].get(source_name, 1)
+                to_listen += [source_queues(source_name)] * count
+
+        # children are forked with django loaded, but must not
+        # share the database connections of this process
+        connections.close_all()
+        supervisor = Supervisor(
+            [(work, (listen, worker_class)) for listen in to_listen],
+            status_interval=options["status_interval"],
+            describe=describe_worker,
+            write=self.stdout.write
+        )
+        supervisor.run()
@@ -0,0 +1,42 @@
+"""
+Script that lists the addresses whose scraper jobs keep failing
+and are waiting to be retried.
+"""
+# std lib imports
+
+# third party imports
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import redis
+
+# our imports
+from nametags.jobs.policies import RetryPolicy
+
+
+class Command(BaseCommand):
+    """ Class representing a django manage.py command. """
+
+    help = "\
+        Lists the addresses whose scraper jobs have failed and are \
+        waiting to be retried, along with the number of retries and \
+        the number of seconds until the next retry. \
+        "
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Include addresses whose backoff has already elapsed."
+        )
+
+    def handle(self, *args, **options):
+        redis_cursor = redis.from_url(settings.REDIS_URL)
+        retries = RetryPolicy(redis_cursor)
+
+        in_backoff = retries.in_backoff(include_elapsed=options["all"])
+        for address, attempts, retry_after in in_backoff:
+            self.stdout.write(
+                f"{address} retries={attempts} retry_after={retry_after}s"
+            )
+
+        self.stdout.write(f"{len(in_backoff)} address(es) in backoff")
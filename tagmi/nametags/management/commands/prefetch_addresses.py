@@ -0,0 +1,148 @@
+"""
+Script that reads a file of addresses, one per line, and scrapes
+the sources of the addresses whose results are stale.
+Useful to warm up lists of addresses before they are looked up,
+e.g. top tokens, exchange hot wallets or a partner's watchlist.
+"""
+# std lib imports
+from pathlib import Path
+import time
+
+# third party imports
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import redis
+
+# our imports
+from nametags.constants import ADDRESS_FORMAT
+from nametags.jobs import constants
+from nametags.jobs.controllers import ScraperJobsController
+
+
+class Command(BaseCommand):
+    """ Class representing a django manage.py command. """
+
+    help = "\
+        Enqueues scraper jobs in the background lane for every address \
+        in the input file whose results are stale. The file can be a \
+        list of addresses, one per line, or a csv file whose first column \
+        is the address. Progress is saved so that an interrupted run \
+        resumes where it stopped. \
+        "
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jobs_controller = None
+        self.options = {}
+        self.counts = {}
+        self.started_at = None
+
+    def add_arguments(self, parser):
+        parser.add_argument("--input", type=str, required=True)
+        parser.add_argument(
+            "--rate", type=float, default=10,
+            help="Maximum number of addresses to enqueue per second."
+        )
+        parser.add_argument(
+            "--max-pending", type=int, default=10000,
+            help="Wait while a background queue has more jobs than this."
+        )
+        parser.add_argument(
+            "--report-every", type=int, default=1000,
+            help="Report progress and save it every this number of lines."
+        )
+        parser.add_argument(
+            "--progress-file", type=str, default=None,
+            help="File that progress is saved to, defaults to the "
+                 "input file with a .progress suffix."
+        )
+        parser.add_argument(
+            "--restart", action="store_true",
+            help="Ignore saved progress and start from the first line."
+        )
+
+    def handle(self, *args, **options):
+        redis_cursor = redis.from_url(settings.REDIS_URL)
+        self.jobs_controller = ScraperJobsController(
+            redis_cursor=redis_cursor,
+            lane=constants.BACKGROUND_LANE
+        )
+        self.options = options
+
+        # resume from saved progress
+        progress_file = Path(
+            options["progress_file"] or f"{options['input']}.progress"
+        )
+        start = 0
+        if progress_file.exists() and not options["restart"]:
+            start = int(progress_file.read_text(encoding="utf-8").strip())
+            self.stdout.write(f"Resuming after line {start}")
+
+        self.counts = {"enqueued": 0, "skipped": 0, "invalid": 0}
+        self.started_at = time.monotonic()
+        line_number = start
+        with open(options["input"], "r", encoding="utf-8") as fdesc:
+            for line_number, line in enumerate(fdesc, start=1):
+                if line_number <= start:
+                    continue
+
+                self.prefetch(line)
+
+                if line_number % options["report_every"] == 0:
+                    progress_file.write_text(
+                        str(line_number), encoding="utf-8"
+                    )
+                    self.report(line_number - start)
+
+        progress_file.write_text(str(line_number), encoding="utf-8")
+        self.report(line_number - start)
+        self.stdout.write("Done")
+
+    def prefetch(self, line):
+        """
+        Enqueues scraper jobs for the address in the given line
+        if its results are stale, waiting as long as needed to
+        respect the rate and the maximum number of pending jobs.
+        """
+        address = line.split(",")[0].strip().lower()
+        if not ADDRESS_FORMAT.match(address):
+            self.counts["invalid"] += 1
+            return
+
+        self.wait_for_queues()
+
+        _, enqueued = self.jobs_controller.enqueue_if_stale(address)
+        if not enqueued:
+            self.counts["skipped"] += 1
+            return
+
+        self.counts["enqueued"] += 1
+
+        # pace enqueueing so that it does not exceed the rate
+        elapsed = time.monotonic() - self.started_at
+        ahead = self.counts["enqueued"] / self.options["rate"] - elapsed
+        if ahead > 0:
+            time.sleep(ahead)
+
+    def wait_for_queues(self):
+        """
+        Waits until no background queue has more jobs
+        than the maximum number of pending jobs.
+        """
+        queues = self.jobs_controller.source_queues.values()
+        while max(queue.count for queue in queues) > \
+                self.options["max_pending"]:
+            time.sleep(1)
+
+    def report(self, processed):
+        """
+        Writes the progress and throughput of this run.
+        """
+        elapsed = time.monotonic() - self.started_at
+        throughput = processed / elapsed if elapsed > 0 else 0
+        self.stdout.write(
+            f"processed={processed} enqueued={self.counts['enqueued']} "
+            f"skipped={self.counts['skipped']} "
+            f"invalid={self.counts['invalid']} "
+            f"lines/s={throughput:.1f}"
+        )
@@ -0,0 +1,67 @@
+"""
+Script that reports how much redis memory each family of keys uses,
+e.g. scraper job hashes, their dependency sets and registries.
+"""
+# std lib imports
+
+# third party imports
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import redis
+
+# our imports
+from nametags.jobs.memory import memory_by_family
+
+
+class Command(BaseCommand):
+    """ Class representing a django manage.py command. """
+
+    help = "\
+        Scans the keys of redis and reports the number of keys and the \
+        memory used by each family of keys, largest first. Scanning is \
+        done in batches and does not block redis, but it takes a while \
+        on large databases. \
+        "
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--match", type=str, default=None,
+            help="Only measure the keys that match this glob pattern."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of keys to scan and measure per round trip."
+        )
+        parser.add_argument(
+            "--samples", type=int, default=5,
+            help="Number of nested values MEMORY USAGE samples per key, "
+                 "0 to measure all of them."
+        )
+
+    def handle(self, *args, **options):
+        redis_cursor = redis.from_url(settings.REDIS_URL)
+
+        usage = memory_by_family(
+            redis_cursor,
+            match=options["match"],
+            batch_size=options["batch_size"],
+            samples=options["samples"]
+        )
+        measured = sum(total for _, total in usage.values())
+
+        self.stdout.write(
+            f"{'family':<20} {'keys':>10} {'bytes':>14} "
+            f"{'avg':>8} {'share':>6}"
+        )
+        ordered = sorted(usage.items(), key=lambda item: -item[1][1])
+        for family, (count, total) in ordered:
+            share = total / measured if measured else 0
+            self.stdout.write(
+                f"{family:<20} {count:>10} {total:>14} "
+                f"{total // count:>8} {share:>6.1%}"
+            )
+
+        used_memory = redis_cursor.info("memory")["used_memory"]
+        self.stdout.write(
+            f"measured={measured} bytes used_memory={used_memory} bytes"
+        )
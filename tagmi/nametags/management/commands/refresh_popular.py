@@ -0,0 +1,74 @@
+"""
+Script that scrapes the sources of the most looked up addresses
+shortly before their results become stale, so that users rarely
+have to wait for a scrape. Meant to be run periodically,
+e.g. every 10 minutes with the Heroku Scheduler.
+"""
+# std lib imports
+
+# third party imports
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import redis
+
+# our imports
+from nametags.jobs import constants
+from nametags.jobs.controllers import ScraperJobsController
+
+
+class Command(BaseCommand):
+    """ Class representing a django manage.py command. """
+
+    help = "\
+        Enqueues scraper jobs in the background lane for the most looked \
+        up addresses whose results will be stale soon, then decays the \
+        popularity of every address. \
+        "
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top", type=int, default=1000,
+            help="Number of most looked up addresses to consider."
+        )
+        parser.add_argument(
+            "--budget", type=int, default=100,
+            help="Maximum number of addresses to scrape in this run."
+        )
+        parser.add_argument(
+            "--within", type=int, default=1800,
+            help="Scrape sources whose results will be stale "
+                 "within this number of seconds."
+        )
+        parser.add_argument(
+            "--decay", type=float, default=0.9,
+            help="Factor that popularity scores are multiplied by "
+                 "after this run."
+        )
+        parser.add_argument(
+            "--keep", type=int, default=100000,
+            help="Number of most looked up addresses to keep track of."
+        )
+
+    def handle(self, *args, **options):
+        redis_cursor = redis.from_url(settings.REDIS_URL)
+        jobs_controller = ScraperJobsController(
+            redis_cursor=redis_cursor,
+            lane=constants.BACKGROUND_LANE
+        )
+
+        # refresh the most popular addresses first, within budget
+        refreshed = 0
+        hottest = jobs_controller.popularity.hottest(options["top"])
+        for address in hottest:
+            if refreshed >= options["budget"]:
+                break
+
+            if jobs_controller.refresh_expiring(address, options["within"]):
+                refreshed += 1
+
+        jobs_controller.popularity.decay(options["decay"], options["keep"])
+
+        self.stdout.write(
+            f"Refreshed {refreshed} of the {len(hottest)} "
+            "most looked up addresses"
+        )
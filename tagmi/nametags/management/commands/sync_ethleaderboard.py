@@ -0,0 +1,36 @@
+"""
+Script that mirrors the whole ethleaderboard in the database, so that
+the ethleaderboard scraper looks ENS names up locally instead of making
+a request per address. Meant to be run periodically,
+e.g. every day with the Heroku Scheduler.
+"""
+# std lib imports
+
+# third party imports
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import redis
+
+# our imports
+from nametags.jobs.scrapers.ethleaderboard import EthleaderboardScraper
+from nametags.jobs.scrapers.leaderboard_mirror import LeaderboardMirror
+
+
+class Command(BaseCommand):
+    """ Class representing a django manage.py command. """
+
+    help = "\
+        Fetches every account of the ethleaderboard, a page at a time, \
+        and replaces the local mirror of the twitter handles of each ENS \
+        name with them. The ethleaderboard scraper uses the mirror for \
+        ETHLEADERBOARD_MIRROR_MAX_AGE seconds after it is synced. \
+        "
+
+    def handle(self, *args, **options):
+        redis_cursor = redis.from_url(settings.REDIS_URL)
+        frens = list(EthleaderboardScraper().leaderboard())
+        count = LeaderboardMirror(redis_cursor).replace(frens)
+
+        self.stdout.write(
+            f"Mirrored {count} handles of {len(frens)} ethleaderboard accounts"
+        )
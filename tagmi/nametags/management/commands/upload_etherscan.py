@@ -3,13 +3,18 @@ Script that reads a csv file of address,nametag
 and writes it to ETHTags database.
 """
 # std lib imports
+from itertools import islice
+from pathlib import Path
 import csv
+import time
 import uuid
 
 # third party imports
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
 # our imports
+from nametags.imports import LabelImporter, normalize_labels
 from nametags.models import Address, Tag
 
 
@@ -20,14 +25,49 @@ class Command(BaseCommand):
         Adds etherscan labels to the application. \
         Requires a positional argument 'input_file' to be the path to a \
         csv file that contains rows of 'address,nametag'. \
+        With --bulk, rows are validated and merged into the database a \
+        batch at a time, progress is saved so that an interrupted import \
+        resumes where it stopped, and --dry-run reports what would be \
+        added without changing anything. \
         "
 
     session_key = str(uuid.uuid4())
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counts = {}
+        self.started_at = None
+
     def add_arguments(self, parser):
         parser.add_argument("--input", type=str)
+        parser.add_argument(
+            "--bulk", action="store_true",
+            help="Import the rows a batch at a time, with COPY on "
+                 "PostgreSQL, instead of one row at a time."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=50000,
+            help="Number of rows per batch of a bulk import."
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Report what a bulk import would add, then roll it back."
+        )
+        parser.add_argument(
+            "--progress-file", type=str, default=None,
+            help="File that the progress of a bulk import is saved to, "
+                 "defaults to the input file with a .progress suffix."
+        )
+        parser.add_argument(
+            "--restart", action="store_true",
+            help="Ignore saved progress and start from the first row."
+        )
 
     def handle(self, *args, **options):
+        if options["bulk"] or options["dry_run"]:
+            self.bulk_import(options)
+            return
+
         # read csv file from command line
         with open(options["input"], "r", encoding="utf-8") as fdesc:
             reader = csv.DictReader(fdesc)
@@ -51,3 +91,68 @@ class Command(BaseCommand):
                         created_by_session_id=self.session_key,
                         source="etherscan"
                     )
+
+    def bulk_import(self, options):
+        """
+        Streams the rows of the input file and merges them into the
+        database a batch at a time, saving progress after each batch.
+        A dry run merges every batch in a transaction that is rolled back.
+        """
+        progress_file = Path(
+            options["progress_file"] or f"{options['input']}.progress"
+        )
+        if options["restart"] or not progress_file.exists():
+            start = 0
+        else:
+            start = int(progress_file.read_text(encoding="utf-8").strip())
+            self.stdout.write(f"Resuming after row {start}")
+
+        self.counts = {
+            "rows": start, "invalid": 0, "addresses": 0, "tags": 0
+        }
+        self.started_at = time.monotonic()
+        with open(options["input"], "r", encoding="utf-8") as fdesc, \
+                LabelImporter("etherscan", self.session_key) as importer:
+            reader = csv.DictReader(fdesc)
+            rows = (
+                (row["address"], row["nametag"])
+                for row in islice(reader, start, None)
+            )
+            while True:
+                batch = list(islice(rows, options["batch_size"]))
+                if len(batch) == 0:
+                    break
+
+                labels, invalid = normalize_labels(batch)
+                with transaction.atomic():
+                    addresses, tags = importer.merge(labels)
+                    if options["dry_run"]:
+                        transaction.set_rollback(True)
+
+                self.counts["rows"] += len(batch)
+                self.counts["invalid"] += invalid
+                self.counts["addresses"] += addresses
+                self.counts["tags"] += tags
+                if not options["dry_run"]:
+                    progress_file.write_text(
+                        str(self.counts["rows"]), encoding="utf-8"
+                    )
+                self.report(start)
+
+        if options["dry_run"]:
+            self.stdout.write("Dry run, nothing was added")
+        else:
+            self.stdout.write("Done")
+
+    def report(self, start):
+        """
+        Writes the progress and throughput of this run.
+        """
+        elapsed = time.monotonic() - self.started_at
+        processed = self.counts["rows"] - start
+        throughput = processed / elapsed if elapsed > 0 else 0
+        self.stdout.write(
+            f"rows={self.counts['rows']} invalid={self.counts['invalid']} "
+            f"new_addresses={self.counts['addresses']} "
+            f"new_tags={self.counts['tags']} rows/s={throughput:.1f}"
+        )
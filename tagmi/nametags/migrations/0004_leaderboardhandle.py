@@ -0,0 +1,26 @@
+# Generated by Django 4.0.6 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nametags', '0003_alter_tag_nametag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardHandle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ens_name', models.CharField(max_length=255)),
+                ('handle', models.CharField(max_length=255)),
+                ('followers', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardhandle',
+            constraint=models.UniqueConstraint(fields=('ens_name', 'handle'), name='unique_leaderboard_handle'),
+        ),
+    ]
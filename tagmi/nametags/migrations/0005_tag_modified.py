@@ -0,0 +1,24 @@
+# Generated by Django 4.0.6 on 2026-10-19 12:45
+
+from django.db import migrations, models
+
+
+def backfill_modified(apps, schema_editor):
+    Tag = apps.get_model('nametags', 'Tag')
+    Tag.objects.update(modified=models.F('created'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nametags', '0004_leaderboardhandle'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_modified, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.0.6 on 2026-10-19 12:45
+
+from django.db import migrations, models
+
+
+SCRAPER_SOURCES = ['dune', 'etherscan', 'ethleaderboard', 'opensea']
+
+
+def collapse_duplicates(apps, schema_editor):
+    """
+    Collapses the tags of each address and scraper source into its latest
+    tag. The votes of the other tags are moved to the latest tag, except
+    those of users who already voted on it, and the other tags are deleted.
+    A copy of nametags.dedupe.collapse_source_tags as of this migration.
+    It runs in a migration of its own, before the next one adds the
+    unique constraint, since PostgreSQL does not alter a table that has
+    pending trigger events, e.g. from these deletes, in one transaction.
+    """
+    Tag = apps.get_model('nametags', 'Tag')
+    Vote = apps.get_model('nametags', 'Vote')
+
+    duplicates = (
+        Tag.objects.filter(source__in=SCRAPER_SOURCES)
+        .values('address_id', 'source')
+        .annotate(count=models.Count('id'), keep=models.Max('id'))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for group in duplicates.iterator():
+        others = Tag.objects.filter(
+            address_id=group['address_id'], source=group['source']
+        ).exclude(id=group['keep']).order_by('-id')
+
+        # users keep their vote on the latest of the tags they voted on
+        for other in others:
+            voted = Vote.objects.filter(
+                tag_id=group['keep']
+            ).values('created_by_session_id')
+            Vote.objects.filter(tag_id=other.id).exclude(
+                created_by_session_id__in=voted
+            ).update(tag_id=group['keep'])
+
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nametags', '0005_tag_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(collapse_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.6 on 2026-10-19 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nametags', '0006_collapse_scraper_tags'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(condition=models.Q(('source__in', ['dune', 'etherscan', 'ethleaderboard', 'opensea'])), fields=('address', 'source'), name='unique_scraper_tag'),
+        ),
+    ]
@@ -8,6 +8,7 @@ from django.core.exceptions import ValidationError
 from django.db import models
 
 # our imports
+from .constants import SCRAPER_SOURCES
 
 
 class Address(models.Model):
@@ -71,11 +72,24 @@ class Tag(models.Model):
     created = models.DateTimeField(
         auto_now_add=True,
     )
+    modified = models.DateTimeField(
+        auto_now=True
+    )
     source = models.CharField(
         max_length=255,
         blank=True
     )
 
+    class Meta:
+        constraints = [
+            # tags of scrapers are owned by their source and updated in place
+            models.UniqueConstraint(
+                fields=["address", "source"],
+                condition=models.Q(source__in=SCRAPER_SOURCES),
+                name="unique_scraper_tag"
+            )
+        ]
+
     def validate_unique(self, *args, **kwargs):
         """ Validate unique constraints. """
 
@@ -141,3 +155,32 @@ class Vote(models.Model):
 
         self.full_clean()
         super().save(*args, **kwargs)
+
+
+class LeaderboardHandle(models.Model):
+    """
+    Represents a twitter handle on the ethleaderboard, under one of the
+    ENS names of its twitter account. Mirrored from ethleaderboard by
+    the sync_ethleaderboard command.
+    """
+
+    # looked up by the index of the unique constraint, which starts with it
+    ens_name = models.CharField(
+        max_length=255,
+        blank=False
+    )
+    handle = models.CharField(
+        max_length=255,
+        blank=False
+    )
+    followers = models.IntegerField(
+        default=0
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ens_name", "handle"],
+                name="unique_leaderboard_handle"
+            )
+        ]
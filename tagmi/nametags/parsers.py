@@ -0,0 +1,50 @@
+"""
+Module containing the parsers of request bodies.
+"""
+# std lib imports
+import json
+
+# third party imports
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+# our imports
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline delimited JSON, one JSON value per line, into a list.
+    Blank lines are skipped, and lines that are not valid JSON are
+    returned as None so that the view can report them per item.
+    Views can limit the number of values with the max_items key of the
+    parser context, the body is not read past the first value over it.
+    """
+    # pylint: disable=too-few-public-methods
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        max_items = parser_context.get("max_items")
+
+        items = []
+        for line in stream:
+            try:
+                line = line.decode(encoding).strip()
+            except UnicodeDecodeError as exc:
+                raise ParseError(f"NDJSON parse error - {exc}") from exc
+
+            if not line:
+                continue
+
+            if max_items is not None and len(items) == max_items:
+                raise ParseError(f"At most {max_items} items per request")
+
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(None)
+
+        return items
@@ -0,0 +1,44 @@
+"""
+Module containing the redis channels that tell subscribers
+that the nametags of an address have changed.
+"""
+# std lib imports
+import functools
+
+# third party imports
+from django.conf import settings
+import redis
+
+# our imports
+
+
+CHANNEL_PREFIX = "nametags:address:"
+
+
+def channel_name(address):
+    """
+    Returns the name of the redis channel of the given address.
+    """
+    return f"{CHANNEL_PREFIX}{address.lower()}"
+
+
+@functools.lru_cache(maxsize=None)
+def redis_client():
+    """
+    Returns the redis client of the process, created on first use.
+    It is shared by the threads of the process, which take their
+    connections from its pool.
+    """
+    return redis.from_url(settings.REDIS_URL)
+
+
+def publish_address_changed(address, reason, redis_cursor=None):
+    """
+    Publishes a message telling subscribers of the given address that
+    its nametags, votes, or sources have changed.
+    reason is one of "tags", "votes" or "sources".
+    """
+    if redis_cursor is None:
+        redis_cursor = redis_client()
+
+    redis_cursor.publish(channel_name(address), reason)
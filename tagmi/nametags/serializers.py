@@ -9,6 +9,7 @@ from rest_framework.exceptions import PermissionDenied
 
 # our imports
 from .constants import NAMETAG_FORMAT
+from .pubsub import publish_address_changed
 from .models import Address, Tag, Vote
 from .utils import create_session_if_dne, order_nametags_queryset
 
@@ -153,6 +154,7 @@ class VoteSerializer(serializers.ModelSerializer):
             value=self.validated_data["value"],
             created_by_session_id=request.session.session_key
         )
+        publish_address_changed(tag.address_id, "votes")
 
         return vote
 
@@ -168,6 +170,7 @@ class VoteSerializer(serializers.ModelSerializer):
         # update the vote
         instance.value = validated_data.get("value", instance.value)
         instance.save()
+        publish_address_changed(instance.tag.address_id, "votes")
 
         return instance
 
@@ -235,6 +238,7 @@ class TagSerializer(serializers.ModelSerializer):
             value=True,
             created_by_session_id=request.session.session_key
         )
+        publish_address_changed(address.pubkey, "tags")
 
         return tag
 
@@ -0,0 +1,26 @@
+"""
+Module containing the receivers of the signals of the models.
+"""
+# std lib imports
+
+# third party imports
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+# our imports
+from .constants import SCRAPER_SOURCES
+from .jobs.scrapers.page_cache import PageCache
+from .models import Tag
+from .pubsub import redis_client
+
+
+@receiver(post_delete, sender=Tag)
+def forget_scraped_pages(sender, instance, **kwargs):
+    """
+    Forgets the pages the label of a deleted scraper tag was parsed from,
+    e.g. when duplicate tags are collapsed, so that the next scrape of the
+    address adds the label back even if the pages have not changed.
+    """
+    # pylint: disable=unused-argument
+    if instance.source in SCRAPER_SOURCES:
+        PageCache(redis_client()).forget(instance.source, instance.address_id)
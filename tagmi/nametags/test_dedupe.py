@@ -0,0 +1,109 @@
+"""
+Module that tests the collapse of duplicate scraper tags.
+"""
+# std lib imports
+from io import StringIO
+from unittest import mock
+import importlib
+
+# third party imports
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+
+# our imports
+from .models import Address, Tag, Vote
+
+
+# the test database has the unique constraint on scraper tags,
+# so duplicates are made with a source that is not a scraper's
+@mock.patch(
+    "nametags.management.commands.dedupe_source_tags.SCRAPER_SOURCES",
+    new=["legacy"]
+)
+class DedupeTests(TestCase):
+    """ Class that tests the collapse of duplicate scraper tags. """
+
+    def setUp(self):
+        """
+        Runs before each test.
+        """
+        self.address = Address.objects.create(pubkey=f"0x{'1' * 40}")
+        self.user_tag = Tag.objects.create(
+            address=self.address, nametag="User", created_by_session_id="u"
+        )
+        self.tags = [
+            Tag.objects.create(
+                address=self.address, nametag=f"Collected: {count}",
+                created_by_session_id="s", source="legacy"
+            )
+            for count in range(1, 4)
+        ]
+
+        # users voted on the older tags, one of them on two of them
+        for tag, session in [(self.tags[0], "a"), (self.tags[1], "a"),
+                             (self.tags[0], "b")]:
+            Vote.objects.create(
+                tag=tag, value=tag == self.tags[1],
+                created_by_session_id=session
+            )
+
+    def test_dedupe_source_tags(self):
+        """
+        Assert that the tags of each address and scraper source are
+        collapsed into the latest one, which gets the votes of the others,
+        and that user tags are kept.
+        """
+        # run the command
+        out = StringIO()
+        call_command("dedupe_source_tags", stdout=out)
+
+        # make assertions
+        self.assertIn(
+            "Deleted 2 duplicate tags of 1 addresses", out.getvalue()
+        )
+        self.assertEqual(
+            set(Tag.objects.values_list("id", "nametag")),
+            {(self.tags[2].id, "Collected: 3"), (self.user_tag.id, "User")}
+        )
+        self.assertEqual(
+            set(Vote.objects.values_list(
+                "tag_id", "created_by_session_id", "value"
+            )),
+            {(self.tags[2].id, "a", True), (self.tags[2].id, "b", False)}
+        )
+
+    def test_dedupe_source_tags_dry_run(self):
+        """
+        Assert that a dry run reports the duplicates without deleting them.
+        """
+        out = StringIO()
+        call_command("dedupe_source_tags", dry_run=True, stdout=out)
+
+        self.assertIn(
+            "Would delete 2 duplicate tags of 1 addresses", out.getvalue()
+        )
+        self.assertEqual(Tag.objects.count(), 4)
+
+    def test_migration_collapses_duplicates(self):
+        """
+        Assert that the migration that runs before scraper tags are
+        made unique collapses them like the command does.
+        """
+        migration = importlib.import_module(
+            "nametags.migrations.0006_collapse_scraper_tags"
+        )
+
+        with mock.patch.object(migration, "SCRAPER_SOURCES", new=["legacy"]):
+            migration.collapse_duplicates(apps, None)
+
+        self.assertEqual(
+            set(Tag.objects.values_list("id", "nametag")),
+            {(self.tags[2].id, "Collected: 3"), (self.user_tag.id, "User")}
+        )
+        self.assertEqual(
+            set(Vote.objects.values_list(
+                "tag_id", "created_by_session_id", "value"
+            )),
+            {(self.tags[2].id, "a", True), (self.tags[2].id, "b", False)}
+        )
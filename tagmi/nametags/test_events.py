@@ -0,0 +1,213 @@
+"""
+Module that tests the server-sent events of addresses.
+"""
+# std lib imports
+from unittest import mock
+import json
+
+# third party imports
+from asgiref.testing import ApplicationCommunicator
+import fakeredis.aioredis
+
+# our imports
+from . import events
+from .basetest import BaseTestCase
+from .models import Address, Tag
+from .pubsub import channel_name
+
+
+class PublishTests(BaseTestCase):
+    """ Tests that changes to an address are published. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        mock.patch("redis.from_url", return_value=self.fake_redis).start()
+        self.pubsub = self.fake_redis.pubsub()
+        self.pubsub.subscribe(channel_name(self.test_addr))
+        self.pubsub.get_message()  # subscribe confirmation
+
+    def published(self):
+        """
+        Returns the messages published on the channel of the test address.
+        """
+        messages = []
+        message = self.pubsub.get_message()
+        while message is not None:
+            messages.append(message["data"].decode())
+            message = self.pubsub.get_message()
+
+        return messages
+
+    def test_create_nametag_published(self):
+        """
+        Assert that creating a nametag publishes a change of tags.
+        """
+        self.client.post(f"/{self.test_addr}/tags/", {"nametag": "Tag"})
+
+        self.assertEqual(self.published(), ["tags"])
+
+    def test_vote_published(self):
+        """
+        Assert that creating and updating a vote publish a change of votes.
+        """
+        response = self.client.post(
+            f"/{self.test_addr}/tags/", {"nametag": "Tag"}
+        )
+        url = f"/{self.test_addr}/tags/{response.data['id']}/votes/"
+        self.published()
+
+        # new user votes then changes their vote
+        self.client.cookies.clear()
+        self.client.post(url, {"value": True})
+        self.client.put(url, {"value": False})
+
+        self.assertEqual(self.published(), ["votes", "votes"])
+
+
+class AddressPayloadTests(BaseTestCase):
+    """ Tests the payload sent to subscribers of an address. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        mock.patch.object(events, "close_old_connections").start()
+
+    def test_address_dne(self):
+        """
+        Assert that the payload of an unknown address has no nametags
+        and stale sources.
+        """
+        payload = events.address_payload(self.test_addr, None)
+
+        self.assertEqual(payload, {"sourcesAreStale": True, "nametags": []})
+
+    def test_address_nametags(self):
+        """
+        Assert that the payload contains the nametags of the address
+        and that looking it up does not enqueue scraper jobs.
+        """
+        address = Address.objects.create(pubkey=self.test_addr)
+        Tag.objects.create(
+            address=address, nametag="Tag", created_by_session_id="1"
+        )
+
+        payload = events.address_payload(self.test_addr, None)
+
+        self.assertTrue(payload["sourcesAreStale"])
+        self.assertEqual(payload["nametags"][0]["nametag"], "Tag")
+        self.assertFalse(self.fake_redis.keys("rq:job:*"))
+
+
+class AddressEventsTests(BaseTestCase):
+    """ Tests the event stream of an address. """
+
+    def setUp(self):
+        """ Runs before each test. """
+
+        super().setUp()
+        mock.patch(
+            "redis.asyncio.from_url",
+            side_effect=lambda url: fakeredis.aioredis.FakeRedis()
+        ).start()
+        mock.patch.object(events, "hub", new=events.AddressEventsHub()).start()
+        mock.patch.object(
+            events, "address_payload",
+            side_effect=[{"nametags": []}, {"nametags": ["Tag"]}]
+        ).start()
+        self.django_application = mock.AsyncMock()
+        self.application = events.route_events(self.django_application)
+        self.scope = {
+            "type": "http",
+            "method": "GET",
+            "path": f"/{self.test_addr}/events/",
+            "headers": [(b"origin", b"http://localhost:3000")],
+        }
+
+    async def test_stream(self):
+        """
+        Assert that the payload is sent on connect and again on a change,
+        and that the subscription ends when the client disconnects.
+        """
+        communicator = ApplicationCommunicator(self.application, self.scope)
+
+        start = await communicator.receive_output()
+        self.assertEqual(start["status"], 200)
+        self.assertIn(
+            (b"content-type", b"text/event-stream"), start["headers"]
+        )
+
+        body = await communicator.receive_output()
+        self.assertEqual(
+            json.loads(body["body"].decode()[len("data: "):]),
+            {"nametags": []}
+        )
+
+        # two changes that happen together are sent once
+        for queue in events.hub.subscribers[self.test_addr]:
+            queue.put_nowait("tags")
+            queue.put_nowait("votes")
+
+        body = await communicator.receive_output()
+        self.assertEqual(
+            json.loads(body["body"].decode()[len("data: "):]),
+            {"nametags": ["Tag"]}
+        )
+
+        await communicator.send_input({"type": "http.disconnect"})
+        await communicator.wait()
+        self.assertNotIn(self.test_addr, events.hub.subscribers)
+
+    async def test_other_paths(self):
+        """
+        Assert that other requests are handed to the django application.
+        """
+        scope = dict(self.scope, path=f"/{self.test_addr}/")
+        communicator = ApplicationCommunicator(self.application, scope)
+        await communicator.wait()
+
+        self.django_application.assert_awaited_once()
+        self.assertFalse(events.hub.subscribers)
+
+    async def test_subscription_restarted(self):
+        """
+        Assert that a failed subscription is logged and made again,
+        and that the streams send the payload again once it is.
+        """
+        # the first subscription fails
+        broken = mock.MagicMock()
+        broken.pubsub.return_value.psubscribe = mock.AsyncMock(
+            side_effect=ConnectionError("connection lost")
+        )
+        broken.pubsub.return_value.reset = mock.AsyncMock()
+        broken.close = mock.AsyncMock()
+        mock.patch(
+            "redis.asyncio.from_url",
+            side_effect=[broken, fakeredis.aioredis.FakeRedis()]
+        ).start()
+        mock.patch.object(events, "RESUBSCRIBE_DELAY", new=0).start()
+
+        # connect, then wait for the payload sent again
+        with self.assertLogs("nametags.events", level="ERROR") as logs:
+            communicator = ApplicationCommunicator(
+                self.application, self.scope
+            )
+            await communicator.receive_output()
+            await communicator.receive_output()
+            body = await communicator.receive_output()
+
+        # make assertions
+        self.assertIn(
+            "subscription of the event streams failed", logs.output[0]
+        )
+        self.assertEqual(
+            json.loads(body["body"].decode()[len("data: "):]),
+            {"nametags": ["Tag"]}
+        )
+        self.assertFalse(events.hub.reader.done())
+
+        await communicator.send_input({"type": "http.disconnect"})
+        await communicator.wait()
+        events.hub.reader.cancel()
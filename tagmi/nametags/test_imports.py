@@ -0,0 +1,202 @@
+"""
+Module that tests the bulk import of labels.
+"""
+# std lib imports
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+import shutil
+import tempfile
+
+# third party imports
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+# our imports
+from .imports import LabelImporter, normalize_labels
+from .models import Address, Tag
+
+
+class ImportTests(TestCase):
+    """ Class that tests the bulk import of labels. """
+
+    def setUp(self):
+        """
+        Runs before each test.
+        """
+        self.addresses = [f"0x{str(number) * 40}" for number in range(1, 4)]
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.input_file = Path(tmp_dir, "labels.csv")
+        self.input_file.write_text(
+            "address,nametag\n"
+            f"{self.addresses[0].upper().replace('X', 'x')},Label One\n"
+            f"{self.addresses[0]}, Label One \n"
+            f"{self.addresses[1]},Label Two\n"
+            "0x1234,Too Short\n"
+            f"{self.addresses[2]},\n"
+            f"{self.addresses[2]},Label Three\n",
+            encoding="utf-8"
+        )
+
+    def test_normalize_labels(self):
+        """
+        Assert that addresses are lowercased, nametags stripped,
+        duplicates dropped and invalid rows counted.
+        """
+        labels, invalid = normalize_labels([
+            (self.addresses[0].upper().replace("X", "x"), "Label One"),
+            (self.addresses[0], " Label One "),
+            ("0x1234", "Too Short"),
+            (self.addresses[1], ""),
+            (self.addresses[1], "x" * 256),
+            (self.addresses[1], "Label Two")
+        ])
+
+        self.assertEqual(labels, [
+            (self.addresses[0], "Label One"), (self.addresses[1], "Label Two")
+        ])
+        self.assertEqual(invalid, 3)
+
+    def test_merge_skips_existing(self):
+        """
+        Assert that merging labels adds the addresses and tags that
+        are not in the database yet, and only those.
+        """
+        address = Address.objects.create(pubkey=self.addresses[0])
+        Tag.objects.create(
+            address=address, nametag="Label One",
+            created_by_session_id="session", source="partner"
+        )
+
+        with LabelImporter("partner", "import") as importer:
+            counts = importer.merge([
+                (self.addresses[0], "Label One"),
+                (self.addresses[0], "Label Two"),
+                (self.addresses[1], "Label One")
+            ])
+
+        self.assertEqual(counts, (1, 2))
+        self.assertEqual(
+            set(Tag.objects.values_list("address_id", "nametag", "source")),
+            {
+                (self.addresses[0], "Label One", "partner"),
+                (self.addresses[0], "Label Two", "partner"),
+                (self.addresses[1], "Label One", "partner")
+            }
+        )
+
+    def test_merge_replaces_owned_tags(self):
+        """
+        Assert that a scraper source keeps one tag per address,
+        whose nametag is replaced by the last label merged.
+        """
+        address = Address.objects.create(pubkey=self.addresses[0])
+        tag = Tag.objects.create(
+            address=address, nametag="Collected: 1",
+            created_by_session_id="session", source="opensea"
+        )
+
+        with LabelImporter("opensea", "import") as importer:
+            new_addresses, created = importer.merge_created([
+                (self.addresses[0], "Collected: 2"),
+                (self.addresses[0], "Collected: 3"),
+                (self.addresses[1], "Collected: 1")
+            ])
+
+        self.assertEqual(new_addresses, 1)
+        self.assertEqual(created, {
+            (self.addresses[0], "Collected: 3"),
+            (self.addresses[1], "Collected: 1")
+        })
+        replaced = Tag.objects.get(address=address)
+        self.assertEqual(replaced.id, tag.id)
+        self.assertEqual(replaced.nametag, "Collected: 3")
+        self.assertGreater(replaced.modified, tag.modified)
+        self.assertEqual(Tag.objects.count(), 2)
+
+    @skipUnless(connection.vendor == "postgresql", "COPY needs PostgreSQL")
+    def test_merge_copy_replaces_owned_tags(self):
+        """
+        Assert that merging through the staging table replaces the
+        nametags of the tags a scraper source owns in place, with
+        ON CONFLICT on the partial unique index of scraper tags,
+        and skips the labels an address already has.
+        """
+        address = Address.objects.create(pubkey=self.addresses[0])
+        tag = Tag.objects.create(
+            address=address, nametag="Collected: 1",
+            created_by_session_id="session", source="opensea"
+        )
+        Tag.objects.create(
+            address=address, nametag="Collected: 2",
+            created_by_session_id="user"
+        )
+
+        with LabelImporter("opensea", "import") as importer:
+            self.assertTrue(importer.copy)
+            new_addresses, created = importer.merge_created([
+                (self.addresses[0], "Collected: 3"),
+                (self.addresses[1], "Collected: 1"),
+                (self.addresses[1], "Collected: 2")
+            ])
+
+        self.assertEqual(new_addresses, 1)
+        self.assertEqual(created, {
+            (self.addresses[0], "Collected: 3"),
+            (self.addresses[1], "Collected: 2")
+        })
+        replaced = Tag.objects.get(address=address, source="opensea")
+        self.assertEqual(replaced.id, tag.id)
+        self.assertEqual(replaced.nametag, "Collected: 3")
+        self.assertGreater(replaced.modified, tag.modified)
+        self.assertEqual(
+            Tag.objects.filter(address_id=self.addresses[1]).count(), 1
+        )
+
+    def test_bulk_upload(self):
+        """
+        Assert that a bulk upload adds the valid rows, in batches,
+        saves its progress and resumes after the rows already imported.
+        """
+        out = StringIO()
+        call_command(
+            "upload_etherscan", input=str(self.input_file), bulk=True,
+            batch_size=4, stdout=out
+        )
+
+        self.assertEqual(Tag.objects.count(), 3)
+        self.assertEqual(Address.objects.count(), 3)
+        self.assertIn(
+            "rows=6 invalid=2 new_addresses=3 new_tags=3", out.getvalue()
+        )
+        progress_file = Path(f"{self.input_file}.progress")
+        self.assertEqual(progress_file.read_text(encoding="utf-8"), "6")
+
+        # nothing left to import, then start over
+        progress_file.write_text("5", encoding="utf-8")
+        out = StringIO()
+        call_command(
+            "upload_etherscan", input=str(self.input_file), bulk=True,
+            stdout=out
+        )
+        self.assertIn("Resuming after row 5", out.getvalue())
+        self.assertIn("rows=6 invalid=0 new_addresses=0 new_tags=0",
+                      out.getvalue())
+
+    def test_dry_run(self):
+        """
+        Assert that a dry run reports what would be added,
+        without adding anything or saving progress.
+        """
+        out = StringIO()
+        call_command(
+            "upload_etherscan", input=str(self.input_file), dry_run=True,
+            stdout=out
+        )
+
+        self.assertIn("new_addresses=3 new_tags=3", out.getvalue())
+        self.assertEqual(Tag.objects.count(), 0)
+        self.assertEqual(Address.objects.count(), 0)
+        self.assertFalse(Path(f"{self.input_file}.progress").exists())
@@ -6,6 +6,7 @@ import uuid
 
 # third party imports
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 
 # our imports
@@ -24,6 +25,34 @@ class TagTests(TestCase):
             "0x41329485877D12893bC4ef88A9208ee5cB5f5525"
         ]
 
+    def test_scraper_tag_unique_per_source(self):
+        """
+        Assert that an address can only have one Tag of each scraper
+        source, while Tags of other sources are not limited.
+        """
+        # prepare test
+        address = Address.objects.create(
+            pubkey=self.test_addrs[0]
+        )
+        for nametag, source in [("One", "opensea"), ("Two", "etherscan"),
+                                ("Three", ""), ("Four", "")]:
+            Tag.objects.create(
+                address=address,
+                nametag=nametag,
+                created_by_session_id=uuid.uuid4(),
+                source=source
+            )
+
+        # assert that a second Tag of the same scraper source is rejected
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Tag.objects.create(
+                address=address,
+                nametag="Five",
+                created_by_session_id=uuid.uuid4(),
+                source="opensea"
+            )
+        self.assertEqual(Tag.objects.count(), 4)
+
     def test_tag_unique_same_address(self):
         """
         Assert that a Tag cannot be created if one already exists
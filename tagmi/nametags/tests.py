@@ -5,13 +5,18 @@ Module containing tests for the nametags application.
 """
 # std lib imports
 from unittest import mock
+import itertools
+import json
 
 # third part imports
+from django.test import override_settings
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 
 # our imports
 from .basetest import BaseTestCase
 from .models import Address, Tag, Vote
+from .parsers import NDJSONParser
 
 
 class AddressTests(BaseTestCase):
@@ -81,6 +86,43 @@ class AddressTests(BaseTestCase):
         }
         self.assertDictEqual(response.data, expected)
 
+    def test_get_address_retry_after(self):
+        """
+        Assert that retrieving an address with stale sources tells the
+        client when to try again, later than usual if the address is
+        waiting to be retried, and that fresh sources do not.
+        """
+        # set up test
+        to_test = [
+            ((True, True), 0, "30"),       # stale, enqueued
+            ((True, False), 0, "30"),      # stale, in progress
+            ((True, False), 600, "600"),   # stale, in backoff
+        ]
+
+        for return_value, retry_after, expected in to_test:
+            with mock.patch(
+                "nametags.jobs.controllers.ScraperJobsController"
+                ".enqueue_if_stale",
+            ) as mock_controller, mock.patch(
+                "nametags.jobs.controllers.ScraperJobsController.retry_after",
+            ) as mock_retry_after:
+                # make request
+                mock_controller.return_value = return_value
+                mock_retry_after.return_value = retry_after
+                response = self.client.get(self.urls["retrieve"])
+
+            # make assertions
+            self.assertEqual(response["Retry-After"], expected)
+
+        # assert that fresh sources do not set the header
+        with mock.patch(
+            "nametags.jobs.controllers.ScraperJobsController.enqueue_if_stale",
+        ) as mock_controller:
+            mock_controller.return_value = (False, False)  # stale, enqueued
+            response = self.client.get(self.urls["retrieve"])
+
+        self.assertFalse(response.has_header("Retry-After"))
+
     def test_get_address_invalid(self):
         """
         Assert that retrieving an invalid address
@@ -795,3 +837,166 @@ class VoteTests(BaseTestCase):
         }
         nametags = response.data["nametags"]
         self.assertDictEqual(nametags[0]["votes"], expected)
+
+
+@override_settings(LABEL_INGEST={
+    "KEYS": {"partner-key": {"partner", "partner_nft"}}, "MAX_ITEMS": 10
+})
+class LabelIngestTests(BaseTestCase):
+    """
+    Represents a Django class test case.
+    """
+
+    def setUp(self):
+        """
+        Runs once before each test.
+        """
+        # call parent
+        super().setUp()
+
+        # common test addresses and request headers
+        self.test_addrs = [
+            "0x4622BeF7d6C5f7f1ACC479B764688DC3E7316d68",
+            "0x41329485877D12893bC4ef88A9208ee5cB5f5525"
+        ]
+        self.url = "/labels/"
+        self.auth = {"HTTP_AUTHORIZATION": "Bearer partner-key"}
+
+    def post_labels(self, lines, **headers):
+        """
+        Posts the given lines, objects or raw strings, as NDJSON.
+        """
+        body = "\n".join(
+            line if isinstance(line, str) else json.dumps(line)
+            for line in lines
+        )
+        return self.client.post(
+            self.url, body, content_type="application/x-ndjson", **headers
+        )
+
+    def test_ingest_labels(self):
+        """
+        Assert that valid labels are created, that existing and duplicate
+        labels are skipped, and that each line has a result.
+        """
+        # set up test
+        address = Address.objects.create(pubkey=self.test_addrs[1].lower())
+        Tag.objects.create(
+            address=address, nametag="Known", created_by_session_id="s"
+        )
+        publish = mock.patch("nametags.views.publish_address_changed").start()
+
+        # make request
+        response = self.post_labels([
+            {"address": self.test_addrs[0], "nametag": " Partner ",
+             "source": "partner"},
+            {"address": self.test_addrs[0], "nametag": "Partner",
+             "source": "partner"},
+            {"address": self.test_addrs[1], "nametag": "Known",
+             "source": "partner_nft"},
+            {"address": "0x1234", "nametag": "Short", "source": "partner"},
+            {"address": self.test_addrs[1], "nametag": "Other",
+             "source": "etherscan"},
+            "{not json",
+            ""
+        ], **self.auth)
+
+        # make assertions
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["created", "duplicate", "exists", "invalid", "invalid",
+             "invalid"]
+        )
+        self.assertEqual(
+            {key: response.data[key] for key in
+             ("created", "exists", "duplicate", "invalid")},
+            {"created": 1, "exists": 1, "duplicate": 1, "invalid": 3}
+        )
+        tag = Tag.objects.get(address=self.test_addrs[0].lower())
+        self.assertEqual((tag.nametag, tag.source), ("Partner", "partner"))
+        publish.assert_called_once_with(
+            self.test_addrs[0].lower(), "tags", redis_cursor=mock.ANY
+        )
+
+        # the same labels again are all skipped
+        response = self.post_labels([
+            {"address": self.test_addrs[0], "nametag": "Partner",
+             "source": "partner"}
+        ], **self.auth)
+        self.assertEqual(response.data["exists"], 1)
+        self.assertEqual(Tag.objects.count(), 2)
+
+    @override_settings(LABEL_INGEST={
+        "KEYS": {"partner-key": {"partner", "etherscan"}}, "MAX_ITEMS": 10
+    })
+    def test_ingest_labels_rejected(self):
+        """
+        Assert that nametags that users could not add, and labels of
+        scraper sources, even if the key allows them, are invalid.
+        """
+        # make request
+        response = self.post_labels([
+            {"address": self.test_addrs[0],
+             "nametag": "<script>alert(1)</script>", "source": "partner"},
+            {"address": self.test_addrs[0], "nametag": "Partner",
+             "source": "etherscan"},
+            {"address": self.test_addrs[0], "nametag": "Partner",
+             "source": "partner"}
+        ], **self.auth)
+
+        # make assertions
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["invalid", "invalid", "created"]
+        )
+        self.assertEqual(
+            list(Tag.objects.values_list("nametag", "source")),
+            [("Partner", "partner")]
+        )
+
+    def test_ingest_labels_unauthenticated(self):
+        """
+        Assert that requests without a known API key are rejected.
+        """
+        # make requests
+        label = {"address": self.test_addrs[0], "nametag": "Partner",
+                 "source": "partner"}
+        missing = self.post_labels([label])
+        unknown = self.post_labels(
+            [label], HTTP_AUTHORIZATION="Bearer other-key"
+        )
+
+        # make assertions
+        self.assertEqual(missing.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(unknown.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(Tag.objects.count(), 0)
+
+    def test_ingest_labels_too_many(self):
+        """
+        Assert that requests with more than MAX_ITEMS labels are rejected.
+        """
+        # make request
+        response = self.post_labels([
+            {"address": self.test_addrs[0], "nametag": f"Partner {index}",
+             "source": "partner"}
+            for index in range(11)
+        ], **self.auth)
+
+        # make assertions
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Tag.objects.count(), 0)
+
+    def test_ingest_labels_stops_parsing(self):
+        """
+        Assert that the body is not read past the first label over MAX_ITEMS.
+        """
+        # endless body, counting the lines read
+        lines = itertools.count(1)
+        stream = (b'{"address": "0x0"}\n' for _ in lines)
+
+        # make assertions
+        with self.assertRaises(ParseError):
+            NDJSONParser().parse(stream, parser_context={"max_items": 10})
+        self.assertEqual(next(lines), 12)
@@ -7,10 +7,13 @@ URL router for nametags application.
 from django.urls import path
 
 # our imports
-from .views import AddressRetrieve, TagListCreate, VoteCreateListUpdate
+from .views import (
+    AddressRetrieve, LabelIngest, TagListCreate, VoteCreateListUpdate
+)
 
 
 urlpatterns = [
+    path('labels/', LabelIngest.as_view()),
     path('<str:address>/', AddressRetrieve.as_view()),
     path('<str:address>/tags/', TagListCreate.as_view()),
     path(
@@ -4,17 +4,24 @@ Views for the nametags application.
 # std lib imports
 
 # third party imports
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Value
 from django.http import Http404
 from rest_framework import generics, mixins, status
 from rest_framework.exceptions import NotFound, ParseError
 from rest_framework.response import Response
+from rest_framework.views import APIView
+import redis
 
 # our imports
-from .constants import ADDRESS_FORMAT
+from .authentication import HasIngestKey, IngestKeyAuthentication
+from .constants import ADDRESS_FORMAT, STALE_RETRY_AFTER
+from .imports import ingest_labels
 from .jobs.controllers import ScraperJobsController
 from .models import Address, Tag, Vote
+from .parsers import NDJSONParser
+from .pubsub import publish_address_changed
 from .utils import order_nametags_queryset
 from . import serializers
 
@@ -24,6 +31,7 @@ class AddressRetrieve(generics.RetrieveAPIView):
 
     serializer_class = serializers.AddressSerializer
     sources_are_stale = False
+    retry_after = None
     address = None
 
     def get_object(self):
@@ -83,10 +91,25 @@ class AddressRetrieve(generics.RetrieveAPIView):
 
         # handle stale sources for address
         jobs_controller = ScraperJobsController()
-        is_stale, _ = jobs_controller.enqueue_if_stale(self.address)
+        jobs_controller.record_lookup(self.address)
+        is_stale, enqueued = jobs_controller.enqueue_if_stale(self.address)
         self.sources_are_stale = is_stale
 
-        return self.retrieve(request, *args, **kwargs)
+        # tell the client when to check for fresh sources again,
+        # later than usual if the address is waiting to be retried
+        if is_stale:
+            self.retry_after = STALE_RETRY_AFTER
+            if not enqueued:
+                self.retry_after = max(
+                    self.retry_after,
+                    jobs_controller.retry_after(self.address)
+                )
+
+        response = self.retrieve(request, *args, **kwargs)
+        if self.retry_after is not None:
+            response["Retry-After"] = str(self.retry_after)
+
+        return response
 
 
 class TagListCreate(generics.ListCreateAPIView):
@@ -106,6 +129,16 @@ class TagListCreate(generics.ListCreateAPIView):
 
         return queryset
 
+    def perform_create(self, serializer):
+        """
+        Saves the new nametag and resets the re-scrape interval
+        of the address since its tag set has changed.
+        """
+        serializer.save()
+
+        jobs_controller = ScraperJobsController()
+        jobs_controller.reset_backoff(self.kwargs["address"].lower())
+
 
 class VoteCreateListUpdate(
         mixins.ListModelMixin,
@@ -155,3 +188,52 @@ class VoteCreateListUpdate(
         """
 
         return self.update(request, *args, **kwargs)
+
+
+class LabelIngest(APIView):
+    """
+    View that allows trusted partners to push labels in bulk.
+
+    The body is NDJSON, one {"address", "nametag", "source"} object per
+    line, and the request is authenticated with an API key that may write
+    the sources of the labels. Labels are validated and merged a source at
+    a time with set-based inserts, labels that already exist are skipped.
+    The response has the result of each line, in order.
+    """
+
+    authentication_classes = [IngestKeyAuthentication]
+    permission_classes = [HasIngestKey]
+    parser_classes = [NDJSONParser]
+
+    def get_parser_context(self, http_request):
+        """
+        Returns the context of the parser, which stops
+        reading the body past MAX_ITEMS labels.
+        """
+        context = super().get_parser_context(http_request)
+        context["max_items"] = settings.LABEL_INGEST["MAX_ITEMS"]
+        return context
+
+    def post(self, request, *args, **kwargs):
+        """ Ingest the labels of the request body. """
+
+        items = request.data if isinstance(request.data, list) else []
+        results = ingest_labels(items, request.auth)
+
+        # tell subscribers about the addresses that have new nametags
+        changed = {
+            result["address"] for result in results
+            if result["status"] == "created"
+        }
+        if changed:
+            pipeline = redis.from_url(settings.REDIS_URL).pipeline()
+            for address in changed:
+                publish_address_changed(address, "tags", redis_cursor=pipeline)
+            pipeline.execute()
+
+        statuses = ("created", "exists", "duplicate", "invalid")
+        counts = dict.fromkeys(statuses, 0)
+        for result in results:
+            counts[result["status"]] += 1
+
+        return Response({**counts, "results": results})
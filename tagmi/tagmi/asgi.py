@@ -2,6 +2,8 @@
 ASGI config for tagmi project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests for address event streams are served outside of django's
+request handling, see nametags/events.py.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
@@ -11,6 +13,8 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from nametags.events import route_events
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tagmi.settings')
 
-application = get_asgi_application()
+application = route_events(get_asgi_application())
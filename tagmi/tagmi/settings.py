@@ -179,6 +179,7 @@ CORS_ALLOWED_ORIGINS = config(
     cast=lambda v: v.split(',')
 )
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = ['Retry-After']
 
 # cross-site request forgery config
 CSRF_COOKIE_SECURE = config("CSRF_COOKIE_SECURE", cast=bool)
@@ -207,11 +208,159 @@ sentry_sdk.init(
     traces_sample_rate=config("SENTRY_SAMPLE_RATE", cast=float)
 )
 
+
+def per_source(value, number_type=int):
+    """
+    Parses a comma separated list of source_name=number
+    pairs into a dictionary of source names to numbers.
+    """
+    return {
+        name: number_type(number) for name, number in
+        (item.split("=") for item in value.split(",") if item)
+    }
+
+
 # rq (redis queue) configuration
 REDIS_URL = config("REDIS_URL", cast=str)
 RQ = {
-    'DEFAULT_RESULT_TTL': config("RQ_DEFAULT_RESULT_TTL", cast=int)
+    'DEFAULT_RESULT_TTL': config("RQ_DEFAULT_RESULT_TTL", cast=int),
+
+    # relative rates at which workers drain the interactive
+    # and background queues when both have jobs waiting
+    'INTERACTIVE_WEIGHT': config(
+        "RQ_INTERACTIVE_WEIGHT", default=9, cast=int
+    ),
+    'BACKGROUND_WEIGHT': config("RQ_BACKGROUND_WEIGHT", default=1, cast=int),
+
+    # number of workers per source when running one worker per source,
+    # e.g. "opensea_scraper=3,dune_scraper=2", 1 for unlisted sources
+    'SOURCE_WORKERS': config(
+        "RQ_SOURCE_WORKERS", default="", cast=per_source
+    ),
+
+    # delete the jobs of an address as soon as all its scraper jobs have
+    # finished, freshness is tracked by the re-scrape policy instead
+    'COMPACT_JOBS': config("RQ_COMPACT_JOBS", default=False, cast=bool)
+}
+
+# re-scrape intervals, they grow while a source keeps returning no label
+RESCRAPE = {
+    'BASE_INTERVAL': RQ['DEFAULT_RESULT_TTL'],
+    'MAX_INTERVAL': config(
+        "RESCRAPE_MAX_INTERVAL", default=2592000, cast=int
+    ),
+    'MULTIPLIER': config("RESCRAPE_MULTIPLIER", default=2, cast=int)
+}
+
+# retries of addresses whose scraper jobs failed
+SCRAPE_RETRY = {
+    'BASE_DELAY': config("SCRAPE_RETRY_BASE_DELAY", default=60, cast=int),
+    'MAX_DELAY': config("SCRAPE_RETRY_MAX_DELAY", default=3600, cast=int),
+    'MAX_RETRIES': config("SCRAPE_RETRY_MAX_RETRIES", default=5, cast=int)
+}
+
+# engine that runs the scrapers, "jobs" runs one rq job per source and
+# "async" runs all the sources of an address concurrently in one job.
+# timeouts are in seconds, e.g. "opensea_scraper=30" for per source ones
+SCRAPE_ENGINE = {
+    'ENGINE': config("SCRAPE_ENGINE", default="jobs"),
+    'SOURCE_TIMEOUT': config("SCRAPE_SOURCE_TIMEOUT", default=60, cast=int),
+    'SOURCE_TIMEOUTS': config(
+        "SCRAPE_SOURCE_TIMEOUTS", default="", cast=per_source
+    )
+}
+
+# requests per second allowed to each upstream host by all the workers
+# together, e.g. "dune.com=0.5,etherscan.io=5" for per host ones, a rate
+# of 0 disables the limit. BURST requests can be made at once after a
+# quiet period
+SCRAPE_RATE_LIMIT = {
+    'RATE': config("SCRAPE_RATE_LIMIT", default=2, cast=float),
+    'RATES': config(
+        "SCRAPE_RATE_LIMITS", default="",
+        cast=lambda value: per_source(value, float)
+    ),
+    'BURST': config("SCRAPE_RATE_LIMIT_BURST", default=4, cast=int)
+}
+
+# http connections of the scrapers, connections kept open per host,
+# retries of requests that fail to connect or get a 502, 503 or 504
+# response, and seconds before a request times out
+SCRAPE_HTTP = {
+    'POOL_SIZE': config("SCRAPE_HTTP_POOL_SIZE", default=10, cast=int),
+    'RETRIES': config("SCRAPE_HTTP_RETRIES", default=2, cast=int),
+    'TIMEOUT': config("SCRAPE_HTTP_TIMEOUT", default=30, cast=int)
+}
+
+# seconds the cookies and csrf token of a warm scraper session are
+# shared with the other workers, 0 disables sharing
+SCRAPE_SESSION_TTL = config("SCRAPE_SESSION_TTL", default=900, cast=int)
+
+# pages scraped from the sources are cached for TTL seconds, up to
+# MAX_ENTRIES pages, so that unchanged pages are not parsed again.
+# a TTL of 0 disables the cache
+SCRAPE_PAGE_CACHE = {
+    'TTL': config("SCRAPE_PAGE_CACHE_TTL", default=86400, cast=int),
+    'MAX_ENTRIES': config("SCRAPE_PAGE_CACHE_SIZE", default=10000, cast=int)
+}
+
+# the etherscan scraper requests the token page of an address only when
+# its address page has no label, or along with the address page when
+# CONCURRENT_PAGES is set, which is faster when the address page has no
+# label but always takes two requests of the etherscan.io rate limit
+SCRAPE_ETHERSCAN = {
+    'CONCURRENT_PAGES': config(
+        "SCRAPE_ETHERSCAN_CONCURRENT_PAGES", default=False, cast=bool
+    )
+}
+
+# micro-batches of scraper jobs, the addresses waiting on a source for
+# up to WINDOW seconds are looked up by a single job, up to SIZE at a time.
+# batching is disabled when SIZE is 1
+SCRAPE_BATCH = {
+    'SIZE': config("SCRAPE_BATCH_SIZE", default=1, cast=int),
+    'WINDOW': config("SCRAPE_BATCH_WINDOW", default=2, cast=float)
+}
+
+# the local mirror of the ethleaderboard is used by the ethleaderboard
+# scraper for MAX_AGE seconds after it is synced, 0 disables the mirror
+ETHLEADERBOARD_MIRROR = {
+    'MAX_AGE': config(
+        "ETHLEADERBOARD_MIRROR_MAX_AGE", default=172800, cast=int
+    )
+}
+
+# labels found by the scrapers are pushed to a redis list when ENABLED,
+# and added to the database BATCH_SIZE at a time by the flush_labels
+# command, which waits up to WAIT seconds for labels when none are pending
+LABEL_SINK = {
+    'ENABLED': config("LABEL_SINK_ENABLED", default=False, cast=bool),
+    'BATCH_SIZE': config("LABEL_SINK_BATCH_SIZE", default=500, cast=int),
+    'WAIT': config("LABEL_SINK_WAIT", default=5, cast=int)
 }
 
 # web3 provider
 WEB3_PROVIDER_URL = config("WEB3_PROVIDER_URL", cast=str)
+
+# the ENS names addresses reverse resolve to are cached for TTL seconds,
+# and the addresses without a name for NEGATIVE_TTL seconds. addresses
+# are resolved BATCH_SIZE at a time by bulk lookups. a TTL of 0 disables
+# caching the names, or the addresses without a name
+ENS_NAMES = {
+    'TTL': config("ENS_NAME_TTL", default=86400, cast=int),
+    'NEGATIVE_TTL': config("ENS_NAME_NEGATIVE_TTL", default=259200, cast=int),
+    'BATCH_SIZE': config("ENS_BATCH_SIZE", default=100, cast=int)
+}
+
+# bulk label ingestion by trusted partners, the API keys allowed to push
+# labels and the sources each key may write, e.g. "key1=src1|src2,key2=src3".
+# MAX_ITEMS labels are accepted per request
+LABEL_INGEST = {
+    'KEYS': config(
+        "LABEL_INGEST_KEYS", default="",
+        cast=lambda value: per_source(
+            value, lambda sources: set(sources.split("|"))
+        )
+    ),
+    'MAX_ITEMS': config("LABEL_INGEST_MAX_ITEMS", default=50000, cast=int)
+}